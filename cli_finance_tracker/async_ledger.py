@@ -0,0 +1,460 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from user_entry_manager import UserEntryManager
+from csv_manager import CSVManager
+from audit_log import AuditLog
+from durable_writer import DurableWriter
+from ledger_aggregates import LedgerAggregates
+from transaction_store import TransactionStore
+from record_codec import RecordCodec
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class LedgerSnapshot:
+    """
+    Read-only view of the ledger as of one point in time, shared by concurrent readers.
+
+    A snapshot is a base and an overlay. The base is a copy of the compact records (see RecordCodec) sorted by date;
+    the overlay holds the decoded rows of the transactions changed since the base was taken, None for deleted ones.
+    The snapshot after a batch of writes shares the base of the one before and copies only the overlay, so publishing
+    it takes time in proportion to the changes rather than to the ledger. The base is taken again once the overlay
+    grows past MAX_OVERLAY rows, or when the store has reloaded the records.
+
+    Nothing in a snapshot is modified after it is built, and only the rows a read returns are decoded.
+
+    Attributes:
+        MAX_OVERLAY (int): Largest number of changed transactions kept in the overlay.
+        records (pd.DataFrame): Compact records of the base, ordered by date and then by transaction ID.
+        codec (RecordCodec): View of the store's codec that decodes the base.
+        id_order (np.ndarray): Positions in records that put the transaction IDs in ascending order.
+        loads (int): Number of times the store had loaded the records when the base was taken.
+        changed (dict): (day ordinal, row) or None keyed by transaction ID, for transactions changed since the base.
+        stats (dict): (count, total, mean, standard deviation) keyed by category.
+        prefix (tuple): Prefix sums of the daily rollup, see LedgerAggregates.prefix_sums.
+    """
+
+    MAX_OVERLAY = 10_000
+
+    def __init__(self, store, base=None, changed=None):
+        """
+        Takes a snapshot of a store. Must run on the thread that writes to the store.
+
+        Args:
+            store (TransactionStore): The store to snapshot.
+            base (LedgerSnapshot): A snapshot whose base to share, or None to take a new base from the store.
+            changed (dict): The overlay on top of the shared base, see the changed attribute.
+        """
+        if base is None:
+            records = store.records()
+            order = np.lexsort((records["transaction_id"].to_numpy(), records["date"].to_numpy()))
+            self.records = records.take(order).reset_index(drop=True)
+            self.codec = store.codec.view()
+            self.id_order = np.argsort(self.records["transaction_id"].to_numpy(), kind="stable")
+            self.loads = store.loads
+            changed = {}
+        else:
+            self.records, self.codec, self.id_order, self.loads = base.records, base.codec, base.id_order, base.loads
+        self.changed = changed
+        self._changed_ids = np.fromiter(changed, dtype=np.int64, count=len(changed))
+        aggregates = store.summary_aggregates()
+        self.stats = aggregates.stats()
+        self.prefix = aggregates.prefix_sums()
+
+    def updated(self, store, changes):
+        """
+        Returns the snapshot after a batch of writes. Must run on the thread that writes to the store.
+
+        Args:
+            store (TransactionStore): The store the writes were applied to.
+            changes (list of tuple): ("add", record), ("update", (transaction_id, field, value)) or ("delete",
+                transaction_id) for each write that succeeded, in the order they were applied.
+
+        Returns:
+            LedgerSnapshot: A snapshot sharing this one's base, or with a new base if it had to be taken again.
+        """
+        if store.loads != self.loads or len(self.changed) + len(changes) > self.MAX_OVERLAY:
+            return LedgerSnapshot(store)
+        changed = dict(self.changed)
+        for operation, argument in changes:
+            if operation == "add":
+                changed[argument["transaction_id"]] = self.overlay_row(argument)
+            elif operation == "update":
+                transaction_id, update_field, new_value = argument
+                row = changed[transaction_id] if transaction_id in changed else (None, self.base_row(transaction_id))
+                if row is None or row[1] is None:
+                    return LedgerSnapshot(store)
+                changed[transaction_id] = self.overlay_row(dict(row[1], **{update_field: new_value}))
+            else:
+                changed[argument] = None
+        return LedgerSnapshot(store, self, changed)
+
+    def base_row(self, transaction_id):
+        """
+        Args:
+            transaction_id (int): A transaction ID.
+
+        Returns:
+            dict: The decoded record with the transaction ID in the base, or None if there is none.
+        """
+        ids = self.records["transaction_id"].to_numpy()
+        position = np.searchsorted(ids, transaction_id, sorter=self.id_order)
+        if position == len(ids) or ids[self.id_order[position]] != transaction_id:
+            return None
+        index = self.id_order[position]
+        return self.codec.decode_row({column: self.records[column].iat[index] for column in self.records.columns})
+
+    @staticmethod
+    def overlay_row(record):
+        """
+        Args:
+            record (dict): A record as written, keyed by column name.
+
+        Returns:
+            tuple: The record's day ordinal and the record with its amount rounded to cents, as the store keeps it.
+        """
+        row = {
+            "transaction_id": int(record["transaction_id"]),
+            "date": record["date"],
+            "category": record["category"],
+            "amount": int(np.rint(float(record["amount"]) * 100)) / 100,
+            "description": str(record["description"])
+        }
+        return TransactionStore.date_ordinal(row["date"]), row
+
+    def get_transactions(self, start_date, end_date):
+        """
+        Args:
+            start_date (str): The start date of the range (mm-dd-yyyy).
+            end_date (str): The end date of the range (mm-dd-yyyy).
+
+        Returns:
+            pd.DataFrame: The transactions dated within the range, ordered by date and then by transaction ID.
+        """
+        start = TransactionStore.date_ordinal(start_date)
+        end = TransactionStore.date_ordinal(end_date)
+        days = self.records["date"].to_numpy()
+        base = self.records.iloc[np.searchsorted(days, start, side="left"):np.searchsorted(days, end, side="right")]
+        if len(self._changed_ids):
+            base = base[~np.isin(base["transaction_id"].to_numpy(), self._changed_ids)]
+        transactions = self.codec.decode(base)
+        rows = [change for change in self.changed.values() if change is not None and start <= change[0] <= end]
+        if not rows:
+            return transactions.reset_index(drop=True)
+
+        days = np.concatenate([base["date"].to_numpy(), np.array([day for day, _ in rows], dtype=days.dtype)])
+        overlay = pd.DataFrame([row for _, row in rows], columns=transactions.columns)
+        transactions = pd.concat([transactions, overlay]).astype(RecordCodec.DISPLAY_TYPES)
+        order = np.lexsort((transactions["transaction_id"].to_numpy(), days))
+        return transactions.iloc[order].reset_index(drop=True)
+
+    def range_summary(self, start_date, end_date):
+        """
+        Args:
+            start_date (str): The start date of the range (mm-dd-yyyy).
+            end_date (str): The end date of the range (mm-dd-yyyy).
+
+        Returns:
+            dict: (count, total) keyed by category, for categories with transactions in the range.
+        """
+        return LedgerAggregates.prefix_range_stats(self.prefix, TransactionStore.date_ordinal(start_date),
+                                                   TransactionStore.date_ordinal(end_date))
+
+
+class AsyncLedger:
+    """
+    asyncio interface to the ledger for embedding it in async services without blocking the event loop.
+
+    Writes (add, update, delete) are queued and applied by a single writer task on a dedicated thread. Adds that are
+    queued together are coalesced into one append to the records and one write per audit log. Every batch publishes
+    a new LedgerSnapshot, derived from the previous one and the batch's changes, before resolving the batch's futures,
+    so a caller always reads its own writes.
+
+    Reads (get_transactions, summary, range_summary) run on a thread pool against the latest published snapshot and
+    never go through the writer thread, so reads never wait for writes and writes never wait for reads.
+
+    The ledger must not be changed through CSVManager from other threads while an AsyncLedger is open.
+
+    Usage:
+        async with AsyncLedger() as ledger:
+            transaction_id = await ledger.add("03-14-2024", 12.50, "E", "Coffee")
+            stats = await ledger.summary()
+
+    Attributes:
+        MAX_BATCH (int): Largest number of queued writes applied as one batch.
+        READ_WORKERS (int): Threads used for reads.
+    """
+
+    MAX_BATCH = 1000
+    READ_WORKERS = 4
+
+    def __init__(self):
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ledger-writer")
+        self._readers = ThreadPoolExecutor(max_workers=self.READ_WORKERS, thread_name_prefix="ledger-reader")
+        self._queue = None
+        self._writer_task = None
+        self._snapshot = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """
+        Loads the ledger, publishes the first snapshot and starts the writer task.
+
+        Returns:
+            None
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._writer, self._open)
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._write_loop())
+
+    def _open(self):
+        CSVManager.initialize_csv(verbose=False)
+        self._snapshot = LedgerSnapshot(CSVManager.store())
+
+    async def close(self):
+        """
+        Applies the writes still queued, flushes the audit logs and stops the executors.
+
+        Returns:
+            None
+        """
+        if self._writer_task is not None:
+            await self._queue.put(None)
+            await self._writer_task
+            self._writer_task = None
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._writer, DurableWriter.flush_logs)
+        self._writer.shutdown()
+        self._readers.shutdown()
+
+    async def add(self, date, amount, category, description=""):
+        """
+        Adds a new transaction.
+
+        Args:
+            date (str): The date of the transaction (mm-dd-yyyy), or "" for today.
+            amount (str or float): The amount of the transaction.
+            category (str): 'I'/'Income' or 'E'/'Expense'.
+            description (str): A description of the transaction.
+
+        Returns:
+            int: The new transaction ID.
+
+        Raises:
+            ValueError: If a value is invalid.
+        """
+        entry = {
+            "date": UserEntryManager.validate_date(date, allow_default=True),
+            "amount": UserEntryManager.validate_amount(amount),
+            "category": UserEntryManager.validate_category(category),
+            "description": description
+        }
+        return await self._submit("add", entry)
+
+    async def update(self, transaction_id, update_field, new_value):
+        """
+        Sets one field of a transaction.
+
+        Args:
+            transaction_id (int): The transaction ID of the record to update.
+            update_field (str): One of CSVManager.UPDATE_FIELD_CHOICES.
+            new_value (str): The new value of the field.
+
+        Returns:
+            The previous value of the field.
+
+        Raises:
+            ValueError: If the field or value is invalid or the transaction ID does not exist.
+        """
+        if update_field not in CSVManager.UPDATE_FIELD_CHOICES:
+            raise ValueError(f"Field must be one of {', '.join(CSVManager.UPDATE_FIELD_CHOICES)}")
+        new_value = UserEntryManager.validate_field(update_field, new_value)
+        return await self._submit("update", (int(transaction_id), update_field, new_value))
+
+    async def delete(self, transaction_id):
+        """
+        Deletes a transaction.
+
+        Args:
+            transaction_id (int): The transaction ID of the record to delete.
+
+        Returns:
+            dict: The deleted record.
+
+        Raises:
+            ValueError: If the transaction ID does not exist.
+        """
+        return await self._submit("delete", int(transaction_id))
+
+    async def get_transactions(self, start_date, end_date):
+        """
+        Returns the transactions within a date range, ordered by date.
+
+        Args:
+            start_date (str): The start date of the range (mm-dd-yyyy).
+            end_date (str): The end date of the range (mm-dd-yyyy).
+
+        Returns:
+            pd.DataFrame: The matching transaction records.
+        """
+        start_date = UserEntryManager.validate_date(start_date)
+        end_date = UserEntryManager.validate_date(end_date)
+        return await self._read(self._snapshot.get_transactions, start_date, end_date)
+
+    async def summary(self):
+        """
+        Returns:
+            dict: (count, total, mean, standard deviation) keyed by category, for the whole ledger.
+        """
+        return dict(self._snapshot.stats)
+
+    async def range_summary(self, start_date, end_date):
+        """
+        Returns the count and total per category of the transactions within a date range.
+
+        Args:
+            start_date (str): The start date of the range (mm-dd-yyyy).
+            end_date (str): The end date of the range (mm-dd-yyyy).
+
+        Returns:
+            dict: (count, total) keyed by category, for categories with transactions in the range.
+        """
+        start_date = UserEntryManager.validate_date(start_date)
+        end_date = UserEntryManager.validate_date(end_date)
+        return await self._read(self._snapshot.range_summary, start_date, end_date)
+
+    async def _read(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._readers, function, *args)
+
+    async def _submit(self, operation, argument):
+        if self._writer_task is None:
+            raise RuntimeError("AsyncLedger is not started; use 'async with AsyncLedger() as ledger'")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, argument, future))
+        return await future
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.MAX_BATCH and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            closing = None in batch
+            writes = [item for item in batch if item is not None]
+            if writes:
+                try:
+                    results = await loop.run_in_executor(self._writer, self._apply,
+                                                         [(operation, argument) for operation, argument, _ in writes])
+                except Exception as e:
+                    results = [e] * len(writes)
+                for (_, _, future), result in zip(writes, results):
+                    if future.cancelled():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+            if closing:
+                return
+
+    def _apply(self, writes):
+        """
+        Applies a batch of writes on the writer thread and publishes the snapshot after them. If a write failed, the
+        snapshot is taken from the store again, since the store may have dropped its cache.
+
+        Args:
+            writes (list of tuple): (operation, argument) pairs in the order they were queued.
+
+        Returns:
+            list: The result of each write, or the exception it raised.
+        """
+        results = []
+        changes = []
+        position = 0
+        while position < len(writes):
+            operation, argument = writes[position]
+            if operation == "add":
+                end = position
+                while end < len(writes) and writes[end][0] == "add":
+                    end += 1
+                entries = [entry for _, entry in writes[position:end]]
+                try:
+                    transaction_ids = self._apply_adds(entries)
+                    changes.extend(("add", dict(entry, transaction_id=transaction_id))
+                                   for entry, transaction_id in zip(entries, transaction_ids))
+                    results.extend(transaction_ids)
+                except Exception as e:
+                    results.extend([e] * (end - position))
+                position = end
+                continue
+            try:
+                if operation == "update":
+                    results.append(self._apply_update(*argument))
+                else:
+                    results.append(self._apply_delete(argument))
+                changes.append((operation, argument))
+            except Exception as e:
+                results.append(e)
+            position += 1
+
+        store = CSVManager.store()
+        if len(changes) < len(writes):
+            self._snapshot = LedgerSnapshot(store)
+        else:
+            self._snapshot = self._snapshot.updated(store, changes)
+        return results
+
+    @staticmethod
+    def _apply_adds(entries):
+        store = CSVManager.store()
+        with store.locked():
+            first_id = CSVManager.next_transaction_id()
+            entries = [{"transaction_id": first_id + offset, **entry} for offset, entry in enumerate(entries)]
+            store.append_entries(entries)
+            CSVManager.write_id_sequence(entries[-1]["transaction_id"])
+
+        # Each add is its own operation for undo, so the coalesced log rows get logged_at values of their own.
+        timestamp = CSVManager.get_current_time()
+        CSVManager.append_logs(1, [
+            {"timestamp": timestamp, "transaction_id": entry["transaction_id"],
+             "update_type": CSVManager.MODIFICATIONS[2].title(), "success": True, "message": "Entry added",
+             "logged_at": logged_at}
+            for entry, logged_at in zip(entries, AuditLog.logged_at_sequence(len(entries)))
+        ])
+        return [entry["transaction_id"] for entry in entries]
+
+    @staticmethod
+    def _apply_update(transaction_id, update_field, new_value):
+        old_value = CSVManager.store().update(transaction_id, update_field, new_value)
+
+        CSVManager.append_logs(3, [{
+            "timestamp": CSVManager.get_current_time(), "transaction_id": transaction_id,
+            "update_type": CSVManager.MODIFICATIONS[0], "field_update": update_field, "success": True,
+            "old_value": old_value, "new_value": new_value
+        }])
+        return old_value
+
+    @staticmethod
+    def _apply_delete(transaction_id):
+        deleted_transaction = CSVManager.store().delete(transaction_id)
+        if deleted_transaction.empty:
+            raise ValueError(f"Transaction ID {transaction_id} not found")
+        record = deleted_transaction.iloc[0].to_dict()
+
+        CSVManager.append_logs(2, [{
+            "timestamp": CSVManager.get_current_time(), "transaction_id": transaction_id,
+            "update_type": CSVManager.MODIFICATIONS[1], "message": "Deleted entry", "success": True,
+            "del_record_date": record["date"], "del_record_category": record["category"],
+            "del_record_amount": record["amount"], "del_record_description": record["description"]
+        }])
+        return record
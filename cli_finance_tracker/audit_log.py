@@ -0,0 +1,370 @@
+import io
+import os
+from datetime import datetime, timedelta, timezone
+from durable_writer import DurableWriter
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class LogIndex:
+    """
+    Offset index of one audit log CSV file, saved next to it (new_entry_log.index.npz): the byte offset, transaction ID
+    and logged time (epoch seconds) of every row.
+
+    The log is only ever appended to, so the index is extended incrementally: refresh() parses just the bytes written
+    since the index was last saved. A lookup binary-searches the index sorted by transaction ID or by time, then seeks
+    to the matching rows and reads only those. Rows are found with AuditLog.record_ends, so a description that spans
+    several lines stays one row.
+
+    The index is rebuilt from scratch if the log shrank or its header changed, for example after an upgrade added a
+    column.
+    """
+
+    def __init__(self, csv_file, columns):
+        """
+        Args:
+            csv_file (str): Path of the log CSV file.
+            columns (list of str): Column names of the log.
+        """
+        self.csv_file = csv_file
+        self.columns = columns
+        self.index_file = f"{os.path.splitext(csv_file)[0]}.index.npz"
+        self._header = b""
+        self._size = 0
+        self._offsets = None
+        self._ids = None
+        self._times = None
+        self._by_id = None
+        self._by_time = None
+
+    def reset(self):
+        """
+        Empties the index, so the next refresh re-reads the whole log.
+
+        Returns:
+            None
+        """
+        self._header = b""
+        self._size = 0
+        self._offsets = np.empty(0, dtype=np.int64)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._times = np.empty(0, dtype=np.int64)
+        self._by_id = None
+        self._by_time = None
+
+    def load(self):
+        """
+        Loads the saved index, or empties the index if there is none.
+
+        Returns:
+            None
+        """
+        self.reset()
+        try:
+            with np.load(self.index_file) as saved:
+                self._header = saved["header"].tobytes()
+                self._size = int(saved["size"])
+                self._offsets, self._ids, self._times = saved["offsets"], saved["ids"], saved["times"]
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            self.reset()
+
+    def save(self):
+        """
+        Saves the index next to the log.
+
+        Returns:
+            None
+        """
+        arrays = {"header": np.frombuffer(self._header, dtype=np.uint8), "size": self._size,
+                  "offsets": self._offsets, "ids": self._ids, "times": self._times}
+        DurableWriter.atomic_replace(self.index_file, lambda index_file: np.savez(index_file, **arrays), binary=True)
+
+    def refresh(self):
+        """
+        Brings the index up to date with the log, parsing only the rows appended since the last refresh.
+
+        Returns:
+            None
+        """
+        DurableWriter.flush_logs()
+        if self._offsets is None:
+            self.load()
+        try:
+            size = os.path.getsize(self.csv_file)
+            with open(self.csv_file, "rb") as log_file:
+                header = log_file.readline()
+                if size < self._size or header != self._header:
+                    self.reset()
+                    self._header = header
+                    self._size = len(header)
+                if size == self._size:
+                    return
+                log_file.seek(self._size)
+                appended = log_file.read(size - self._size)
+        except FileNotFoundError:
+            self.reset()
+            return
+
+        # Rows still being written have no row end yet; they are picked up by the next refresh.
+        row_ends = AuditLog.record_ends(appended)
+        if not len(row_ends):
+            return
+        appended = appended[:row_ends[-1] + 1]
+        rows = pd.read_csv(io.BytesIO(appended), header=None, names=self.columns, dtype=str, keep_default_na=False,
+                           skip_blank_lines=False).reindex(columns=self.columns).fillna("")
+        if len(rows) != len(row_ends):
+            raise ValueError(f"{self.csv_file} has malformed rows and cannot be indexed")
+
+        ids = pd.to_numeric(rows["transaction_id"], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+        times = AuditLog.epoch_seconds(rows["logged_at"], rows["timestamp"])
+        offsets = self._size + np.concatenate(([0], row_ends[:-1] + 1))
+        self._offsets = np.concatenate((self._offsets, offsets))
+        self._ids = np.concatenate((self._ids, ids))
+        self._times = np.concatenate((self._times, times))
+        self._size += len(appended)
+        self._by_id = None
+        self._by_time = None
+        self.save()
+
+    def positions_for_id(self, transaction_id):
+        """
+        Args:
+            transaction_id (int): The transaction ID to look up.
+
+        Returns:
+            np.ndarray: Row numbers of the log rows about the transaction, in log order.
+        """
+        if self._by_id is None:
+            self._by_id = np.argsort(self._ids, kind="stable")
+        keys = self._ids[self._by_id]
+        low = np.searchsorted(keys, transaction_id, side="left")
+        high = np.searchsorted(keys, transaction_id, side="right")
+        return self._by_id[low:high]
+
+    def positions_between(self, start, end):
+        """
+        Args:
+            start (int): First epoch second of the window.
+            end (int): Last epoch second of the window, inclusive.
+
+        Returns:
+            np.ndarray: Row numbers of the log rows logged within the window, in time order.
+        """
+        if self._by_time is None:
+            self._by_time = np.argsort(self._times, kind="stable")
+        keys = self._times[self._by_time]
+        low = np.searchsorted(keys, start, side="left")
+        high = np.searchsorted(keys, end, side="right")
+        return self._by_time[low:high]
+
+    def read(self, positions):
+        """
+        Reads the given rows of the log, one seek each.
+
+        Args:
+            positions (np.ndarray): Row numbers returned by a lookup.
+
+        Returns:
+            pd.DataFrame: The rows, all values as strings, in the given order.
+        """
+        if not len(positions):
+            return pd.DataFrame(columns=self.columns)
+        ends = np.append(self._offsets[1:], self._size)
+        with open(self.csv_file, "rb") as log_file:
+            chunks = []
+            for offset, end in zip(self._offsets[positions], ends[positions]):
+                log_file.seek(int(offset))
+                chunks.append(log_file.read(int(end - offset)))
+        rows = pd.read_csv(io.BytesIO(b"".join(chunks)), header=None, names=self.columns, dtype=str,
+                           keep_default_na=False)
+        return rows.reindex(columns=self.columns).fillna("")
+
+
+class AuditLog:
+    """
+    Timestamps and lookups shared by the three audit logs.
+
+    Every log row records when it was written twice: in the timestamp column, in the 12-hour local time format the logs
+    have always used, and in the logged_at column as ISO-8601 in UTC, which sorts as text and parses quickly. logged_at
+    has microseconds, so operations logged to different logs within the same second keep their order. Rows written
+    before logged_at existed are placed in time by their legacy timestamp, read as local time.
+
+    Attributes:
+        LEGACY_FORMAT (str): Format of the timestamp column, see CSVManager.get_current_time.
+        _indexes (dict): Open LogIndex objects keyed by log CSV file path.
+    """
+
+    LEGACY_FORMAT = "%m-%d-%Y %I:%M:%S %p"
+
+    _indexes = {}
+
+    @staticmethod
+    def logged_at():
+        """
+        Returns:
+            str: The current time as ISO-8601 in UTC, e.g. "2024-03-14T09:26:53.589793+00:00".
+        """
+        return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+    @staticmethod
+    def logged_at_sequence(count):
+        """
+        Returns:
+            list of str: count logged_at values from the current time on, one microsecond apart, for rows that are
+                logged together but must keep their order.
+        """
+        now = datetime.now(timezone.utc)
+        return [(now + timedelta(microseconds=step)).isoformat(timespec="microseconds") for step in range(count)]
+
+    @staticmethod
+    def to_logged_at(moment):
+        """
+        Args:
+            moment (datetime): A point in time; naive datetimes are taken as local time.
+
+        Returns:
+            str: The time in the format of the logged_at column.
+        """
+        return moment.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+    @staticmethod
+    def microseconds(moment):
+        """
+        Args:
+            moment (datetime): A point in time; naive datetimes are taken as local time.
+
+        Returns:
+            int: Epoch microseconds.
+        """
+        return round(moment.timestamp() * 1_000_000)
+
+    @classmethod
+    def epoch_microseconds(cls, logged_at, timestamps):
+        """
+        Converts the times log rows were written to epoch microseconds, from logged_at where it is set and from the
+        legacy timestamp otherwise. Only the distinct legacy timestamps are parsed.
+
+        Args:
+            logged_at (pd.Series): The rows' logged_at values, empty for rows written before the column existed.
+            timestamps (pd.Series): The rows' legacy timestamps.
+
+        Returns:
+            np.ndarray: int64 epoch microseconds, 0 for rows with neither time.
+        """
+        times = np.zeros(len(logged_at), dtype=np.int64)
+        present = (logged_at != "").to_numpy()
+        if present.any():
+            parsed = pd.to_datetime(logged_at[present], format="ISO8601", utc=True)
+            times[present] = ((parsed - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(microseconds=1)).to_numpy()
+        if not present.all():
+            codes, unique_timestamps = pd.factorize(timestamps[~present])
+            times[~present] = np.array([cls.legacy_epoch(timestamp) * 1_000_000 for timestamp in unique_timestamps],
+                                       dtype=np.int64).take(codes)
+        return times
+
+    @classmethod
+    def epoch_seconds(cls, logged_at, timestamps):
+        """
+        Like epoch_microseconds, in whole seconds.
+
+        Args:
+            logged_at (pd.Series): The rows' logged_at values, empty for rows written before the column existed.
+            timestamps (pd.Series): The rows' legacy timestamps.
+
+        Returns:
+            np.ndarray: int64 epoch seconds, 0 for rows with neither time.
+        """
+        return cls.epoch_microseconds(logged_at, timestamps) // 1_000_000
+
+    @classmethod
+    def backfill(cls, timestamps):
+        """
+        Converts legacy timestamps to logged_at values, for rows written before the logged_at column existed. Only
+        the distinct timestamps are parsed.
+
+        Args:
+            timestamps (pd.Series): Timestamps in LEGACY_FORMAT, local time.
+
+        Returns:
+            np.ndarray: The logged_at values, "" where a timestamp cannot be parsed.
+        """
+        codes, unique_timestamps = pd.factorize(timestamps)
+        seconds = [cls.legacy_epoch(timestamp) for timestamp in unique_timestamps]
+        return np.array([cls.to_logged_at(datetime.fromtimestamp(second)) if second else "" for second in seconds],
+                        dtype=object).take(codes)
+
+    @classmethod
+    def legacy_epoch(cls, timestamp):
+        """
+        Args:
+            timestamp (str): A timestamp in LEGACY_FORMAT, local time.
+
+        Returns:
+            int: Epoch seconds, 0 if the timestamp cannot be parsed.
+        """
+        try:
+            return int(datetime.strptime(timestamp, cls.LEGACY_FORMAT).timestamp())
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def record_ends(data, from_end=False):
+        """
+        Finds the line ends that end CSV rows, as opposed to those inside a quoted field such as a description that
+        spans several lines. The quotes of a complete row, doubled ones included, come in pairs, so a line end ends a
+        row if an even number of quotes comes before it.
+
+        Args:
+            data (bytes): CSV rows, starting at the start of a row.
+            from_end (bool): Count the quotes after each line end instead, for data that ends at the end of a row but
+                may start anywhere, such as a block read backwards from the end of a log.
+
+        Returns:
+            np.ndarray: Offsets of the line ends that end rows, in data.
+        """
+        array = np.frombuffer(data, dtype=np.uint8)
+        quotes = np.cumsum(array == ord('"'))
+        if from_end and len(quotes):
+            quotes = quotes[-1] - quotes
+        return np.flatnonzero((array == ord("\n")) & (quotes % 2 == 0))
+
+    @classmethod
+    def index(cls, csv_file, columns):
+        """
+        Returns the offset index of a log CSV file, brought up to date with the log.
+
+        Args:
+            csv_file (str): Path of the log CSV file.
+            columns (list of str): Column names of the log.
+
+        Returns:
+            LogIndex: The shared index of the log.
+        """
+        log_index = cls._indexes.get(csv_file)
+        if log_index is None or log_index.columns != columns:
+            log_index = cls._indexes[csv_file] = LogIndex(csv_file, columns)
+        log_index.refresh()
+        return log_index
+
+    @classmethod
+    def combine(cls, frames):
+        """
+        Merges rows from several logs into one history ordered by the time they were logged.
+
+        Args:
+            frames (dict): pd.DataFrame of log rows keyed by the name of their log.
+
+        Returns:
+            pd.DataFrame: The rows with a leading "log" column, the columns of every log, and "" where a log does not
+                have a column.
+        """
+        frames = [rows.assign(log=name) for name, rows in frames.items() if not rows.empty]
+        if not frames:
+            return pd.DataFrame(columns=["log", "logged_at", "timestamp", "transaction_id"])
+        rows = pd.concat(frames, ignore_index=True).fillna("")
+        order = np.argsort(cls.epoch_microseconds(rows["logged_at"], rows["timestamp"]), kind="stable")
+        leading = ["log", "logged_at", "timestamp", "transaction_id"]
+        return rows.iloc[order][leading + [column for column in rows.columns if column not in leading]] \
+            .reset_index(drop=True)
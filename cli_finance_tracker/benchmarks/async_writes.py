@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+# Imported first: it puts the program's modules on the import path.
+from synthetic_ledger import write_ledger
+from async_ledger import AsyncLedger
+
+
+async def measure(operations):
+    """
+    Times writes awaited one at a time through an AsyncLedger on the ledger in the working directory.
+
+    Args:
+        operations (int): Number of writes of each kind.
+
+    Returns:
+        list of tuple: (label, operations per second).
+    """
+    rates = []
+    async with AsyncLedger() as ledger:
+        start = time.perf_counter()
+        for _ in range(operations):
+            await ledger.add("03-01-2024", 2, "E", "Benchmark")
+        rates.append(("add", operations / (time.perf_counter() - start)))
+
+        start = time.perf_counter()
+        for _ in range(operations):
+            await ledger.add("03-01-2024", 2, "E", "Benchmark")
+            await ledger.get_transactions("03-01-2024", "03-01-2024")
+        rates.append(("add + get_transactions", operations / (time.perf_counter() - start)))
+
+        start = time.perf_counter()
+        for number in range(operations):
+            await ledger.update(1, "amount", str(3 + number))
+            await ledger.range_summary("01-01-2017", "12-31-2024")
+        rates.append(("update + range_summary", operations / (time.perf_counter() - start)))
+    return rates
+
+
+def main(argv=None):
+    """
+    AsyncLedger benchmark: times writes awaited one at a time on a synthetic ledger, alone and each followed by a read
+    of the snapshot it publishes.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks/async_writes.py",
+                                     description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic transactions")
+    parser.add_argument("--operations", type=int, default=100, help="Writes of each kind")
+    args = parser.parse_args(argv)
+
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ledger_async_") as directory:
+        write_ledger(directory, args.rows)
+        # The ledger's files are found relative to the working directory.
+        os.chdir(directory)
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                rates = asyncio.run(measure(args.operations))
+        finally:
+            os.chdir(working_directory)
+
+    print(f"\n//////////////////// AsyncLedger: {args.rows:,} rows, awaited one at a time ////////////////////")
+    for label, rate in rates:
+        print(f"{label:<28}{rate:>10.0f} /s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
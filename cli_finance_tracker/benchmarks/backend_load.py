@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+# Imported first: it puts the program's modules on the import path.
+from synthetic_ledger import BENCHMARKS_DIR, COLUMNS, PACKAGE_DIR, synthetic_ledger
+from storage_backends import BACKENDS
+
+# Loads the records of the ledger given as the second argument with the backend given as the first, in a fresh
+# interpreter so the peak resident memory is that of one load, and prints as JSON the time, the peak, and the bytes
+# the cached compact records take next to the same records decoded, in the form the store cached before RecordCodec.
+LOAD = """
+import json
+import resource
+import sys
+import time
+from transaction_store import TransactionStore
+from synthetic_ledger import COLUMNS
+
+store = TransactionStore(sys.argv[2], COLUMNS, sys.argv[1])
+start = time.perf_counter()
+records = store.records()
+seconds = time.perf_counter() - start
+# On Linux ru_maxrss carries over from the benchmark process through fork and exec; VmHWM is this process's own peak.
+try:
+    with open("/proc/self/status") as status:
+        peak = next(int(line.split()[1]) * 1024 for line in status if line.startswith("VmHWM:"))
+except (OSError, StopIteration):
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+print(json.dumps({"seconds": seconds, "peak": peak,
+                  "compact": int(records.memory_usage(deep=True).sum()),
+                  "decoded": int(store.frame().memory_usage(deep=True).sum())}))
+"""
+
+
+def disk_size(csv_file, backend):
+    """
+    Args:
+        csv_file (str): Path to the transaction records CSV file.
+        backend (str): Name of the storage backend holding the records.
+
+    Returns:
+        int: Bytes the backend's files take on disk.
+    """
+    if backend == "csv":
+        return os.path.getsize(csv_file)
+    directory = os.path.dirname(csv_file)
+    stem = os.path.splitext(os.path.basename(csv_file))[0]
+    size = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.relpath(path, directory).startswith(stem + ".") and not path.endswith(".lock"):
+                size += os.path.getsize(path)
+    return size
+
+
+def main(argv=None):
+    """
+    Cold load benchmark for the storage backends: stores one synthetic ledger with each backend and loads it in a new
+    process, reporting the load time, the peak resident memory of the process, the bytes per row of the cached
+    records, compact and decoded, and the size on disk.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks/backend_load.py",
+                                     description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic transactions")
+    parser.add_argument("--backends", nargs="+", default=["csv", "numpy"], choices=list(BACKENDS),
+                        help="Storage backends to compare")
+    args = parser.parse_args(argv)
+
+    ledger = synthetic_ledger(args.rows)
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join([PACKAGE_DIR, BENCHMARKS_DIR]))
+    results = []
+    for backend in args.backends:
+        with tempfile.TemporaryDirectory(prefix="ledger_load_") as directory:
+            csv_file = os.path.join(directory, "finance_data.csv")
+            storage = BACKENDS[backend](csv_file, COLUMNS)
+            storage.create()
+            storage.write(ledger)
+            load = subprocess.run([sys.executable, "-c", LOAD, backend, csv_file], env=environment,
+                                  capture_output=True, text=True, check=True)
+            results.append((backend, json.loads(load.stdout), disk_size(csv_file, backend)))
+
+    print(f"\n//////////////////// Cold Load: {args.rows:,} rows ////////////////////")
+    print(f"{'backend':<14}{'load':>10}{'peak RSS':>12}{'compact':>13}{'decoded':>13}{'on disk':>12}")
+    for backend, load, size in results:
+        print(f"{backend:<14}{load['seconds']:>8.2f} s{load['peak'] / 2 ** 20:>9.0f} MB"
+              f"{load['compact'] / args.rows:>7.0f} B/row{load['decoded'] / args.rows:>7.0f} B/row"
+              f"{size / 2 ** 20:>9.0f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
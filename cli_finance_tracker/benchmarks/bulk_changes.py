@@ -0,0 +1,98 @@
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+# Imported first: it puts the program's modules on the import path.
+from synthetic_ledger import BENCHMARKS_DIR, PACKAGE_DIR, write_ledger
+from csv_manager import CSVManager
+
+# 500 of the 5,000 synthetic descriptions, "Payee 0" to "Payee 499", so about a tenth of the ledger.
+DESCRIPTION_PATTERN = r"^Payee [0-4]?\d?\d$"
+SAMPLE_IDS = 200
+
+
+def measure(backend, rows):
+    """
+    Times single and bulk changes on the ledger in the working directory with one backend, and prints the timings as
+    JSON. Runs in its own process, since the stores are shared by file name.
+
+    Args:
+        backend (str): Name of the storage backend.
+        rows (int): Number of transactions in the ledger.
+
+    Returns:
+        None
+    """
+    CSVManager.CSV_FILES_DICT[0]["backend"] = backend
+    timings = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if backend == "sqlite":
+            CSVManager.migrate_to_sqlite()
+        CSVManager.initialize_csv(verbose=False)
+        CSVManager.ledger_summary()
+
+        # Single changes are timed on a sample of IDs outside the range the bulk delete selects.
+        sample = range(rows - SAMPLE_IDS + 1, rows + 1)
+        start = time.perf_counter()
+        for transaction_id in sample:
+            CSVManager.update_transactions(transaction_id, "category", "Income")
+        timings["update"] = (time.perf_counter() - start) / SAMPLE_IDS
+        start = time.perf_counter()
+        for transaction_id in sample:
+            CSVManager.delete_transaction(transaction_id)
+        timings["delete"] = (time.perf_counter() - start) / SAMPLE_IDS
+
+        start = time.perf_counter()
+        timings["updated"] = CSVManager.bulk_update("category", "Income", description=DESCRIPTION_PATTERN)
+        timings["bulk-update"] = time.perf_counter() - start
+        start = time.perf_counter()
+        timings["deleted"] = CSVManager.bulk_delete(ids=list(range(1, min(rows, 200_000) + 1, 2)))
+        timings["bulk-delete"] = time.perf_counter() - start
+    print(json.dumps(timings))
+
+
+def main(argv=None):
+    """
+    Bulk change benchmark: on the same synthetic ledger stored with each backend, times updates and deletes one
+    transaction ID at a time against bulk-update of a tenth of the descriptions and bulk-delete of 100,000 IDs,
+    including the logging.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks/bulk_changes.py",
+                                     description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic transactions")
+    parser.add_argument("--backends", nargs="+", default=["csv", "numpy", "sqlite", "partitioned"],
+                        help="Storage backends to compare")
+    args = parser.parse_args(argv)
+
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join([PACKAGE_DIR, BENCHMARKS_DIR]))
+    results = {}
+    for backend in args.backends:
+        with tempfile.TemporaryDirectory(prefix="ledger_bulk_") as directory:
+            write_ledger(directory, args.rows)
+            run = subprocess.run([sys.executable, "-c", f"from bulk_changes import measure; "
+                                                        f"measure({backend!r}, {args.rows})"],
+                                 cwd=directory, env=environment, capture_output=True, text=True, check=True)
+            results[backend] = json.loads(run.stdout.splitlines()[-1])
+
+    print(f"\n//////////////////// Bulk Changes: {args.rows:,} rows ////////////////////")
+    print(f"{'backend':<14}{'update per ID':>16}{'bulk-update':>22}{'delete per ID':>16}{'bulk-delete':>22}")
+    for backend, timings in results.items():
+        print(f"{backend:<14}{timings['update'] * 1000:>13.1f} ms"
+              f"{timings['bulk-update']:>8.2f} s ({timings['updated']:>7,} rows)"
+              f"{timings['delete'] * 1000:>13.1f} ms"
+              f"{timings['bulk-delete']:>8.2f} s ({timings['deleted']:>7,} rows)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
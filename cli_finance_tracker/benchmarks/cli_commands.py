@@ -0,0 +1,81 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+# Imported first: it puts the program's modules on the import path.
+from synthetic_ledger import PACKAGE_DIR, write_ledger
+
+# Runs a run.py command against the storage backend given as the first argument.
+LAUNCHER = """
+import sys
+from csv_manager import CSVManager
+from cli import CommandLine
+CSVManager.CSV_FILES_DICT[0]["backend"] = sys.argv[1]
+sys.exit(CommandLine.run(sys.argv[2:]))
+"""
+
+# Each command runs RUNS times; {update_id} and {delete_id} change with the run, so updates and deletes hit a new ID
+# every time.
+COMMANDS = [
+    ("add", ["add", "--amount", "5", "--category", "E", "--description", "Benchmark"]),
+    ("query (2 days)", ["query", "03-01-2022", "03-02-2022"]),
+    ("update", ["update", "{update_id}", "amount", "42"]),
+    ("delete", ["delete", "{delete_id}"]),
+    ("report expense", ["report", "expense"]),
+    ("summary", ["summary"])
+]
+RUNS = 3
+
+
+def main(argv=None):
+    """
+    Cold command benchmark: times run.py commands, each in a new process, on the same synthetic ledger stored with
+    each backend, and the migration of the CSV ledger into SQLite.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks/cli_commands.py",
+                                     description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic transactions")
+    parser.add_argument("--backends", nargs="+", default=["csv", "sqlite"], help="Storage backends to compare")
+    args = parser.parse_args(argv)
+
+    environment = dict(os.environ, PYTHONPATH=PACKAGE_DIR)
+    timings = {}
+    migration = None
+    for backend in args.backends:
+        with tempfile.TemporaryDirectory(prefix="ledger_commands_") as directory:
+            write_ledger(directory, args.rows)
+
+            def run(command):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, "-c", LAUNCHER, backend, *command], cwd=directory, env=environment,
+                               stdout=subprocess.DEVNULL, check=True)
+                return time.perf_counter() - start
+
+            if backend == "sqlite":
+                migration = run(["migrate"])
+            # The first command builds the sidecar files (aggregates, date index) a long-lived ledger already has.
+            run(["summary"])
+            for label, command in COMMANDS:
+                timings[label, backend] = min(run([part.format(update_id=args.rows // 2 - number,
+                                                           delete_id=args.rows - number) for part in command])
+                                              for number in range(RUNS))
+
+    print(f"\n//////////////////// Cold run.py Commands: {args.rows:,} rows, best of {RUNS} ////////////////////")
+    print(f"{'command':<20}" + "".join(f"{backend:>12}" for backend in args.backends))
+    for label, _ in COMMANDS:
+        print(f"{label:<20}" + "".join(f"{timings[label, backend]:>10.2f} s" for backend in args.backends))
+    if migration is not None:
+        print(f"{'migrate to SQLite':<20}{migration:>10.2f} s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
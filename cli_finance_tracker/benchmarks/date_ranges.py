@@ -0,0 +1,61 @@
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+# Imported first: it puts the program's modules on the import path.
+from synthetic_ledger import COLUMNS, write_ledger
+from transaction_store import TransactionStore
+from user_entry_manager import UserEntryManager
+from lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+
+def main(argv=None):
+    """
+    Date range query benchmark: times TransactionStore.date_range on a loaded synthetic ledger against parsing every
+    date and masking the records, as get_transactions used to.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 if both found the same transactions, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks/date_ranges.py",
+                                     description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic transactions")
+    parser.add_argument("--years", type=int, default=10, help="Years of transactions, starting in 2017")
+    parser.add_argument("--days", type=int, default=7, help="Length of the queried range in days")
+    args = parser.parse_args(argv)
+
+    start_date = datetime(2017, 1, 1) + timedelta(days=365 * args.years // 2)
+    end_date = start_date + timedelta(days=args.days - 1)
+    with tempfile.TemporaryDirectory(prefix="ledger_dates_") as directory:
+        store = TransactionStore(write_ledger(directory, args.rows, years=args.years), COLUMNS)
+        df = store.frame()
+
+        start = time.perf_counter()
+        dates = pd.to_datetime(df["date"], format=UserEntryManager.DATE_FORMAT)
+        masked = df.loc[(dates >= start_date) & (dates <= end_date)]
+        mask_time = time.perf_counter() - start
+        start = time.perf_counter()
+        store.date_range(start_date, end_date)
+        build_time = time.perf_counter() - start
+        start = time.perf_counter()
+        indexed = store.date_range(start_date, end_date)
+        index_time = time.perf_counter() - start
+
+    print(f"\n//////////////////// Date Range Query: {args.rows:,} rows over {args.years} years, {args.days}-day "
+          f"range ({len(indexed):,} rows) ////////////////////")
+    print(f"{'parse dates and mask':<28}{mask_time * 1e3:>10.1f} ms")
+    print(f"{'build the date index':<28}{build_time * 1e3:>10.1f} ms")
+    print(f"{'query the date index':<28}{index_time * 1e3:>10.1f} ms")
+    matches = sorted(indexed["transaction_id"].tolist()) == sorted(masked["transaction_id"].tolist())
+    print("Results match." if matches else "FAILED: the results differ")
+    return 0 if matches else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
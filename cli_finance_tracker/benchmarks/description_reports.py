@@ -0,0 +1,62 @@
+import argparse
+import sys
+import time
+# Imported first: it puts the program's modules on the import path.
+from synthetic_ledger import synthetic_ledger
+from description_index import DescriptionIndex
+from record_codec import RecordCodec
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+
+def main(argv=None):
+    """
+    Income/expense report benchmark: times the expense report computed with DescriptionIndex (building the
+    description codes, a report after a change and a cached report) against lower-casing every description and
+    grouping by it, as the report used to.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 if both reports have the same totals, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks/description_reports.py",
+                                     description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=5_000_000, help="Number of synthetic transactions")
+    parser.add_argument("--descriptions", type=int, default=100_000, help="Number of distinct descriptions")
+    args = parser.parse_args(argv)
+
+    df = synthetic_ledger(args.rows, descriptions=args.descriptions)
+    start = time.perf_counter()
+    expenses = df[df["category"] == "Expense"]
+    expected = expenses["amount"].groupby(expenses["description"].str.lower()).sum()
+    groupby_time = time.perf_counter() - start
+
+    codec = RecordCodec()
+    records = codec.encode(df)
+    index = DescriptionIndex()
+    start = time.perf_counter()
+    index.build(codec.strings)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    report = index.totals(records, "Expense", codec)
+    report_time = time.perf_counter() - start
+    start = time.perf_counter()
+    index.totals(records, "Expense", codec)
+    cached_time = time.perf_counter() - start
+
+    print(f"\n//////////////////// Expense Report: {args.rows:,} rows, {args.descriptions:,} descriptions "
+          f"////////////////////")
+    print(f"{'lower-case and group by':<28}{groupby_time:>10.2f} s")
+    print(f"{'build description codes':<28}{build_time:>10.2f} s")
+    print(f"{'report from the codes':<28}{report_time:>10.2f} s")
+    print(f"{'cached report':<28}{cached_time * 1e6:>10.1f} us")
+    matches = report.index.equals(expected.index) and np.allclose(report.to_numpy(), expected.to_numpy())
+    print("Reports match." if matches else "FAILED: the reports differ")
+    return 0 if matches else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import argparse
+import sys
+import tempfile
+import time
+# Imported first: it puts the program's modules on the import path.
+from synthetic_ledger import COLUMNS, write_ledger
+from transaction_store import TransactionStore
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+
+def main(argv=None):
+    """
+    Transaction ID lookup benchmark: times TransactionStore.contains on a loaded synthetic ledger against the scan of
+    the whole transaction_id column it replaced.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 if both answered every lookup the same way, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks/id_lookup.py",
+                                     description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic transactions")
+    parser.add_argument("--lookups", type=int, default=1000, help="Number of transaction IDs to look up")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="ledger_lookup_") as directory:
+        store = TransactionStore(write_ledger(directory, args.rows), COLUMNS)
+        df = store.frame()
+        # Half of the IDs exist and half are past the end of the ledger.
+        ids = np.random.default_rng(1).integers(1, 2 * args.rows, args.lookups).tolist()
+
+        start = time.perf_counter()
+        indexed = [store.contains(transaction_id) for transaction_id in ids]
+        index_time = (time.perf_counter() - start) / len(ids)
+        start = time.perf_counter()
+        scanned = [transaction_id in df["transaction_id"].values for transaction_id in ids]
+        scan_time = (time.perf_counter() - start) / len(ids)
+
+    print(f"\n//////////////////// Transaction ID Lookups: {args.rows:,} rows ////////////////////")
+    print(f"{'column scan':<24}{scan_time * 1e6:>10.1f} us per lookup")
+    print(f"{'transaction ID index':<24}{index_time * 1e6:>10.1f} us per lookup")
+    return 0 if indexed == scanned else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
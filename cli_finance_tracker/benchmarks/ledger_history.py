@@ -0,0 +1,106 @@
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+# Imported first: it puts the program's modules on the import path.
+from synthetic_ledger import COLUMNS, synthetic_ledger, write_ledger
+from csv_manager import CSVManager
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+
+def apply_operations(transaction_ids, first, last):
+    """
+    Logs one operation for each of a range of transaction IDs: updates, deletes and new entries in turn.
+
+    Args:
+        transaction_ids (np.ndarray): Distinct transaction IDs of the ledger, in the order they are changed.
+        first (int): Position of the first operation.
+        last (int): Position after the last operation.
+
+    Returns:
+        None
+    """
+    for number in range(first, last):
+        transaction_id = int(transaction_ids[number])
+        if number % 3 == 0:
+            CSVManager.update_transactions(transaction_id, "amount", str(number % 1000 + 1))
+        elif number % 3 == 1:
+            CSVManager.delete_transaction(transaction_id)
+        else:
+            CSVManager.add_entry("03-01-2024", 12.5, "Expense", f"Benchmark {number}")
+
+
+def timed(function):
+    """
+    Returns:
+        tuple: (return value of function, seconds it took)
+    """
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    """
+    Ledger history benchmark: logs operations on a synthetic ledger, then times rebuilding past states of it with and
+    without snapshots, and undoing the last operations.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 if the full rewind matched the original ledger, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks/ledger_history.py",
+                                     description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic transactions")
+    parser.add_argument("--operations", type=int, default=20_000, help="Number of logged operations")
+    parser.add_argument("--undo", type=int, default=100, help="Number of operations to undo")
+    args = parser.parse_args(argv)
+
+    transaction_ids = np.random.default_rng(1).permutation(args.rows)[:args.operations] + 1
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ledger_history_") as directory:
+        write_ledger(directory, args.rows)
+        # The ledger's files are found relative to the working directory.
+        os.chdir(directory)
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                CSVManager.initialize_csv(verbose=False)
+                # Point-in-time views include the whole second they name, so the moments are a second apart from
+                # the operations around them.
+                before = datetime.now()
+                time.sleep(1.1)
+                apply_operations(transaction_ids, 0, args.operations // 2)
+                time.sleep(1.1)
+                middle = datetime.now()
+                time.sleep(1.1)
+                apply_operations(transaction_ids, args.operations // 2, args.operations)
+
+                rewound, first_time = timed(lambda: CSVManager.ledger_as_of(before))
+                _, snapshot_time = timed(lambda: CSVManager.ledger_as_of(before))
+                _, middle_time = timed(lambda: CSVManager.ledger_as_of(middle))
+                _, undo_time = timed(lambda: CSVManager.undo_operations(args.undo))
+        finally:
+            os.chdir(working_directory)
+
+    print(f"\n//////////////////// Ledger History: {args.rows:,} rows, {args.operations:,} logged operations "
+          f"////////////////////")
+    print(f"{'before the first operation, no snapshots':<44}{first_time:>8.2f} s")
+    print(f"{'same view from the saved snapshot':<44}{snapshot_time:>8.2f} s")
+    print(f"{'middle of the history':<44}{middle_time:>8.2f} s")
+    print(f"{f'undo {args.undo}':<44}{undo_time:>8.2f} s")
+    original = synthetic_ledger(args.rows)
+    rewound = rewound[COLUMNS].sort_values("transaction_id", ignore_index=True)
+    matches = rewound.astype(str).equals(original[COLUMNS].astype(str))
+    print("The full rewind matched the original ledger." if matches else "FAILED: the full rewind differs")
+    return 0 if matches else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+# Imported first: it puts the program's modules on the import path.
+import synthetic_ledger  # noqa: F401
+from audit_log import AuditLog, LogIndex
+from csv_manager import CSVManager
+from durable_writer import DurableWriter
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+FIRST_SECOND = 1_483_228_800  # 2017-01-01 00:00:00 UTC
+
+
+def write_update_log(log_file, rows, transactions, days, seed=1):
+    """
+    Writes a synthetic update log with rows spread evenly over a number of days, in the order they were logged.
+
+    Args:
+        log_file (str): Path of the log CSV file.
+        rows (int): Number of log rows.
+        transactions (int): Number of distinct transaction IDs the rows are about.
+        days (int): Days the rows span.
+        seed (int): Seed of the random generator, so every run gets the same log.
+
+    Returns:
+        np.ndarray: The epoch second each row was logged at.
+    """
+    generator = np.random.default_rng(seed)
+    seconds = np.sort(generator.integers(FIRST_SECOND, FIRST_SECOND + days * 86_400, rows))
+    moments = pd.to_datetime(seconds, unit="s", utc=True)
+    pd.DataFrame({
+        "timestamp": moments.tz_convert(None).strftime(AuditLog.LEGACY_FORMAT),
+        "transaction_id": generator.integers(1, transactions + 1, rows),
+        "update_type": "updated",
+        "field_update": "amount",
+        "success": True,
+        "old_value": generator.integers(100, 100_000, rows) / 100,
+        "new_value": generator.integers(100, 100_000, rows) / 100,
+        "logged_at": moments.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+    }).to_csv(log_file, columns=CSVManager.CSV_FILES_DICT[3]["columns"], index=False)
+    return seconds
+
+
+def timed(function):
+    """
+    Returns:
+        tuple: (return value of function, seconds it took)
+    """
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    """
+    Audit log query benchmark: times the history of one transaction and one day of events on a synthetic update log,
+    through its offset index (audit_log.LogIndex) and by scanning the whole log.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 if the index and the scan found the same rows, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks/log_queries.py",
+                                     description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of log rows")
+    parser.add_argument("--transactions", type=int, default=100_000, help="Number of distinct transaction IDs")
+    parser.add_argument("--days", type=int, default=1156, help="Days the log rows span")
+    args = parser.parse_args(argv)
+
+    columns = CSVManager.CSV_FILES_DICT[3]["columns"]
+    with tempfile.TemporaryDirectory(prefix="ledger_log_queries_") as directory:
+        log_file = os.path.join(directory, CSVManager.CSV_FILES_DICT[3]["csv_file"])
+        seconds = write_update_log(log_file, args.rows, args.transactions, args.days)
+        size = os.path.getsize(log_file)
+        transaction_id = args.transactions // 2
+        day_start = int(seconds[len(seconds) // 2]) // 86_400 * 86_400
+        day_end = day_start + 86_399
+
+        def scan_history():
+            log = pd.read_csv(log_file, dtype=str, keep_default_na=False)
+            return log[log["transaction_id"] == str(transaction_id)]
+
+        def scan_events():
+            log = pd.read_csv(log_file, dtype=str, keep_default_na=False)
+            times = AuditLog.epoch_seconds(log["logged_at"], log["timestamp"])
+            return log[(times >= day_start) & (times <= day_end)]
+
+        scanned_history, scan_history_time = timed(scan_history)
+        scanned_events, scan_events_time = timed(scan_events)
+        _, build_time = timed(LogIndex(log_file, columns).refresh)
+        log_index = LogIndex(log_file, columns)
+        _, load_time = timed(log_index.refresh)
+        # The first lookups sort the index by transaction ID and by time; later ones only binary-search it.
+        log_index.positions_for_id(transaction_id + 1)
+        log_index.positions_between(day_start - 86_400, day_start - 1)
+        history, history_time = timed(lambda: log_index.read(log_index.positions_for_id(transaction_id)))
+        events, events_time = timed(lambda: log_index.read(log_index.positions_between(day_start, day_end)))
+
+        DurableWriter.append(log_file, scanned_history.tail(1).to_csv(header=False, index=False))
+        _, append_time = timed(lambda: (log_index.refresh(),
+                                        log_index.read(log_index.positions_for_id(transaction_id))))
+
+    print(f"\n//////////////////// Audit Log Queries: {args.rows:,}-row update log ({size / 2 ** 20:.0f} MB) "
+          f"////////////////////")
+    print(f"{'history of one transaction':<34}full scan {scan_history_time:>6.2f} s   indexed "
+          f"{history_time * 1e3:>7.1f} ms ({len(history)} rows)")
+    print(f"{'one day of events':<34}full scan {scan_events_time:>6.2f} s   indexed "
+          f"{events_time * 1e3:>7.1f} ms ({len(events)} rows)")
+    print(f"{'first index build':<34}{build_time:>16.2f} s")
+    print(f"{'loading the saved index':<34}{load_time * 1e3:>15.1f} ms")
+    print(f"{'refresh after an append + lookup':<34}{append_time * 1e3:>15.1f} ms")
+    matches = (history["transaction_id"].tolist() == scanned_history["transaction_id"].tolist()
+               and sorted(events["logged_at"]) == sorted(scanned_events["logged_at"]))
+    print("Results match." if matches else "FAILED: the results differ")
+    return 0 if matches else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
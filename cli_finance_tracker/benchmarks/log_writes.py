@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+# Imported first: it puts the program's modules on the import path.
+import synthetic_ledger  # noqa: F401
+from durable_writer import DurableWriter
+from csv_manager import CSVManager
+
+def main(argv=None):
+    """
+    Audit log write benchmark: times appending update log events through DurableWriter in each durability mode.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 if every mode wrote every event, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks/log_writes.py",
+                                     description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--events", type=int, default=20_000, help="Number of log events per mode")
+    parser.add_argument("--modes", nargs="+", default=DurableWriter.DURABILITY_MODES,
+                        choices=DurableWriter.DURABILITY_MODES, help="Durability modes to compare")
+    args = parser.parse_args(argv)
+
+    config = CSVManager.CSV_FILES_DICT[3]
+    entry = {"timestamp": CSVManager.get_current_time(), "update_type": "updated", "field_update": "amount",
+             "success": True, "old_value": 5.0, "new_value": 7.0}
+    rates = {}
+    complete = True
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory(prefix="ledger_logs_") as directory:
+            log_file = os.path.join(directory, config["csv_file"])
+            DurableWriter.DURABILITY = mode
+            start = time.perf_counter()
+            for transaction_id in range(args.events):
+                DurableWriter.append_logs(log_file, config["columns"], [dict(entry, transaction_id=transaction_id)])
+            DurableWriter.flush_logs()
+            rates[mode] = args.events / (time.perf_counter() - start)
+            with open(log_file) as log:
+                complete = complete and sum(1 for _ in log) == args.events
+
+    print(f"\n//////////////////// Audit Log Writes: {args.events:,} events ////////////////////")
+    for mode, rate in rates.items():
+        print(f"{mode:<12}{rate:>12,.0f} events/s")
+    return 0 if complete else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
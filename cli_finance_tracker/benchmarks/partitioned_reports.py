@@ -0,0 +1,103 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# The benchmarks import the program's modules, which live in the parent directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage_backends import PartitionedBackend
+from transaction_store import TransactionStore
+from parallel_reports import ParallelReports
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def main(argv=None):
+    """
+    Scaling benchmark for the partitioned reports: builds a synthetic partitioned ledger in a temporary directory and
+    times an expense report and a one-year date range query with 1, 2, 4 and 8 worker processes, next to a single
+    process pandas pass over the whole ledger.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 if every worker count returned the same results as the single process pass, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks/partitioned_reports.py",
+                                     description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic transactions")
+    parser.add_argument("--years", type=int, default=8, help="Years of transactions, starting in 2017")
+    parser.add_argument("--period", default="year", choices=["year", "month"], help="Span of one partition")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker counts to time")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="ledger_partitions_")
+    columns = ["transaction_id", "date", "category", "amount", "description"]
+    csv_file = os.path.join(directory, "finance_data.csv")
+    try:
+        generator = np.random.default_rng(1)
+        first_day = TransactionStore.date_ordinal("01-01-2017")
+        days = generator.integers(first_day, first_day + 365 * args.years, args.rows)
+        ledger = pd.DataFrame({
+            "transaction_id": np.arange(1, args.rows + 1),
+            "date": pd.to_datetime(days, unit="D").strftime(TransactionStore.DATE_FORMAT),
+            "category": np.where(generator.random(args.rows) < 0.5, "Income", "Expense"),
+            "amount": generator.integers(100, 100_000, args.rows) / 100,
+            "description": generator.choice([f"Payee {number}" for number in range(500)], args.rows)
+        })
+        PartitionedBackend.PERIOD = args.period
+        store = TransactionStore(csv_file, columns, "partitioned")
+        store.backend.write(ledger)
+        partitions = len(store.backend.partitions())
+        start_date, end_date = datetime(2020, 1, 1), datetime(2020, 12, 31)
+
+        start = time.perf_counter()
+        df = store.backend.read()
+        read_time = time.perf_counter() - start
+        start = time.perf_counter()
+        expenses = df[df["category"] == "Expense"]
+        expected_report = expenses["amount"].groupby(expenses["description"].str.lower()).sum()
+        report_time = time.perf_counter() - start
+        start = time.perf_counter()
+        days = TransactionStore.date_ordinals(df["date"])
+        expected_range = len(df[(days >= store.day_ordinal(start_date)) & (days <= store.day_ordinal(end_date))])
+        range_time = time.perf_counter() - start
+        timings = [("1 process, full read", read_time + report_time, read_time + range_time)]
+
+        problems = 0
+        for workers in args.workers:
+            ParallelReports.WORKERS = workers
+            # Start the workers before timing, as a long-running process would have.
+            ParallelReports.executor().submit(int).result()
+            start = time.perf_counter()
+            report = ParallelReports.description_totals(store, "Expense")
+            report_time = time.perf_counter() - start
+            start = time.perf_counter()
+            range_rows = ParallelReports.date_range(store, start_date, end_date)
+            range_time = time.perf_counter() - start
+            timings.append((f"{workers} workers", report_time, range_time))
+            if not np.allclose(report.to_numpy(), expected_report.sort_index().to_numpy()) or \
+                    len(range_rows) != expected_range:
+                problems += 1
+        ParallelReports.shutdown()
+    finally:
+        shutil.rmtree(directory)
+
+    print(f"\n//////////////////// Partitioned Reports: {args.rows:,} rows, {partitions} {args.period} partitions, "
+          f"{os.cpu_count()} CPUs ////////////////////")
+    print(f"{'':<24}{'expense report':>16}{'1-year query':>16}")
+    for label, report_time, range_time in timings:
+        print(f"{label:<24}{report_time:>14.2f} s{range_time:>14.2f} s")
+    print("Results match the single process pass." if not problems else f"FAILED: {problems} worker counts differ")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
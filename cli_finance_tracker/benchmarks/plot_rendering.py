@@ -0,0 +1,85 @@
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+# The benchmarks import the program's modules, which live in the parent directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_manager import ReportManager
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def main(argv=None):
+    """
+    Render-time benchmark for ReportManager.plot_transactions: renders synthetic ledgers spread over several years to
+    an image file, once through plot_transactions and once plotting every daily total with markers, as it used to, and
+    reports the time and the number of points drawn by each.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0
+    """
+    parser = argparse.ArgumentParser(prog="benchmarks/plot_rendering.py",
+                                     description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Numbers of synthetic transactions to plot")
+    parser.add_argument("--years", type=int, default=10, help="Years of transactions, starting in 2015")
+    parser.add_argument("--format", default="png", choices=["png", "svg"], help="Image format to render")
+    args = parser.parse_args(argv)
+
+    # Imported here so importing the menu does not load matplotlib.
+    from matplotlib.figure import Figure
+
+    def plot_every_day(df, output_file):
+        grouped = df.groupby(["date", "category"])["amount"].sum().reset_index().set_index("date")
+        figure = Figure(figsize=(10, 6))
+        axes = figure.add_subplot()
+        for category, color in (("Income", "green"), ("Expense", "red")):
+            rows = grouped[grouped["category"] == category]
+            axes.plot(rows.index, rows["amount"], "o-", label=category, color=color)
+        axes.legend()
+        axes.grid(True)
+        figure.savefig(output_file)
+        return len(grouped)
+
+    generator = np.random.default_rng(1)
+    timings = []
+    with tempfile.TemporaryDirectory(prefix="plot_benchmark_") as directory:
+        output_file = os.path.join(directory, f"plot.{args.format}")
+        # Render once before timing, so the first measurement does not include loading fonts.
+        Figure().savefig(output_file)
+        for rows in args.rows:
+            days = generator.integers(0, 365 * args.years, rows)
+            df = pd.DataFrame({
+                "date": pd.Timestamp("2015-01-01") + pd.to_timedelta(days, unit="D"),
+                "category": np.where(generator.random(rows) < 0.5, "Income", "Expense"),
+                "amount": generator.integers(100, 100_000, rows) / 100
+            })
+            start = time.perf_counter()
+            every_day_points = plot_every_day(df, output_file)
+            every_day = time.perf_counter() - start
+            start = time.perf_counter()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                ReportManager.plot_transactions(df, output_file)
+            resampled = time.perf_counter() - start
+            series, _ = ReportManager.resample(df)
+            points = sum(len(ReportManager.decimate(part, ReportManager.MAX_PLOT_POINTS)) for part in series.values())
+            timings.append((rows, every_day, every_day_points, resampled, points))
+
+    print(f"\n//////////////////// Plot Rendering: {args.years} years, {args.format.upper()} ////////////////////")
+    print(f"{'rows':>12}{'every day':>14}{'points':>9}{'resampled':>14}{'points':>9}")
+    for rows, every_day, every_day_points, resampled, points in timings:
+        print(f"{rows:>12,}{every_day:>12.2f} s{every_day_points:>9,}{resampled:>12.2f} s{points:>9,}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import os
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.dirname(BENCHMARKS_DIR)
+# The benchmarks import the program's modules, which live in the parent directory.
+sys.path.insert(0, PACKAGE_DIR)
+
+from user_entry_manager import UserEntryManager
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+COLUMNS = ["transaction_id", "date", "category", "amount", "description"]
+
+
+def synthetic_ledger(rows, descriptions=5000, years=8, seed=1):
+    """
+    Builds random transaction records for the benchmarks.
+
+    Args:
+        rows (int): Number of transactions.
+        descriptions (int): Number of distinct descriptions ("Payee 0", "Payee 1", ...).
+        years (int): Years of transactions, starting in 2017.
+        seed (int): Seed of the random generator, so every run gets the same ledger.
+
+    Returns:
+        pd.DataFrame: The records with transaction IDs 1 to rows, in the form the storage backends return.
+    """
+    generator = np.random.default_rng(seed)
+    days = pd.Timestamp(2017, 1, 1) + pd.to_timedelta(generator.integers(0, 365 * years, rows), unit="D")
+    payees = np.array([f"Payee {number}" for number in range(descriptions)], dtype=object)
+    return pd.DataFrame({
+        "transaction_id": np.arange(1, rows + 1),
+        "date": days.strftime(UserEntryManager.DATE_FORMAT),
+        "category": np.where(generator.random(rows) < 0.5, "Income", "Expense"),
+        "amount": generator.integers(100, 100_000, rows) / 100,
+        "description": payees.take(generator.integers(0, descriptions, rows))
+    })
+
+
+def write_ledger(directory, rows, **options):
+    """
+    Writes a synthetic finance_data.csv to a directory, where CSVManager finds it when run from that directory.
+
+    Args:
+        directory (str): The ledger directory.
+        rows (int): Number of transactions.
+        **options: Further arguments of synthetic_ledger.
+
+    Returns:
+        str: Path of the CSV file.
+    """
+    csv_file = os.path.join(directory, "finance_data.csv")
+    synthetic_ledger(rows, **options).to_csv(csv_file, index=False)
+    return csv_file
@@ -0,0 +1,406 @@
+import argparse
+import shlex
+import sys
+from datetime import datetime, timedelta
+from user_entry_manager import UserEntryManager
+from csv_manager import CSVManager
+from report_manager import ReportManager
+from durable_writer import DurableWriter
+from streaming_reports import StreamingReports
+
+
+class CommandLine:
+    """
+    Non-interactive front end with one subcommand per operation, for scripts, cron jobs and pipelines.
+
+    Every subcommand reuses the CSVManager operations of the interactive menu. The batch subcommand reads one
+    subcommand per line from a file or stdin and runs them all against the same in-memory store, so the ledger is only
+    loaded once per batch.
+
+    Attributes:
+        LOG_CHOICES (dict): Index in CSVManager.CSV_FILES_DICT keyed by the name used on the command line.
+    """
+
+    LOG_CHOICES = {
+        "transactions": 0,
+        "new": 1,
+        "delete": 2,
+        "update": 3
+    }
+
+    @classmethod
+    def build_parser(cls):
+        """
+        Builds the argument parser with all subcommands.
+
+        Returns:
+            argparse.ArgumentParser: The parser.
+        """
+        parser = argparse.ArgumentParser(prog="run.py", description="Command-line personal finance manager. "
+                                                                    "Run without arguments for the interactive menu.")
+        parser.add_argument("--durability", choices=DurableWriter.DURABILITY_MODES,
+                            help="fsync every write, write every log event straight away (default), or batch log "
+                                 "events; see DurableWriter.DURABILITY")
+        commands = parser.add_subparsers(dest="command", required=True)
+
+        add = commands.add_parser("add", help="Add a new transaction")
+        add.add_argument("--date", default="", help="Transaction date (mm-dd-yyyy), defaults to today")
+        add.add_argument("--amount", required=True, help="Transaction amount")
+        add.add_argument("--category", required=True, help="'I'/'Income' or 'E'/'Expense'")
+        add.add_argument("--description", default="", help="Optional description")
+
+        query = commands.add_parser("query", help="List transactions and their summary within a date range")
+        query.add_argument("start_date", help="Start date (mm-dd-yyyy)")
+        query.add_argument("end_date", help="End date (mm-dd-yyyy)")
+        query.add_argument("--plot", metavar="FILE", help="Also save a plot of the transactions to FILE (.png, .svg)")
+        cls.add_streaming(query)
+
+        update = commands.add_parser("update", help="Update one field of a transaction")
+        update.add_argument("transaction_id", type=int)
+        update.add_argument("field", choices=CSVManager.UPDATE_FIELD_CHOICES)
+        update.add_argument("value")
+
+        delete = commands.add_parser("delete", help="Delete a transaction")
+        delete.add_argument("transaction_id", type=int)
+
+        bulk_update = commands.add_parser("bulk-update", help="Update one field of every transaction matching the "
+                                                              "conditions")
+        bulk_update.add_argument("field", choices=CSVManager.UPDATE_FIELD_CHOICES)
+        bulk_update.add_argument("value")
+        cls.add_conditions(bulk_update)
+
+        bulk_delete = commands.add_parser("bulk-delete", help="Delete every transaction matching the conditions")
+        cls.add_conditions(bulk_delete)
+
+        summary = commands.add_parser("summary", help="Summary balance, optionally within a date range")
+        summary.add_argument("start_date", nargs="?", help="Start date (mm-dd-yyyy)")
+        summary.add_argument("end_date", nargs="?", help="End date (mm-dd-yyyy)")
+        cls.add_streaming(summary)
+
+        report = commands.add_parser("report", help="Income or expense report grouped by description")
+        report.add_argument("report_type", choices=["income", "expense"])
+        cls.add_streaming(report)
+
+        logs = commands.add_parser("logs", help="View the transaction records or a log")
+        logs.add_argument("log", choices=list(cls.LOG_CHOICES))
+        logs.add_argument("--tail", type=cls.non_negative_int, help="Only show the last N entries")
+        logs.add_argument("--page-size", type=int, help="Rows per page")
+
+        history = commands.add_parser("history", help="Show every log entry about a transaction")
+        history.add_argument("transaction_id", type=int)
+
+        events = commands.add_parser("events", help="Show the log entries written within a time window")
+        events.add_argument("start", help="Start time (ISO-8601, e.g. 2024-03-01 or 2024-03-01T09:30)")
+        events.add_argument("end", nargs="?", help="End time (ISO-8601), defaults to now. A date alone covers the day")
+
+        as_of = commands.add_parser("asof", help="Rebuild the transaction records as they were at a past time")
+        as_of.add_argument("moment", help="Time (ISO-8601). A date alone stands for the end of that day")
+        as_of.add_argument("--export", metavar="FILE", help="Write the rebuilt records to a CSV file")
+
+        undo = commands.add_parser("undo", help="Undo the last operations")
+        undo.add_argument("count", nargs="?", type=int, default=1,
+                          help="Number of operations to undo (default 1). An operation is one add, update or delete, "
+                               "or one whole bulk-update, bulk-delete or import")
+
+        commands.add_parser("snapshot", help="Save a snapshot of the transaction records for point-in-time views")
+
+        import_parser = commands.add_parser("import", help="Import transactions from a bank export CSV file")
+        import_parser.add_argument("file")
+
+        export = commands.add_parser("export", help="Export the transaction records to a CSV file")
+        export.add_argument("file")
+
+        commands.add_parser("compact", help="Fold the journal of updates and deletes into the transaction records")
+        commands.add_parser("check", help="Rebuild the summary aggregates, report any drift and check for duplicate "
+                                          "transaction IDs")
+        commands.add_parser("migrate", help="Import the transaction records and logs into finance_data.sqlite3")
+
+        batch = commands.add_parser("batch", help="Run one subcommand per line from a file or stdin")
+        batch.add_argument("file", nargs="?", help="File with one subcommand per line, defaults to stdin")
+
+        serve = commands.add_parser("serve", help="Keep the ledger in memory and serve requests on a Unix socket")
+        serve.add_argument("--socket", help="Path of the socket, defaults to finance_ledger.sock")
+        return parser
+
+    @classmethod
+    def run(cls, argv):
+        """
+        Parses and runs one command line.
+
+        Args:
+            argv (list of str): Arguments after the program name.
+
+        Returns:
+            int: 0 on success, 1 if the command failed validation or a change could not be made.
+        """
+        args = cls.build_parser().parse_args(argv)
+        if args.durability:
+            DurableWriter.DURABILITY = args.durability
+        if args.command != "migrate":
+            CSVManager.initialize_csv(verbose=False)
+        try:
+            return cls.execute(args)
+        finally:
+            DurableWriter.flush_logs()
+
+    @classmethod
+    def execute(cls, args):
+        """
+        Runs one parsed command.
+
+        Args:
+            args (argparse.Namespace): The parsed command.
+
+        Returns:
+            int: 0 on success, 1 if the command failed validation or a change could not be made.
+        """
+        try:
+            if args.command == "add":
+                transaction_id = CSVManager.add_entry(UserEntryManager.validate_date(args.date, allow_default=True),
+                                                      UserEntryManager.validate_amount(args.amount),
+                                                      UserEntryManager.validate_category(args.category),
+                                                      args.description)
+                return 1 if transaction_id is None else 0
+            elif args.command == "query":
+                with cls.streaming(args):
+                    df = CSVManager.get_transactions(UserEntryManager.validate_date(args.start_date),
+                                                     UserEntryManager.validate_date(args.end_date))
+                # The ledger server builds its own arguments without a plot file.
+                if getattr(args, "plot", None):
+                    if df is None:
+                        print("\nStreamed queries are not plotted.")
+                    else:
+                        ReportManager.plot_transactions(df, args.plot)
+            elif args.command == "update":
+                if not CSVManager.verify_transaction_id(args.transaction_id):
+                    return 1
+                new_value = UserEntryManager.validate_field(args.field, args.value)
+                return 0 if CSVManager.update_transactions(args.transaction_id, args.field, new_value) else 1
+            elif args.command == "delete":
+                if not CSVManager.verify_transaction_id(args.transaction_id):
+                    return 1
+                return 0 if CSVManager.delete_transaction(args.transaction_id) else 1
+            elif args.command == "bulk-update":
+                updated = CSVManager.bulk_update(args.field, UserEntryManager.validate_field(args.field, args.value),
+                                                 **cls.conditions(args))
+                return 1 if updated is None else 0
+            elif args.command == "bulk-delete":
+                return 1 if CSVManager.bulk_delete(**cls.conditions(args)) is None else 0
+            elif args.command == "summary":
+                with cls.streaming(args):
+                    if args.start_date:
+                        end_date = args.end_date or datetime.today().strftime(UserEntryManager.DATE_FORMAT)
+                        CSVManager.range_summary(UserEntryManager.validate_date(args.start_date),
+                                                 UserEntryManager.validate_date(end_date))
+                    else:
+                        CSVManager.ledger_summary()
+            elif args.command == "report":
+                with cls.streaming(args):
+                    CSVManager.expense_income_report(args.report_type)
+            elif args.command == "logs":
+                index = cls.LOG_CHOICES[args.log]
+                if args.tail is not None:
+                    print(CSVManager.tail_records(index, args.tail).to_string(index=False))
+                else:
+                    CSVManager.view_records(index, page_size=args.page_size, interactive=False)
+            elif args.command == "history":
+                CSVManager.transaction_history(args.transaction_id)
+            elif args.command == "events":
+                end = cls.parse_moment(args.end, end=True) if args.end else datetime.now().replace(microsecond=0)
+                CSVManager.log_events(cls.parse_moment(args.start), end)
+            elif args.command == "asof":
+                CSVManager.ledger_as_of(cls.parse_moment(args.moment, end=True), args.export)
+            elif args.command == "undo":
+                if args.count < 1:
+                    raise ValueError("the number of operations to undo must be at least 1")
+                return 1 if CSVManager.undo_operations(args.count) is None else 0
+            elif args.command == "snapshot":
+                return 0 if CSVManager.snapshot_ledger() else 1
+            elif args.command == "import":
+                return 1 if CSVManager.import_transactions(args.file) is None else 0
+            elif args.command == "export":
+                CSVManager.export_transactions(args.file)
+            elif args.command == "compact":
+                return 0 if CSVManager.compact_ledger() else 1
+            elif args.command == "check":
+                CSVManager.check_aggregates()
+                return 0 if CSVManager.check_transaction_ids() else 1
+            elif args.command == "migrate":
+                return 0 if CSVManager.migrate_to_sqlite() else 1
+            elif args.command == "batch":
+                return cls.run_batch(args.file)
+            elif args.command == "serve":
+                # Imported here because the server runs its requests through this class.
+                from ledger_server import LedgerServer
+                try:
+                    LedgerServer(args.socket).serve()
+                except RuntimeError as e:
+                    print(f"\n{e}")
+                    return 1
+        except ValueError as e:
+            print(f"\nInvalid value: {e}")
+            return 1
+        return 0
+
+    @staticmethod
+    def non_negative_int(text):
+        """
+        Argument type for counts that may be zero but not negative.
+
+        Args:
+            text (str): The argument as given on the command line.
+
+        Returns:
+            int: The count.
+
+        Raises:
+            argparse.ArgumentTypeError: If the argument is not an integer of at least 0.
+        """
+        try:
+            value = int(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid int value: '{text}'")
+        if value < 0:
+            raise argparse.ArgumentTypeError(f"must not be negative: {value}")
+        return value
+
+    @staticmethod
+    def add_streaming(parser):
+        """
+        Adds the options of the reports that can stream the ledger instead of loading it.
+
+        Args:
+            parser (argparse.ArgumentParser): The subcommand's parser.
+
+        Returns:
+            None
+        """
+        parser.add_argument("--stream", action="store_true",
+                            help="Read the ledger one chunk at a time, for ledgers larger than memory")
+        parser.add_argument("--chunk-size", type=int, metavar="ROWS",
+                            help=f"Rows per chunk when streaming (default {StreamingReports.CHUNK_SIZE:,})")
+
+    @staticmethod
+    def streaming(args):
+        """
+        Args:
+            args (argparse.Namespace): A parsed query, summary or report command. The ledger server builds its own
+                arguments without the streaming options.
+
+        Returns:
+            contextmanager: StreamingReports configured with the command's options while the command runs.
+
+        Raises:
+            ValueError: If the chunk size is not positive.
+        """
+        chunk_size = getattr(args, "chunk_size", None)
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("the chunk size must be at least 1")
+        return StreamingReports.configured(getattr(args, "stream", False) or None, chunk_size)
+
+    @staticmethod
+    def add_conditions(parser):
+        """
+        Adds the options selecting the transactions of a bulk update or delete. At least one has to be given.
+
+        Args:
+            parser (argparse.ArgumentParser): The subcommand's parser.
+
+        Returns:
+            None
+        """
+        parser.add_argument("--ids", type=int, nargs="+", metavar="ID", help="Only these transaction IDs")
+        parser.add_argument("--from", dest="start_date", help="Only transactions on or after this date (mm-dd-yyyy)")
+        parser.add_argument("--to", dest="end_date", help="Only transactions on or before this date (mm-dd-yyyy)")
+        parser.add_argument("--category", help="Only this category ('I'/'Income' or 'E'/'Expense')")
+        parser.add_argument("--description", metavar="PATTERN",
+                            help="Only descriptions containing this regular expression, ignoring case")
+
+    @staticmethod
+    def conditions(args):
+        """
+        Validates the condition options of a bulk update or delete.
+
+        Args:
+            args (argparse.Namespace): The parsed command.
+
+        Returns:
+            dict: The conditions, see TransactionStore.CONDITIONS.
+
+        Raises:
+            ValueError: If a condition is not valid or none was given.
+        """
+        conditions = {
+            "ids": args.ids,
+            "start_date": args.start_date and UserEntryManager.validate_date(args.start_date),
+            "end_date": args.end_date and UserEntryManager.validate_date(args.end_date),
+            "category": args.category and UserEntryManager.validate_category(args.category),
+            "description": args.description
+        }
+        if all(value is None for value in conditions.values()):
+            raise ValueError("give at least one of --ids, --from, --to, --category and --description")
+        return conditions
+
+    @staticmethod
+    def parse_moment(value, end=False):
+        """
+        Parses a time given on the command line, as local time unless it has a UTC offset.
+
+        Args:
+            value (str): An ISO-8601 date or date and time.
+            end (bool): The time ends a window, so a date alone stands for the last second of that day.
+
+        Returns:
+            datetime: The parsed time.
+
+        Raises:
+            ValueError: If the time is not ISO-8601.
+        """
+        moment = datetime.fromisoformat(value)
+        if end and len(value.strip()) == 10:
+            moment += timedelta(days=1, seconds=-1)
+        return moment
+
+    @classmethod
+    def run_batch(cls, batch_file):
+        """
+        Runs one subcommand per line. Blank lines and lines starting with '#' are skipped, and a failing line does not
+        stop the batch.
+
+        Args:
+            batch_file (str): File with one subcommand per line, or None to read stdin.
+
+        Returns:
+            int: 0 if every line succeeded, 1 otherwise.
+        """
+        parser = cls.build_parser()
+        try:
+            lines = open(batch_file) if batch_file else sys.stdin
+        except OSError as e:
+            print(f"\nCould not read the batch file: {e}")
+            return 1
+        failures = 0
+        executed = 0
+        try:
+            for line_number, line in enumerate(lines, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    args = parser.parse_args(shlex.split(line))
+                except (SystemExit, ValueError):
+                    print(f"\nLine {line_number}: could not parse '{line}'")
+                    failures += 1
+                    continue
+                if args.command in ("batch", "serve"):
+                    print(f"\nLine {line_number}: '{args.command}' cannot be used in a batch")
+                    failures += 1
+                    continue
+                failures += cls.execute(args)
+                executed += 1
+        finally:
+            if batch_file:
+                lines.close()
+
+        print(f"\nBatch complete: {executed} commands run, {failures} failed.")
+        return 1 if failures else 0
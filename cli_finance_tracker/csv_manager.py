@@ -1,6 +1,19 @@
-import pandas as pd
-import csv
-from datetime import datetime
+import io
+import os
+import time
+from datetime import datetime, timedelta
+from user_entry_manager import UserEntryManager
+from transaction_store import TransactionStore
+from durable_writer import DurableWriter
+from audit_log import AuditLog
+from ledger_history import LedgerHistory
+from storage_backends import CSVBackend, SQLiteBackend
+from parallel_reports import ParallelReports
+from streaming_reports import CategoryTotals, StreamingReports
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
 
 
 class CSVManager:
@@ -8,15 +21,26 @@ class CSVManager:
     Manages CSV files related to financial transactions and logs various updates.
 
     Attributes:
-        CSV_FILES_DICT (list of dict): Configuration of CSV files with their names, paths, and columns.
+        CSV_FILES_DICT (list of dict): Configuration of CSV files with their names, paths, and columns. The transaction
+            records also name their storage backend ("csv", "numpy", "sqlite" or "partitioned", see
+            storage_backends.BACKENDS).
+            With "sqlite" the three logs are stored as tables in the same database instead of their CSV files.
+            Every log row records when it was written in both the legacy timestamp and the ISO-8601 logged_at column,
+            see audit_log.AuditLog.
         MODIFICATIONS (list of str): Types of modifications that can be logged.
         FORMAT (str): Date format used for date columns.
         UPDATE_FIELD_CHOICES (list of str): Fields that can be updated in transactions.
+        ID_SEQUENCE_FILE (str): Sidecar file holding the transaction ID high-water mark.
+        IMPORT_CHUNK_SIZE (int): Number of rows read, validated and appended per batch when importing.
+        VIEW_PAGE_SIZE (int): Number of rows shown per page when viewing records and logs.
+        UNDO (str): update_type of the log rows written when operations are undone.
+        LOG_OPERATIONS (dict): LedgerHistory operation of the rows of each log, keyed by index in CSV_FILES_DICT.
     """
     CSV_FILES_DICT = [
         {
             "name": "transaction records",
             "csv_file": "finance_data.csv",
+            "backend": "csv",
             "columns": [
                 "transaction_id",
                 "date",
@@ -33,7 +57,8 @@ class CSVManager:
                 "transaction_id",
                 "update_type",
                 "success",
-                "message"
+                "message",
+                "logged_at"
             ]
         },
         {
@@ -48,7 +73,8 @@ class CSVManager:
                 "del_record_date",
                 "del_record_category",
                 "del_record_amount",
-                "del_record_description"
+                "del_record_description",
+                "logged_at"
             ]
         },
         {
@@ -61,7 +87,8 @@ class CSVManager:
                 "field_update",
                 "success",
                 "old_value",
-                "new_value"
+                "new_value",
+                "logged_at"
             ]
         }
     ]
@@ -69,31 +96,158 @@ class CSVManager:
     MODIFICATIONS = ["updated", "deleted", "new entry"]
     FORMAT = "%m-%d-%Y"
     UPDATE_FIELD_CHOICES = ["date", "category", "amount", "description"]
+    ID_SEQUENCE_FILE = "transaction_id.seq"
+    IMPORT_CHUNK_SIZE = 100_000
+    VIEW_PAGE_SIZE = 50
+    UNDO = "undo"
+    LOG_OPERATIONS = {
+        1: LedgerHistory.ADDED,
+        2: LedgerHistory.DELETED,
+        3: LedgerHistory.UPDATED
+    }
 
     @classmethod
-    def initialize_csv(cls):
+    def initialize_csv(cls, verbose=True):
         """
         Initializes CSV files if they do not already exist by creating empty files with the appropriate columns.
 
+        Existing files are checked by reading their header line only, so start-up time does not grow with the ledger.
+        Empty files are recreated with their header, and logs written before a column was added are upgraded with
+        upgrade_log. Log tables in the SQLite database get their new columns and indexes the same way.
+
+        Args:
+            verbose (bool): If False, only report files that had to be created.
+
         Returns:
             None
         """
+        backend = cls.store().backend
+        if cls.logs_in_database():
+            if not backend.exists():
+                cls.migrate_to_sqlite()
+            for config in cls.CSV_FILES_DICT[1:]:
+                backend.create_log(config["csv_file"], config["columns"])
+                backend.backfill_log(config["csv_file"], "logged_at", "timestamp", AuditLog.backfill)
+            return
+        if cls.CSV_FILES_DICT[0]["backend"] != "csv" and not backend.exists():
+            backend.create()
+            print(f"Initialized {cls.CSV_FILES_DICT[0]['backend']} storage for {cls.CSV_FILES_DICT[0]['csv_file']}")
+
         for config in cls.CSV_FILES_DICT:
             csv_file = config["csv_file"]
             columns = config["columns"]
-            try:
-                pd.read_csv(csv_file)
-                print(f"Successfully read {csv_file}")
-            except FileNotFoundError:
-                df = pd.DataFrame(columns=columns)
-                df.to_csv(csv_file, index=False)
+            if config.get("backend", "csv") != "csv":
+                continue
+            if not os.path.exists(csv_file) or os.path.getsize(csv_file) == 0:
+                CSVBackend(csv_file, columns).create()
                 print(f"Initialized CSV file: {csv_file}")
+                continue
+
+            with open(csv_file, newline="") as file:
+                header = file.readline().strip()
+            if header != ",".join(columns) and columns[:len(header.split(","))] == header.split(","):
+                try:
+                    cls.upgrade_log(config)
+                    print(f"Upgraded {csv_file} with columns: {', '.join(columns[len(header.split(',')):])}")
+                except Exception as e:
+                    print(f"Warning: failed to upgrade {csv_file}. Error {e}")
+            elif header != ",".join(columns):
+                print(f"Warning: {csv_file} has unexpected columns: {header}")
+            elif verbose:
+                print(f"Successfully read {csv_file}")
+
+    @classmethod
+    def upgrade_log(cls, config):
+        """
+        Rewrites a log CSV file written before columns were added to it, with the missing columns. logged_at is
+        backfilled from each row's legacy timestamp, so old rows can be found by time like new ones.
+
+        Args:
+            config (dict): The log's entry in CSV_FILES_DICT.
+
+        Returns:
+            None
+        """
+        # Read by position rather than by header, as rows appended since the columns were added already have them.
+        DurableWriter.flush_logs()
+        log = pd.read_csv(config["csv_file"], header=None, names=config["columns"], skiprows=1, dtype=str,
+                          keep_default_na=False).fillna("")
+        missing = (log["logged_at"] == "").to_numpy()
+        if missing.any():
+            log.loc[missing, "logged_at"] = AuditLog.backfill(log["timestamp"][missing])
+        DurableWriter.atomic_replace(config["csv_file"], lambda file: log.to_csv(file, index=False))
+
+    @classmethod
+    def logs_in_database(cls):
+        """
+        Returns:
+            bool: True if the logs are stored in the SQLite database along with the transaction records.
+        """
+        return cls.CSV_FILES_DICT[0]["backend"] == "sqlite"
+
+    @classmethod
+    def migrate_to_sqlite(cls):
+        """
+        Imports the transaction records and the three log CSV files into the SQLite database, replacing its contents.
+
+        The CSV records are read with their journal replayed. A non-empty journal is then compacted into the CSV file,
+        so it is not replayed again on top of the database. The CSV files are kept otherwise unchanged.
+
+        Returns:
+            bool: True if the migration succeeded.
+        """
+        config = cls.CSV_FILES_DICT[0]
+        start_time = time.perf_counter()
+        try:
+            csv_store = TransactionStore(config["csv_file"], config["columns"], "csv")
+            database = SQLiteBackend(config["csv_file"], config["columns"])
+            with csv_store.locked():
+                database.create()
+                if csv_store.backend.exists():
+                    records = csv_store.frame()
+                    if csv_store.read_journal():
+                        csv_store.compact()
+                else:
+                    records = pd.DataFrame(columns=config["columns"]).astype(CSVBackend.DTYPES)
+                database.write(records)
+                print(f"\nImported {len(records)} transaction records into {database.database_file}")
+
+                for log_config in cls.CSV_FILES_DICT[1:]:
+                    if os.path.exists(log_config["csv_file"]) and os.path.getsize(log_config["csv_file"]):
+                        DurableWriter.flush_logs()
+                        log = pd.read_csv(log_config["csv_file"], dtype=str, keep_default_na=False)
+                        log = log.reindex(columns=log_config["columns"]).fillna("")
+                    else:
+                        log = pd.DataFrame(columns=log_config["columns"])
+                    database.write_log(log_config["csv_file"], log_config["columns"], log)
+                    print(f"Imported {len(log)} {log_config['name']}")
+            TransactionStore._stores.pop(config["csv_file"], None)
+        except Exception as e:
+            print(f"\nFailed to migrate to SQLite: Error: {e}")
+            return False
+
+        print(f"Migration took {time.perf_counter() - start_time:.2f} seconds")
+        return True
+
+    @classmethod
+    def store(cls):
+        """
+        Returns the in-memory store shared by all operations on the transaction records.
+
+        Returns:
+            TransactionStore: The store for the transaction records CSV file.
+        """
+        config = cls.CSV_FILES_DICT[0]
+        return TransactionStore.open(config["csv_file"], config["columns"], config["backend"])
 
     @classmethod
     def add_entry(cls, date, amount, category, description):
         """
         Adds a new transaction entry to the transaction records CSV file.
 
+        The ID is assigned and the entry appended while holding the ledger lock, so concurrent processes never assign
+        the same ID.
+
         Args:
             date (str): The date of the transaction.
             amount (float): The amount of the transaction.
@@ -101,39 +255,216 @@ class CSVManager:
             description (str): A description of the transaction.
 
         Returns:
-            None
+            int: The new transaction ID, or None if the entry could not be added.
         """
         try:
-            df = pd.read_csv(cls.CSV_FILES_DICT[0]["csv_file"])
-            if df.empty:
-                transaction_id = 1
-            else:
-                transaction_id = df["transaction_id"].max() + 1
-
-            new_entry = {
-                "transaction_id": transaction_id,
-                "date": date,
-                "amount": amount,
-                "category": category,
-                "description": description
-            }
-
-            with open(cls.CSV_FILES_DICT[0]["csv_file"], "a", newline="") as csv_file:
-                csv_write = csv.DictWriter(csv_file, fieldnames=cls.CSV_FILES_DICT[0]["columns"])
-                csv_write.writerow(new_entry)
-
+            store = cls.store()
+            with store.locked():
+                transaction_id = cls.next_transaction_id()
+
+                new_entry = {
+                    "transaction_id": transaction_id,
+                    "date": date,
+                    "amount": amount,
+                    "category": category,
+                    "description": description
+                }
+
+                store.append(new_entry)
+                cls.write_id_sequence(transaction_id)
             print("\nEntry added successfully")
 
             cls.update_new_entry_log(cls.get_current_time(), transaction_id, cls.MODIFICATIONS[2].title(), True,
                                      "Entry added")
+            return transaction_id
         except Exception as e:
             print(f"\nFailed to add entry: Error: {e}")
 
+    @classmethod
+    def next_transaction_id(cls):
+        """
+        Returns the next transaction ID without parsing the whole transaction records CSV file.
+
+        The high-water mark in ID_SEQUENCE_FILE is trusted when the recorded size and modification time still match
+        the stored records. Otherwise the last record is read and the larger of the two IDs is used, so IDs stay
+        monotonic even after the highest record has been deleted.
+
+        Returns:
+            int: The next unused transaction ID.
+        """
+        last_id, size, mtime_ns = cls.read_id_sequence()
+
+        if (size, mtime_ns) == cls.store().backend.file_signature():
+            return last_id + 1
+        return max(last_id, cls.last_transaction_id()) + 1
+
+    @classmethod
+    def read_id_sequence(cls):
+        """
+        Reads the transaction ID high-water mark and the CSV file size and modification time it was recorded against.
+
+        Returns:
+            tuple: (last_id, size, mtime_ns), or (0, None, None) if the sidecar file is missing or unreadable.
+        """
+        try:
+            with open(cls.ID_SEQUENCE_FILE) as seq_file:
+                last_id, size, mtime_ns = seq_file.read().strip().split(",")
+            return int(last_id), int(size), int(mtime_ns)
+        except (FileNotFoundError, ValueError):
+            return 0, None, None
+
+    @classmethod
+    def write_id_sequence(cls, last_id):
+        """
+        Records the transaction ID high-water mark along with the current size and modification time of the records.
+
+        The sidecar file is replaced atomically, so a crash leaves either the old or the new high-water mark behind,
+        never a partial one.
+
+        Args:
+            last_id (int): The highest transaction ID handed out so far.
+
+        Returns:
+            None
+        """
+        previous_id = cls.read_id_sequence()[0]
+        size, mtime_ns = cls.store().backend.file_signature()
+        content = f"{max(int(last_id), previous_id)},{size},{mtime_ns}\n"
+        DurableWriter.atomic_replace(cls.ID_SEQUENCE_FILE, lambda seq_file: seq_file.write(content))
+
+    @classmethod
+    def last_transaction_id(cls):
+        """
+        Reads the transaction ID of the last stored record without loading the whole ledger.
+
+        Records are only ever appended with increasing IDs, so the last record holds the largest ID still present.
+
+        Returns:
+            int: The last transaction ID, or 0 if there are no records.
+        """
+        return cls.store().backend.last_transaction_id()
+
+    @classmethod
+    def import_transactions(cls, import_file, chunk_size=None):
+        """
+        Imports transactions in bulk from a bank export CSV file without prompting the user.
+
+        The file is streamed in chunks. Each chunk is validated, assigned a contiguous block of transaction IDs and
+        written with one append to the transaction records and one append to the new entry log. The log rows of all
+        chunks share one logged_at value, so undo takes back the whole import as one operation.
+
+        The export must have 'date' and 'amount' columns. 'category' ('Income'/'Expense' or 'I'/'E') and
+        'description' are optional; without a category, negative amounts are imported as expenses and positive
+        amounts as income.
+
+        Args:
+            import_file (str): Path to the CSV file to import.
+            chunk_size (int): Number of rows per batch. Defaults to IMPORT_CHUNK_SIZE.
+
+        Returns:
+            int: The number of imported transactions, or None if the import failed. The chunks written before the
+                failure stay imported.
+        """
+        chunk_size = chunk_size or cls.IMPORT_CHUNK_SIZE
+        imported = 0
+        rejected = 0
+        failed = False
+        start_time = time.perf_counter()
+        logged_at = AuditLog.logged_at()
+
+        try:
+            store = cls.store()
+            for chunk in pd.read_csv(import_file, chunksize=chunk_size, dtype=str, keep_default_na=False):
+                chunk.columns = chunk.columns.str.strip().str.lower()
+                batch, num_rejected = cls.prepare_import_chunk(chunk)
+                rejected += num_rejected
+                if batch.empty:
+                    continue
+
+                with store.locked():
+                    next_id = cls.next_transaction_id()
+                    batch.insert(0, "transaction_id", range(next_id, next_id + len(batch)))
+                    store.append_frame(batch)
+                    cls.write_id_sequence(next_id + len(batch) - 1)
+
+                log = pd.DataFrame({
+                    "timestamp": cls.get_current_time(),
+                    "transaction_id": batch["transaction_id"],
+                    "update_type": cls.MODIFICATIONS[2].title(),
+                    "success": True,
+                    "message": "Entry imported",
+                    "logged_at": logged_at
+                })
+                cls.append_log_frame(1, log)
+                imported += len(batch)
+        except Exception as e:
+            print(f"\nFailed to import transactions: Error: {e}")
+            failed = True
+
+        elapsed = time.perf_counter() - start_time
+        print(f"\nImported {imported} transactions from {import_file}. Rejected {rejected} invalid rows.")
+        if imported:
+            print(f"Import throughput: {imported / elapsed:,.0f} rows/second ({elapsed:.2f} seconds)")
+        return None if failed else imported
+
+    @classmethod
+    def export_transactions(cls, export_file):
+        """
+        Exports the transaction records to a CSV file, whichever storage backend holds them.
+
+        Args:
+            export_file (str): Path of the CSV file to write.
+
+        Returns:
+            None
+        """
+        try:
+            df = cls.store().frame()
+            df.to_csv(export_file, index=False)
+            print(f"\nExported {len(df)} transactions to {export_file}")
+        except Exception as e:
+            print(f"\nFailed to export transactions: Error: {e}")
+
+    @classmethod
+    def prepare_import_chunk(cls, chunk):
+        """
+        Validates and normalizes one chunk of an import file.
+
+        Args:
+            chunk (pd.DataFrame): Raw rows read from the import file, all columns as strings.
+
+        Returns:
+            tuple: (pd.DataFrame of valid rows with date, category, amount and description, number of rejected rows)
+        """
+        # Bank exports repeat the same few thousand dates, so only the distinct strings are parsed and formatted.
+        date_codes, unique_dates = pd.factorize(chunk["date"].str.strip())
+        parsed_dates = pd.to_datetime(pd.Series(unique_dates), format=UserEntryManager.DATE_FORMAT, errors="coerce")
+        valid_dates = pd.Series(date_codes >= 0, index=chunk.index) & parsed_dates.notna().to_numpy().take(date_codes)
+        formatted_dates = parsed_dates.dt.strftime(cls.FORMAT).to_numpy().take(date_codes)
+        amounts = pd.to_numeric(chunk["amount"].str.replace(r"[$,\s]", "", regex=True), errors="coerce").astype(float)
+
+        if "category" in chunk:
+            category_codes = chunk["category"].str.strip().str[:1].str.upper()
+            categories = category_codes.map(UserEntryManager.CATEGORIES)
+        else:
+            categories = pd.Series("Income", index=chunk.index).where(amounts >= 0, "Expense")
+
+        valid = valid_dates & np.isfinite(amounts) & (amounts != 0) & categories.notna()
+        batch = pd.DataFrame({
+            "date": formatted_dates[valid.to_numpy()],
+            "category": categories[valid],
+            "amount": amounts[valid].abs(),
+            "description": chunk["description"][valid].str.strip() if "description" in chunk else ""
+        })
+        return batch, int((~valid).sum())
+
     @classmethod
     def write_to_logs(cls, index_of_file, entry, update_type_index):
         """
         Writes a log entry to the specified log file.
 
+        The entry goes through DurableWriter, which batches and fsyncs log writes according to its DURABILITY setting.
+
         Args:
             index_of_file (int): The index of the CSV_FILES_DICT for the target log file.
             entry (dict): The log entry to be written.
@@ -142,11 +473,50 @@ class CSVManager:
         Returns:
             None
         """
-        with open(cls.CSV_FILES_DICT[index_of_file]["csv_file"], "a", newline="") as csv_file:
-            write_to_csv = csv.DictWriter(csv_file, fieldnames=cls.CSV_FILES_DICT[index_of_file]["columns"])
-            write_to_csv.writerow(entry)
-            print(f"\nUpdated {cls.MODIFICATIONS[update_type_index].title()} Log. Timestamp: {cls.get_current_time()}")
-            print("\n//////////////////// End of Program ////////////////////")
+        cls.append_logs(index_of_file, [entry])
+        print(f"\nUpdated {cls.MODIFICATIONS[update_type_index].title()} Log. Timestamp: {cls.get_current_time()}")
+        print("\n//////////////////// End of Program ////////////////////")
+
+    @classmethod
+    def append_logs(cls, index_of_file, entries):
+        """
+        Appends rows to a log: to its table when the logs are in the SQLite database, otherwise through DurableWriter.
+        Rows without a logged_at value are stamped with the current time.
+
+        Args:
+            index_of_file (int): The index of the CSV_FILES_DICT for the target log file.
+            entries (list of dict): The log rows, keyed by column name.
+
+        Returns:
+            None
+        """
+        config = cls.CSV_FILES_DICT[index_of_file]
+        logged_at = AuditLog.logged_at()
+        entries = [entry if entry.get("logged_at") else dict(entry, logged_at=logged_at) for entry in entries]
+        if cls.logs_in_database():
+            cls.store().backend.append_logs(config["csv_file"], config["columns"], entries)
+        else:
+            DurableWriter.append_logs(config["csv_file"], config["columns"], entries)
+
+    @classmethod
+    def append_log_frame(cls, index_of_file, data_frame):
+        """
+        Appends many rows to a log with one write, like append_logs.
+
+        Args:
+            index_of_file (int): The index of the CSV_FILES_DICT for the target log file.
+            data_frame (pd.DataFrame): The log rows.
+
+        Returns:
+            None
+        """
+        config = cls.CSV_FILES_DICT[index_of_file]
+        if "logged_at" not in data_frame:
+            data_frame = data_frame.assign(logged_at=AuditLog.logged_at())
+        if cls.logs_in_database():
+            cls.store().backend.append_log_frame(config["csv_file"], config["columns"], data_frame)
+        else:
+            DurableWriter.append_log_frame(config["csv_file"], config["columns"], data_frame)
 
     @classmethod
     def write_to_csv(cls, data_frame):
@@ -160,29 +530,54 @@ class CSVManager:
             None
         """
         try:
-            data_frame.to_csv(cls.CSV_FILES_DICT[0]["csv_file"], index=False)
+            cls.store().write(data_frame)
             print("\nData successfully written to CSV.")
         except Exception as e:
             print(f"\nFailed to write to CSV file: {e}")
 
+    @classmethod
+    def compact_ledger(cls):
+        """
+        Folds the journal of pending updates and deletes into the stored transaction records.
+
+        Returns:
+            bool: True if the journal was compacted.
+        """
+        try:
+            compacted = cls.store().compact()
+            print(f"\nCompacted {compacted} journal entries into {cls.CSV_FILES_DICT[0]['csv_file']}.")
+            return True
+        except Exception as e:
+            print(f"\nFailed to compact the transaction records: {e}")
+            return False
+
     @classmethod
     def get_transactions(cls, start_date, end_date):
         """
         Retrieves transactions within a specified date range.
 
+        A partitioned ledger that is not loaded yet is queried with ParallelReports, which only reads the partitions
+        overlapping the range. A CSV ledger is streamed instead of loaded when StreamingReports applies, see
+        stream_transactions.
+
         Args:
             start_date (str): The start date of the range.
             end_date (str): The end date of the range.
 
         Returns:
-            pd.DataFrame: DataFrame containing transactions within the date range.
+            pd.DataFrame: DataFrame containing transactions within the date range, or None if they were streamed.
         """
-        df = pd.read_csv(cls.CSV_FILES_DICT[0]["csv_file"])
-        df["date"] = pd.to_datetime(df["date"], format=cls.FORMAT)
         start_date = datetime.strptime(start_date, cls.FORMAT)
         end_date = datetime.strptime(end_date, cls.FORMAT)
-        mask = (df["date"] >= start_date) & (df["date"] <= end_date)
-        filtered_df = df.loc[mask]
+        store = cls.store()
+        if StreamingReports.applies(store):
+            cls.stream_transactions(store, start_date, end_date)
+            return None
+        if ParallelReports.applies(store):
+            filtered_df = ParallelReports.date_range(store, start_date, end_date)
+            filtered_df["date"] = pd.to_datetime(filtered_df["date"], format=cls.FORMAT)
+        else:
+            filtered_df = store.date_range(start_date, end_date, parse_dates=True)
 
         if filtered_df.empty:
             print("\nNo transactions found in the given date range.")
@@ -194,6 +589,35 @@ class CSVManager:
             cls.net_amount(filtered_df)
         return filtered_df
 
+    @classmethod
+    def stream_transactions(cls, store, start_date, end_date):
+        """
+        Prints the transactions within a date range one chunk of the ledger at a time, in ledger order, and then their
+        summary, folded from the totals of each chunk. Only one chunk is held in memory at a time.
+
+        Args:
+            store (TransactionStore): The store holding the transaction records.
+            start_date (datetime): The start date of the range.
+            end_date (datetime): The end date of the range.
+
+        Returns:
+            None
+        """
+        totals = CategoryTotals()
+        for rows, chunk_totals in StreamingReports.date_range(store, start_date, end_date):
+            if not totals.counts.any():
+                print(f"\n//////////////////// Transactions from {start_date.strftime(cls.FORMAT)} to "
+                      f"{end_date.strftime(cls.FORMAT)} ////////////////////")
+            print(rows.to_string(index=False, header=not totals.counts.any(),
+                                 formatters={"date": lambda x: x.strftime(cls.FORMAT)}))
+            totals.merge(chunk_totals)
+
+        if not totals.counts.any():
+            print("\nNo transactions found in the given date range.")
+            return
+        print("\n//////////////////// End of Records ////////////////////")
+        cls.print_summary(*totals.summary())
+
     @classmethod
     def net_amount(cls, df):
         """
@@ -203,19 +627,139 @@ class CSVManager:
         Args:
             df (pd.DataFrame): DataFrame containing transaction data.
 
+        Returns:
+            None
+        """
+        num_of_entries = df.groupby("category")["amount"].count()
+        total_amounts = df.groupby("category")["amount"].sum()
+        cls.print_summary(num_of_entries, total_amounts)
+
+    @classmethod
+    def summary_aggregates(cls):
+        """
+        Returns the running aggregates. If they have to be rebuilt and StreamingReports applies, they are rebuilt one
+        chunk of the ledger at a time instead of from the loaded records.
+
+        Returns:
+            LedgerAggregates: Aggregates describing the current records.
+        """
+        store = cls.store()
+        if StreamingReports.applies(store):
+            return store.summary_aggregates(lambda: StreamingReports.aggregates(store))
+        return store.summary_aggregates()
+
+    @classmethod
+    def ledger_summary(cls):
+        """
+        Prints the summary of all transactions from the running per-category aggregates, without reading the records.
+
+        Returns:
+            None
+        """
+        stats = cls.summary_aggregates().stats()
+        cls.print_stats_summary(stats)
+
+    @classmethod
+    def range_summary(cls, start_date, end_date):
+        """
+        Prints the summary of the transactions within a date range from the daily rollup, without reading the records.
+
+        Args:
+            start_date (str): The start date of the range.
+            end_date (str): The end date of the range.
+
+        Returns:
+            None
+        """
+        start_date = datetime.strptime(start_date, cls.FORMAT)
+        end_date = datetime.strptime(end_date, cls.FORMAT)
+        store = cls.store()
+        stats = cls.summary_aggregates().range_stats(store.day_ordinal(start_date), store.day_ordinal(end_date))
+
+        print(f"\n//////////////////// Summary from {start_date.strftime(cls.FORMAT)} to "
+              f"{end_date.strftime(cls.FORMAT)} ////////////////////")
+        if not stats:
+            print("\nNo transactions found in the given date range.")
+            return
+        cls.print_stats_summary(stats)
+
+    @classmethod
+    def check_aggregates(cls):
+        """
+        Rebuilds the running aggregates from the transaction records and reports any drift from the stored ones.
+
+        Returns:
+            bool: True if the stored aggregates matched the rebuilt ones.
+        """
+        store = cls.store()
+        aggregates = store.summary_aggregates()
+        rebuilt = store.rebuild_aggregates()
+        differences = aggregates.differences(rebuilt)
+        aggregates.replace_with(rebuilt, store.file_signature())
+
+        if differences:
+            print("\nRunning aggregates were out of date and have been rebuilt:")
+            for difference in differences:
+                print(difference)
+        else:
+            print("\nRunning aggregates match the transaction records.")
+        return not differences
+
+    @classmethod
+    def check_transaction_ids(cls):
+        """
+        Reports transaction IDs held by more than one record.
+
+        Returns:
+            bool: True if every transaction ID is unique.
+        """
+        ids = cls.store().records()["transaction_id"]
+        duplicates = ids[ids.duplicated()].unique()
+        if len(duplicates):
+            print(f"\nTransaction IDs held by more than one record: "
+                  f"{', '.join(str(transaction_id) for transaction_id in sorted(duplicates)[:20])}"
+                  f"{' ...' if len(duplicates) > 20 else ''}")
+        else:
+            print("\nEvery transaction ID is unique.")
+        return not len(duplicates)
+
+    @classmethod
+    def print_stats_summary(cls, stats):
+        """
+        Prints the summary from precomputed per-category statistics.
+
+        Args:
+            stats (dict): Tuples starting with (count, total) keyed by category.
+
+        Returns:
+            None
+        """
+        num_of_entries = pd.Series({category: stat[0] for category, stat in sorted(stats.items())}, dtype="int64")
+        total_amounts = pd.Series({category: stat[1] for category, stat in sorted(stats.items())}, dtype="float64")
+        cls.print_summary(num_of_entries.rename_axis("category").rename("amount"),
+                          total_amounts.rename_axis("category").rename("amount"))
+
+    @classmethod
+    def print_summary(cls, num_of_entries, total_amounts):
+        """
+        Prints the number of entries, average and total income and expense, and net savings.
+
+        Args:
+            num_of_entries (pd.Series): Number of transactions per category.
+            total_amounts (pd.Series): Sum of the transaction amounts per category.
+
         Returns:
             None
         """
         print("\n//////////////////// Summary ////////////////////")
         print("//////////////////// Number of Entries ////////////////////")
-        num_of_entries = df.groupby("category")["amount"].count()
         print(num_of_entries.to_string())
-        avg_transactions = df.groupby("category")["amount"].mean().round(2)
+        avg_transactions = (total_amounts / num_of_entries).round(2)
         avg_transactions = avg_transactions.apply(lambda x: f"${x:.2f}")
         print("\n//////////////////// Average Income and Expense ////////////////////")
         print(avg_transactions.to_string())
-        total_income = df[df["category"] == "Income"]["amount"].sum()
-        total_expense = df[df["category"] == "Expense"]["amount"].sum()
+        total_income = total_amounts.get("Income", 0.0)
+        total_expense = total_amounts.get("Expense", 0.0)
         print(f"\nTotal Income ${total_income:.2f}")
         print(f"Total Expense ${total_expense:.2f}")
         print("////////////////////////////////////////////////////////////")
@@ -234,8 +778,7 @@ class CSVManager:
         Returns:
             bool: True if the transaction ID is found, False otherwise.
         """
-        df = pd.read_csv(cls.CSV_FILES_DICT[0]["csv_file"])
-        if transaction_id not in df["transaction_id"].values:
+        if not cls.store().contains(transaction_id):
             print("\nTransaction ID NOT FOUND. Please enter a valid transaction id.")
             return False
         else:
@@ -253,20 +796,113 @@ class CSVManager:
             new_value (str or float): The new value to set for the field.
 
         Returns:
-            None
+            bool: True if the record was updated.
         """
         try:
-            df = pd.read_csv(cls.CSV_FILES_DICT[0]["csv_file"])
-            old_value = df[df["transaction_id"] == transaction_id][update_field].iloc[0]
-            df.loc[df["transaction_id"] == transaction_id, update_field] = new_value
-            cls.write_to_csv(df)
+            store = cls.store()
+            old_value = store.update(transaction_id, update_field, new_value)
+            cls.print_change_written(store)
             cls.updates_type(0)
             print("********** New Updated Record **************")
-            print(df[df["transaction_id"] == transaction_id].to_string(index=False))
+            print(store.row(transaction_id).to_string(index=False))
             cls.update_update_log(cls.get_current_time(), transaction_id, cls.MODIFICATIONS[0], update_field, True,
                                   old_value, new_value)
+            return True
         except Exception as e:
             print(f"\nFailed to update a transaction amount. Error {e}")
+            return False
+
+    @classmethod
+    def bulk_update(cls, update_field, new_value, **conditions):
+        """
+        Sets one field of every transaction matching the conditions, for example recategorizing all descriptions that
+        match a pattern within a date range. The records are changed in one pass and written once, and the update log
+        gets one row per changed transaction in a single append.
+
+        Args:
+            update_field (str): The field to be updated.
+            new_value (str or float): The new value to set for the field.
+            **conditions: Conditions selecting the transactions, see TransactionStore.CONDITIONS.
+
+        Returns:
+            int: The number of transactions updated, or None if the update failed.
+        """
+        start_time = time.perf_counter()
+        try:
+            old_rows = cls.store().update_where(update_field, new_value, **conditions)
+            if old_rows.empty:
+                print("\nNo transactions match the conditions. Nothing was updated.")
+                return 0
+            cls.append_log_frame(3, pd.DataFrame({
+                "timestamp": cls.get_current_time(),
+                "transaction_id": old_rows["transaction_id"],
+                "update_type": cls.MODIFICATIONS[0],
+                "field_update": update_field,
+                "success": True,
+                "old_value": old_rows[update_field],
+                "new_value": new_value
+            }))
+        except Exception as e:
+            print(f"\nFailed to update transactions. Error {e}")
+            return None
+
+        cls.print_bulk_change(f"Updated {update_field} of {len(old_rows)} transactions",
+                              old_rows.assign(**{update_field: new_value}), start_time)
+        return len(old_rows)
+
+    @classmethod
+    def bulk_delete(cls, **conditions):
+        """
+        Deletes every transaction matching the conditions, for example a list of transaction IDs. The records are
+        filtered in one pass and written once, and the delete log gets one row per deleted transaction in a single
+        append.
+
+        Args:
+            **conditions: Conditions selecting the transactions, see TransactionStore.CONDITIONS.
+
+        Returns:
+            int: The number of transactions deleted, or None if the delete failed.
+        """
+        start_time = time.perf_counter()
+        try:
+            deleted_rows = cls.store().delete_where(**conditions)
+            if deleted_rows.empty:
+                print("\nNo transactions match the conditions. No record deleted.")
+                return 0
+            cls.append_log_frame(2, pd.DataFrame({
+                "timestamp": cls.get_current_time(),
+                "transaction_id": deleted_rows["transaction_id"],
+                "update_type": cls.MODIFICATIONS[1],
+                "message": "Deleted entry",
+                "success": True,
+                **{f"del_record_{field}": deleted_rows[field] for field in cls.UPDATE_FIELD_CHOICES}
+            }))
+        except Exception as e:
+            print(f"\nFailed to delete transactions. Error {e}")
+            return None
+
+        cls.print_bulk_change(f"Deleted {len(deleted_rows)} transactions", deleted_rows, start_time)
+        return len(deleted_rows)
+
+    @classmethod
+    def print_bulk_change(cls, title, rows, start_time):
+        """
+        Prints the outcome of a bulk update or delete with the first page of the affected records.
+
+        Args:
+            title (str): What was changed.
+            rows (pd.DataFrame): The updated records or the deleted records.
+            start_time (float): time.perf_counter() when the change started.
+
+        Returns:
+            None
+        """
+        print(f"\n//////////////////// {title} ////////////////////")
+        print(f"Changed the records and logged {len(rows)} rows in {time.perf_counter() - start_time:.2f} seconds. "
+              f"Timestamp: {cls.get_current_time()}")
+        print(rows.head(cls.VIEW_PAGE_SIZE).to_string(index=False))
+        if len(rows) > cls.VIEW_PAGE_SIZE:
+            print(f"... and {len(rows) - cls.VIEW_PAGE_SIZE} more")
 
     @classmethod
     def get_current_time(cls):
@@ -287,29 +923,47 @@ class CSVManager:
             transaction_id (int): The transaction ID of the record to delete.
 
         Returns:
-            None
+            bool: True if the record was deleted.
         """
         try:
-            df = pd.read_csv(cls.CSV_FILES_DICT[0]["csv_file"])
-            deleted_transaction = df[df["transaction_id"] == transaction_id]
-            del_rec_date = deleted_transaction["date"].iloc[0]
-            del_rec_category = deleted_transaction["category"].iloc[0]
-            del_rec_amount = deleted_transaction["amount"].iloc[0]
-            del_rec_description = deleted_transaction["description"].iloc[0]
+            store = cls.store()
+            deleted_transaction = store.delete(transaction_id)
 
             if deleted_transaction.empty:
                 print("\nTransaction ID NOT FOUND. No record deleted.")
-                return
+                return False
 
-            df = df[df["transaction_id"] != transaction_id]
-            cls.write_to_csv(df)
+            del_rec_date = deleted_transaction["date"].iloc[0]
+            del_rec_category = deleted_transaction["category"].iloc[0]
+            del_rec_amount = deleted_transaction["amount"].iloc[0]
+            del_rec_description = deleted_transaction["description"].iloc[0]
+            cls.print_change_written(store)
             cls.updates_type(1)
             print("//////////////////// Deleted Record ////////////////////")
             print(deleted_transaction.to_string(index=False))
             cls.update_delete_log(cls.get_current_time(), transaction_id, cls.MODIFICATIONS[1], "Deleted entry", True,
                                   del_rec_date, del_rec_category, del_rec_amount, del_rec_description)
+            return True
         except Exception as e:
             print(f"\nFailed to delete a transaction. Error {e}")
+            return False
+
+    @staticmethod
+    def print_change_written(store):
+        """
+        Prints where an update or delete was written: backends that update in place store it directly, the others
+        journal it until the next compaction.
+
+        Args:
+            store (TransactionStore): The store the change was made through.
+
+        Returns:
+            None
+        """
+        if store.backend.UPDATES_IN_PLACE:
+            print(f"\nChange successfully written to {store.backend.database_file}.")
+        else:
+            print("\nChange successfully written to the journal.")
 
     @classmethod
     def updates_type(cls, index_of_modification):
@@ -424,49 +1078,500 @@ class CSVManager:
             print(f"\nFailed to write to CSV Change Log File. Timestamp: {cls.get_current_time()}.  Error {e}")
 
     @classmethod
-    def view_records(cls, index):
+    def view_records(cls, index, page_size=None, interactive=True):
         """
-        Displays records from the specified CSV file.
+        Displays records from the specified CSV file one page at a time.
+
+        Log files are streamed in chunks of page_size rows, so only the visible page is held in memory and formatted.
+        After each page the user can continue, jump to the last entries, or stop.
 
         Args:
             index (int): The index of the CSV file configuration in CSV_FILES_DICT.
+            page_size (int): Number of rows per page. Defaults to VIEW_PAGE_SIZE.
+            interactive (bool): If False, print every page without prompting.
 
         Returns:
             None
         """
+        page_size = page_size or cls.VIEW_PAGE_SIZE
         try:
-            df = pd.read_csv(cls.CSV_FILES_DICT[index]["csv_file"])
             record_name = cls.CSV_FILES_DICT[index]["name"]
             print(f"\n//////////////////// {record_name.title()} ////////////////////")
 
-            if df.empty:
+            shown = 0
+            for page, has_more in cls.record_pages(index, page_size):
+                if page.empty:
+                    break
+                print(page.to_string(index=False))
+                shown += len(page)
+                if not has_more or not interactive:
+                    continue
+                choice = input("\nPress Enter for the next page, 'l' for the last entries, or 'q' to stop: ").lower()
+                if choice == "q":
+                    break
+                if choice == "l":
+                    print(cls.tail_records(index, page_size).to_string(index=False))
+                    break
+
+            if not shown:
                 print("\nThere is no records currently available. You should add new records")
                 return
-            else:
-                df = df.to_string(index=False)
-                print(df)
-                print("\n//////////////////// End of Program ////////////////////")
-                print(f"Completed Timestamp: {cls.get_current_time()}")
+            print("\n//////////////////// End of Program ////////////////////")
+            print(f"Completed Timestamp: {cls.get_current_time()}")
         except Exception as e:
             print(f"\nFailed to view records. Error {e}")
 
+    @classmethod
+    def record_pages(cls, index, page_size):
+        """
+        Yields the records of the specified CSV file one page at a time.
+
+        Transaction records come from the in-memory store; log files are read with a chunked reader, and log tables
+        in the SQLite database one page per query.
+
+        Args:
+            index (int): The index of the CSV file configuration in CSV_FILES_DICT.
+            page_size (int): Number of rows per page.
+
+        Yields:
+            tuple: (pd.DataFrame page, bool whether another page follows)
+        """
+        if index == 0:
+            df = cls.store().frame()
+            for start in range(0, len(df), page_size):
+                yield df.iloc[start:start + page_size], start + page_size < len(df)
+            return
+
+        if cls.logs_in_database():
+            config = cls.CSV_FILES_DICT[index]
+            pages = cls.store().backend.log_pages(config["csv_file"], config["columns"], page_size)
+            page = next(pages, None)
+            while page is not None:
+                next_page = next(pages, None)
+                yield page, next_page is not None
+                page = next_page
+            return
+
+        DurableWriter.flush_logs()
+        reader = pd.read_csv(cls.CSV_FILES_DICT[index]["csv_file"], chunksize=page_size, dtype=str,
+                             keep_default_na=False)
+        page = next(reader, None)
+        while page is not None:
+            next_page = next(reader, None)
+            yield page, next_page is not None
+            page = next_page
+
+    @classmethod
+    def tail_records(cls, index, count):
+        """
+        Returns the last entries of the specified CSV file.
+
+        Log files are append-only, so they are read backwards from the end in blocks until enough rows are found,
+        without reading the rest of the file. Rows are told apart from the lines of a description that spans several
+        lines by counting quotes back from the end of the file, see AuditLog.record_ends. Log tables in the SQLite
+        database are read backwards by rowid.
+
+        Args:
+            index (int): The index of the CSV file configuration in CSV_FILES_DICT.
+            count (int): Number of entries to return.
+
+        Returns:
+            pd.DataFrame: The last entries, oldest first.
+
+        Raises:
+            ValueError: If the count is negative.
+        """
+        if count < 0:
+            raise ValueError("the number of entries must not be negative")
+        if index == 0:
+            return cls.store().frame().tail(count)
+        if cls.logs_in_database():
+            config = cls.CSV_FILES_DICT[index]
+            return cls.store().backend.log_tail(config["csv_file"], config["columns"], count)
+
+        DurableWriter.flush_logs()
+        with open(cls.CSV_FILES_DICT[index]["csv_file"], "rb") as file:
+            header = file.readline()
+            file.seek(0, io.SEEK_END)
+            position = file.tell()
+            tail = b""
+            starts = np.empty(0, dtype=np.int64)
+            while position > len(header) and len(starts) < count:
+                step = min(65536, position - len(header))
+                position -= step
+                file.seek(position)
+                tail = file.read(step) + tail
+                starts = AuditLog.record_ends(tail.rstrip(b"\r\n"), from_end=True) + 1
+
+        # The first block read may start within a row, unless it starts right after the header.
+        if position <= len(header):
+            starts = np.concatenate(([0], starts))
+        rows = tail.rstrip(b"\r\n")[starts[-count:][0]:] if count and len(starts) else b""
+        return pd.read_csv(io.BytesIO(header + rows + b"\n"), dtype=str, keep_default_na=False)
+
+    @classmethod
+    def log_rows(cls, index, transaction_id=None, start=None, end=None):
+        """
+        Looks up rows of one log by transaction ID, or by the time they were logged, without scanning the log.
+
+        Log CSV files are searched through their offset index (audit_log.LogIndex); log tables in the SQLite database
+        through their transaction_id and logged_at indexes.
+
+        Args:
+            index (int): The index of the log in CSV_FILES_DICT.
+            transaction_id (int): The transaction ID to look up, or None to look up by time.
+            start (datetime): First second of the time window; naive datetimes are local time.
+            end (datetime): Last second of the time window, inclusive, or None for a window without end.
+
+        Returns:
+            pd.DataFrame: The matching rows, all values as strings.
+        """
+        config = cls.CSV_FILES_DICT[index]
+        if cls.logs_in_database():
+            backend = cls.store().backend
+            if transaction_id is not None:
+                return backend.log_history(config["csv_file"], config["columns"], transaction_id)
+            return backend.log_window(config["csv_file"], config["columns"], AuditLog.to_logged_at(start),
+                                      None if end is None else AuditLog.to_logged_at(end + timedelta(seconds=1)))
+
+        log_index = AuditLog.index(config["csv_file"], config["columns"])
+        if transaction_id is not None:
+            return log_index.read(log_index.positions_for_id(transaction_id))
+        last = np.iinfo(np.int64).max if end is None else int(end.timestamp())
+        return log_index.read(log_index.positions_between(int(start.timestamp()), last))
+
+    @classmethod
+    def log_name(cls, index):
+        """
+        Args:
+            index (int): The index of the log in CSV_FILES_DICT.
+
+        Returns:
+            str: The short name shown in the log column of audit queries, e.g. "new_entry_log".
+        """
+        return os.path.splitext(os.path.basename(cls.CSV_FILES_DICT[index]["csv_file"]))[0]
+
+    @classmethod
+    def transaction_history(cls, transaction_id):
+        """
+        Displays every log row about a transaction across the new entry, update and delete logs, oldest first.
+
+        Args:
+            transaction_id (int): The transaction ID to look up. Deleted transactions have a history too.
+
+        Returns:
+            pd.DataFrame: The history, see AuditLog.combine.
+        """
+        try:
+            history = AuditLog.combine({cls.log_name(index): cls.log_rows(index, transaction_id=transaction_id)
+                                        for index in range(1, len(cls.CSV_FILES_DICT))})
+        except Exception as e:
+            print(f"\nFailed to read the history of transaction {transaction_id}. Error {e}")
+            return None
+        cls.print_audit(f"History of Transaction {transaction_id}", history)
+        return history
+
+    @classmethod
+    def log_events(cls, start, end):
+        """
+        Displays every log row written within a time window across the three logs, oldest first.
+
+        Args:
+            start (datetime): First moment of the window; naive datetimes are local time.
+            end (datetime): Last moment of the window, inclusive.
+
+        Returns:
+            pd.DataFrame: The log rows, see AuditLog.combine.
+        """
+        try:
+            events = AuditLog.combine({cls.log_name(index): cls.log_rows(index, start=start, end=end)
+                                       for index in range(1, len(cls.CSV_FILES_DICT))})
+        except Exception as e:
+            print(f"\nFailed to read the log events. Error {e}")
+            return None
+        cls.print_audit(f"Log Events from {start.isoformat(sep=' ')} to {end.isoformat(sep=' ')}", events)
+        return events
+
+    @classmethod
+    def print_audit(cls, title, rows):
+        """
+        Prints the result of an audit log query.
+
+        Args:
+            title (str): Heading of the result.
+            rows (pd.DataFrame): The log rows.
+
+        Returns:
+            None
+        """
+        if rows.empty:
+            print("\nNo log entries found.")
+            return
+        print(f"\n//////////////////// {title} ////////////////////")
+        print(rows.to_string(index=False))
+        print("\n//////////////////// End of Records ////////////////////")
+
+    @classmethod
+    def history(cls):
+        """
+        Returns:
+            LedgerHistory: The snapshots and reconstruction of past states of the transaction records.
+        """
+        return LedgerHistory(cls.CSV_FILES_DICT[0]["csv_file"])
+
+    @classmethod
+    def operation_rows(cls, frames):
+        """
+        Merges log rows into the operations LedgerHistory replays.
+
+        Args:
+            frames (dict): pd.DataFrame of log rows keyed by the index of their log in CSV_FILES_DICT.
+
+        Returns:
+            pd.DataFrame: The rows in the order they were logged (see AuditLog.combine), with the "operation" of each
+                row and the "microseconds" it was logged at.
+        """
+        rows = AuditLog.combine({cls.log_name(index): frame for index, frame in frames.items()})
+        operations = {cls.log_name(index): operation for index, operation in cls.LOG_OPERATIONS.items()}
+        return rows.assign(operation=rows["log"].map(operations),
+                           microseconds=AuditLog.epoch_microseconds(rows["logged_at"], rows["timestamp"]))
+
+    @classmethod
+    def operations_between(cls, after, through):
+        """
+        Looks up the successful operations logged within a time window, through the log indexes.
+
+        Args:
+            after (int): Epoch microseconds the window starts after.
+            through (int): Last epoch microsecond of the window, or None for a window without end.
+
+        Returns:
+            pd.DataFrame: The operations, see operation_rows.
+        """
+        start = datetime.fromtimestamp(after // 1_000_000)
+        end = None if through is None else datetime.fromtimestamp(through // 1_000_000)
+        rows = cls.operation_rows({index: cls.log_rows(index, start=start, end=end) for index in cls.LOG_OPERATIONS})
+        if rows.empty:
+            return rows
+        times = rows["microseconds"].to_numpy()
+        within = (times > after) & (times <= (np.iinfo(np.int64).max if through is None else through))
+        return rows[within & (rows["success"] == "True").to_numpy()].reset_index(drop=True)
+
+    @classmethod
+    def last_operations(cls, count):
+        """
+        Finds the log rows of the last operations that have not been undone yet, reading only the ends of the logs.
+
+        An operation is one add, update or delete, or one bulk change or import: the rows a bulk update, bulk delete or
+        import appends in one write share their logged_at value and are undone together. Undoing logs one row with
+        update_type UNDO per row undone, after the rows it undid, so going back from the newest row every undo row
+        cancels the next row that is not itself an undo.
+
+        Args:
+            count (int): Number of operations to find.
+
+        Returns:
+            pd.DataFrame: The rows of up to count operations, in the order they were logged, see operation_rows.
+        """
+        fetch = 2 * count + 16
+        while True:
+            tails = {index: cls.tail_records(index, fetch) for index in cls.LOG_OPERATIONS}
+            rows = cls.operation_rows(tails)
+            # Rows logged before the oldest row read from a log that has more rows may be missing.
+            truncated = [AuditLog.epoch_microseconds(tail["logged_at"], tail["timestamp"]).min()
+                         for tail in tails.values() if len(tail) == fetch]
+            horizon = max(truncated, default=-1)
+
+            selected, undone, operations, operation = [], 0, 0, None
+            complete = False
+            for position in range(len(rows) - 1, -1, -1):
+                if rows["microseconds"].iat[position] <= horizon:
+                    break
+                if rows["update_type"].iat[position] == cls.UNDO:
+                    undone += 1
+                elif rows["success"].iat[position] != "True":
+                    continue
+                elif undone:
+                    undone -= 1
+                else:
+                    # Rows written before logged_at existed are an operation each.
+                    logged_at = rows["logged_at"].iat[position]
+                    row_operation = (rows["log"].iat[position], logged_at or position)
+                    if row_operation != operation:
+                        if operations == count:
+                            complete = True
+                            break
+                        operations += 1
+                        operation = row_operation
+                    selected.append(position)
+            if complete or not truncated:
+                return rows.iloc[selected[::-1]].reset_index(drop=True)
+            fetch *= 4
+
+    @classmethod
+    def snapshot_ledger(cls):
+        """
+        Saves a snapshot of the current transaction records, which bounds how many logged operations a point-in-time
+        view has to reverse. Suitable for running periodically, for example from cron.
+
+        Returns:
+            bool: True if the snapshot was saved.
+        """
+        try:
+            store = cls.store()
+            with store.locked():
+                DurableWriter.flush_logs()
+                records = store.records()
+                moment = datetime.now()
+                cls.history().save(records, store.codec, AuditLog.microseconds(moment))
+            print(f"\nSaved a snapshot of {len(records)} transaction records as of {moment.isoformat(sep=' ')}")
+            return True
+        except Exception as e:
+            print(f"\nFailed to save a snapshot of the transaction records. Error {e}")
+            return False
+
+    @classmethod
+    def ledger_as_of(cls, moment, export_file=None):
+        """
+        Rebuilds the transaction records as they were at a moment and prints their summary.
+
+        Args:
+            moment (datetime): The moment; every operation logged up to the end of its second is included. Naive
+                datetimes are local time.
+            export_file (str): Optional CSV file to write the rebuilt records to.
+
+        Returns:
+            pd.DataFrame: The records as of the moment, or None if they could not be rebuilt.
+        """
+        start_time = time.perf_counter()
+        try:
+            store = cls.store()
+            history = cls.history()
+            until = AuditLog.microseconds(moment.replace(microsecond=0)) + 999_999
+            with store.locked():
+                DurableWriter.flush_logs()
+                covers = history.covering(until)
+                if covers is None:
+                    records, codec, source = store.records(), store.codec, "the current records"
+                else:
+                    records, codec = history.load(covers)
+                    source = f"the snapshot as of {datetime.fromtimestamp(covers / 1_000_000).isoformat(sep=' ')}"
+                operations = cls.operations_between(until, covers)
+                records, _ = history.reverse(records, codec, operations, checkpoint=True)
+                df = codec.decode(records)
+        except Exception as e:
+            print(f"\nFailed to rebuild the transaction records. Error {e}")
+            return None
+
+        print(f"\n//////////////////// Transaction Records as of {moment.isoformat(sep=' ')} ////////////////////")
+        print(f"Rebuilt {len(df)} records from {source} by reversing {len(operations)} logged operations in "
+              f"{time.perf_counter() - start_time:.2f} seconds")
+        if export_file:
+            df.to_csv(export_file, index=False)
+            print(f"Exported the records to {export_file}")
+        if not df.empty:
+            cls.net_amount(df)
+        return df
+
+    @classmethod
+    def undo_operations(cls, count):
+        """
+        Undoes the last operations that have not been undone yet, newest first, and logs each reversal with update_type
+        UNDO: a delete for an undone new entry, an update back to the old value for an undone update, and a new entry
+        for an undone delete, which restores the record under its transaction ID. A bulk change or an import is one
+        operation, see last_operations.
+
+        The transaction records are rewritten once for all of them. Operations that no longer fit the records, for
+        example an update of a record that was deleted outside the logs, are logged as unsuccessful reversals.
+
+        Args:
+            count (int): Number of operations to undo.
+
+        Returns:
+            int: The number of logged changes undone, or None if undoing failed.
+        """
+        try:
+            store = cls.store()
+            with store.locked():
+                DurableWriter.flush_logs()
+                operations = cls.last_operations(count)
+                if operations.empty:
+                    print("\nThere are no operations to undo.")
+                    return 0
+                records, reversals = cls.history().reverse(store.records(), store.codec, operations)
+                store.write(store.codec.decode(records))
+                cls.log_reversals(reversals)
+                DurableWriter.flush_logs()
+        except Exception as e:
+            print(f"\nFailed to undo operations. Error {e}")
+            return None
+
+        undone = sum(reversal["applied"] for reversal in reversals)
+        cls.print_audit(f"Undid {undone} of {len(reversals)} Logged Changes",
+                        operations.drop(columns=["operation", "microseconds"]))
+        if undone < len(reversals):
+            print(f"{len(reversals) - undone} changes no longer matched the transaction records and were skipped.")
+        return undone
+
+    @classmethod
+    def log_reversals(cls, reversals):
+        """
+        Logs the reversals made by undo_operations, one row each, with logged_at values that keep their order.
+
+        Args:
+            reversals (list of dict): Reversals as returned by LedgerHistory.reverse.
+
+        Returns:
+            None
+        """
+        timestamp = cls.get_current_time()
+        entries = {index: [] for index in cls.LOG_OPERATIONS}
+        for reversal, logged_at in zip(reversals, AuditLog.logged_at_sequence(len(reversals))):
+            operation = reversal["operation"]
+            before = reversal["before"] or {}
+            entry = {
+                "timestamp": timestamp,
+                "transaction_id": operation["transaction_id"],
+                "update_type": cls.UNDO,
+                "success": reversal["applied"],
+                "logged_at": logged_at
+            }
+            if operation["operation"] == LedgerHistory.ADDED:
+                entries[2].append(dict(entry, message="Undid new entry",
+                                       **{f"del_record_{field}": before.get(field, "")
+                                          for field in ["date", "category", "amount", "description"]}))
+            elif operation["operation"] == LedgerHistory.UPDATED:
+                entries[3].append(dict(entry, field_update=operation["field_update"],
+                                       old_value=before.get(operation["field_update"], ""),
+                                       new_value=operation["old_value"]))
+            else:
+                entries[1].append(dict(entry, message="Undid delete"))
+        for index, rows in entries.items():
+            if rows:
+                cls.append_logs(index, rows)
+
     @classmethod
     def expense_income_report(cls, report_type):
         """
         Generates a report of expenses or income, grouped by description and ordered by amount.
 
+        For a partitioned ledger that is not loaded yet, the totals are computed per partition in parallel; for a CSV
+        ledger that StreamingReports applies to, they are folded from one chunk of the ledger at a time.
+
         Args:
             report_type (str): The type of report to generate ("Expense" or "Income").
 
         Returns:
             None
         """
-        df = pd.read_csv(cls.CSV_FILES_DICT[0]["csv_file"])
-        df_report = df[df["category"] == report_type.title()].copy()
-        df_report["description"] = df_report["description"].str.lower()
-
-        df_report_group = df_report.groupby("description")["amount"].sum()
-        df_report_group.sort_values(ascending=False, inplace=True)
+        store = cls.store()
+        if StreamingReports.applies(store):
+            df_report_group = StreamingReports.description_totals(store, report_type.title())
+        elif ParallelReports.applies(store):
+            df_report_group = ParallelReports.description_totals(store, report_type.title())
+        else:
+            df_report_group = store.description_totals(report_type.title())
+        df_report_group = df_report_group.sort_values(ascending=False)
 
         df_report_group = df_report_group.reset_index()
         df_report_group.columns = ["description", "amount"]
@@ -0,0 +1,125 @@
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class DescriptionIndex:
+    """
+    Interns normalized (lower case) transaction descriptions as integer codes and caches the per-description totals
+    used by the income and expense reports.
+
+    The cached records already hold a code into the string table of their RecordCodec for every row; this index maps
+    each entry of that table to a normalized code, extended as the table grows. Report totals are computed with
+    np.bincount over the normalized codes of the rows, summing whole cents, and cached per category; the cache for a
+    category is only dropped when a row in that category is added, changed or deleted.
+
+    Attributes:
+        descriptions (list of str): Normalized descriptions, indexed by code.
+    """
+
+    def __init__(self):
+        self.descriptions = []
+        self._lookup = {}
+        self._normalized = []
+        self._versions = {}
+        self._report_cache = {}
+
+    def reset(self):
+        """
+        Forgets all codes and cached reports, for example after the records were reloaded.
+
+        Returns:
+            None
+        """
+        self.descriptions = []
+        self._lookup = {}
+        self._normalized = []
+        self._versions = {}
+        self._report_cache = {}
+
+    def build(self, strings):
+        """
+        Assigns a normalized code to every entry of a string table that does not have one yet.
+
+        Args:
+            strings (list of str): The raw descriptions of RecordCodec.strings, indexed by their code.
+
+        Returns:
+            np.ndarray: The normalized code of every entry of the string table.
+        """
+        if len(self._normalized) < len(strings):
+            new_codes = np.array([self.code(description) for description in strings[len(self._normalized):]],
+                                 dtype=np.int64)
+            self._normalized = np.concatenate((np.asarray(self._normalized, dtype=np.int64), new_codes))
+        return np.asarray(self._normalized, dtype=np.int64)
+
+    def is_built(self, strings):
+        """
+        Args:
+            strings (list of str): The raw descriptions of RecordCodec.strings.
+
+        Returns:
+            bool: True if every entry of the string table has a normalized code.
+        """
+        return len(self._normalized) == len(strings)
+
+    def code(self, description):
+        """
+        Returns the code of a description, adding it to the table if it is new.
+
+        Args:
+            description (str): The raw description.
+
+        Returns:
+            int: The code of the normalized description.
+        """
+        normalized = str(description).lower()
+        code = self._lookup.get(normalized)
+        if code is None:
+            code = self._lookup[normalized] = len(self.descriptions)
+            self.descriptions.append(normalized)
+        return code
+
+    def changed(self, category):
+        """
+        Marks a category's cached report as out of date.
+
+        Args:
+            category (str): The category of a row that was added, changed or deleted.
+
+        Returns:
+            None
+        """
+        self._versions[category] = self._versions.get(category, 0) + 1
+
+    def totals(self, df, category, codec):
+        """
+        Returns the total amount per normalized description for one category, from the cache when possible.
+
+        Args:
+            df (pd.DataFrame): The cached transaction records, in compact form.
+            category (str): "Income" or "Expense".
+            codec (RecordCodec): The codec the records were encoded with.
+
+        Returns:
+            pd.Series: Total amount indexed by description, sorted by description.
+        """
+        version = self._versions.get(category, 0)
+        cached = self._report_cache.get(category)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        normalized = self.build(codec.strings)
+        mask = df["category"].to_numpy() == codec.category_code(category)
+        row_codes = normalized.take(df["description"].to_numpy()[mask])
+        cents = df["amount"].to_numpy()[mask]
+        counts = np.bincount(row_codes, minlength=len(self.descriptions))
+        # Sums of whole cents are exact in float64 up to 2**53 cents.
+        sums = np.bincount(row_codes, weights=cents, minlength=len(self.descriptions))
+        present = np.flatnonzero(counts)
+
+        descriptions = pd.Index(np.array(self.descriptions, dtype=object)[present], name="description")
+        totals = pd.Series(sums[present] / 100, index=descriptions, name="amount").sort_index()
+        self._report_cache[category] = (version, totals)
+        return totals
@@ -0,0 +1,160 @@
+import atexit
+import csv
+import io
+import os
+import tempfile
+
+
+class DurableWriter:
+    """
+    Writes files safely: whole-file rewrites go through a temporary file and an atomic rename, and audit log rows are
+    buffered and appended in batches.
+
+    Attributes:
+        DURABILITY (str): Trade-off between durability and throughput for appends:
+            "fsync" - every log event and journal entry is written and fsynced before the call returns.
+            "flush" - every log event is written to the OS straight away, without fsync (default).
+            "batch" - log events are buffered and written with one write per log file every BATCH_SIZE events, when
+                      flush_logs is called, and when the program exits.
+            Set it with run.py --durability.
+        DURABILITY_MODES (list of str): The values DURABILITY can take.
+        BATCH_SIZE (int): Number of buffered log events that triggers a flush in "batch" mode.
+        _log_buffers (dict): Buffered log rows keyed by log file path, as (columns, list of rows).
+    """
+
+    DURABILITY = "flush"
+    DURABILITY_MODES = ["fsync", "flush", "batch"]
+    BATCH_SIZE = 1000
+
+    _log_buffers = {}
+
+    @classmethod
+    def should_fsync(cls):
+        """
+        Returns:
+            bool: True if writes must be fsynced before returning.
+        """
+        return cls.DURABILITY == "fsync"
+
+    @classmethod
+    def atomic_replace(cls, target, write_content, binary=False):
+        """
+        Replaces a file so that readers and crashes only ever see the old or the new version.
+
+        The content is written to a temporary file in the same directory, fsynced and renamed over the target. In
+        "fsync" mode the directory is fsynced too, so the rename itself survives a crash. Each call gets its own
+        temporary file, so processes replacing the same file at once, such as readers saving a log index, never write
+        into one another's. The temporary file takes the target's permissions.
+
+        Args:
+            target (str): Path of the file to replace.
+            write_content (callable): Called with the open temporary file to write the new content.
+            binary (bool): Open the temporary file in binary mode.
+
+        Returns:
+            None
+        """
+        descriptor, temp_file = tempfile.mkstemp(prefix=f"{os.path.basename(target)}.", suffix=".tmp",
+                                                 dir=os.path.dirname(target) or ".")
+        try:
+            with open(descriptor, "wb" if binary else "w", **({} if binary else {"newline": ""})) as file:
+                try:
+                    os.chmod(temp_file, os.stat(target).st_mode & 0o777)
+                except FileNotFoundError:
+                    os.chmod(temp_file, 0o644)
+                write_content(file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_file, target)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+        if cls.should_fsync():
+            cls.fsync_directory(os.path.dirname(target) or ".")
+
+    @staticmethod
+    def fsync_directory(directory):
+        """
+        Flushes a directory's entries, such as a rename into it, to disk.
+
+        Args:
+            directory (str): Path of the directory.
+
+        Returns:
+            None
+        """
+        descriptor = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    @classmethod
+    def append(cls, path, text):
+        """
+        Appends text to a file with a single write, fsyncing it in "fsync" mode.
+
+        Args:
+            path (str): Path of the file to append to.
+            text (str): The text to append.
+
+        Returns:
+            None
+        """
+        with open(path, "a", newline="", encoding="utf-8") as file:
+            file.write(text)
+            if cls.should_fsync():
+                file.flush()
+                os.fsync(file.fileno())
+
+    @classmethod
+    def append_logs(cls, csv_file, columns, entries):
+        """
+        Adds several rows to a log file's buffer and flushes according to DURABILITY, with one write for all of them.
+
+        Args:
+            csv_file (str): Path of the log CSV file.
+            columns (list of str): Column names of the log file.
+            entries (list of dict): The log rows, keyed by column name.
+
+        Returns:
+            None
+        """
+        cls._log_buffers.setdefault(csv_file, (columns, []))[1].extend(entries)
+        if cls.DURABILITY != "batch" or sum(len(rows) for _, rows in cls._log_buffers.values()) >= cls.BATCH_SIZE:
+            cls.flush_logs()
+
+    @classmethod
+    def append_log_frame(cls, csv_file, columns, data_frame):
+        """
+        Appends many log rows from a DataFrame with one write, after any rows already buffered for the file.
+
+        Args:
+            csv_file (str): Path of the log CSV file.
+            columns (list of str): Column names of the log file.
+            data_frame (pd.DataFrame): The log rows.
+
+        Returns:
+            None
+        """
+        cls.flush_logs()
+        cls.append(csv_file, data_frame[columns].to_csv(header=False, index=False))
+
+    @classmethod
+    def flush_logs(cls):
+        """
+        Writes every buffered log row, with one write per log file.
+
+        Returns:
+            None
+        """
+        buffers = cls._log_buffers
+        cls._log_buffers = {}
+        for csv_file, (columns, rows) in buffers.items():
+            text = io.StringIO()
+            csv.DictWriter(text, fieldnames=columns, lineterminator="\n").writerows(rows)
+            cls.append(csv_file, text.getvalue())
+
+
+atexit.register(DurableWriter.flush_logs)
@@ -0,0 +1,27 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """
+    Returns a module that is only executed when one of its attributes is first used.
+
+    pandas, numpy and matplotlib take most of the program's start-up time, while adding a single entry or checking the
+    ledger files needs none of them. Modules import them with this function so the cost is only paid by the operations
+    that actually use them.
+
+    Args:
+        name (str): The module to import, e.g. "pandas".
+
+    Returns:
+        module: The module, or a lazy placeholder that loads it on first attribute access.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,312 @@
+import json
+import math
+from datetime import date, timedelta
+from durable_writer import DurableWriter
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+
+class LedgerAggregates:
+    """
+    Running aggregates of the transaction amounts, kept up to date on every write so summaries never scan the ledger.
+
+    Two levels are maintained:
+        categories - count, sum and sum of squares per category for the whole ledger.
+        days/months - a rollup cube of count and sum per category for every day and every month with transactions.
+
+    Date range summaries are answered from prefix sums over the daily rollup: two binary searches and a subtraction per
+    category, whatever the size of the range.
+
+    The aggregates are saved to a small JSON sidecar tagged with the signature of the records they describe; if the
+    signature no longer matches (for example the ledger was edited by hand) they are rebuilt from the records.
+
+    Attributes:
+        sidecar_file (str): Path of the JSON file the aggregates are saved to, or None for a scratch copy.
+        categories (dict): [count, sum, sum of squares] keyed by category.
+        days (dict): {category: [count, sum]} keyed by day ordinal (days since 1970-01-01).
+        months (dict): {category: [count, sum]} keyed by month ordinal (months since 1970-01).
+        signature (tuple): Signature of the records the aggregates describe, or None if they are unknown.
+    """
+
+    def __init__(self, sidecar_file=None):
+        """
+        Args:
+            sidecar_file (str): Path of the JSON file the aggregates are saved to.
+        """
+        self.sidecar_file = sidecar_file
+        self.categories = {}
+        self.days = {}
+        self.months = {}
+        self.signature = None
+        self._prefix = None
+
+    @staticmethod
+    def month_ordinal(day):
+        """
+        Args:
+            day (int): A day ordinal.
+
+        Returns:
+            int: The month ordinal (months since 1970-01) of that day.
+        """
+        moment = date(1970, 1, 1) + timedelta(days=int(day))
+        return (moment.year - 1970) * 12 + moment.month - 1
+
+    @classmethod
+    def from_frame(cls, df, ordinals):
+        """
+        Computes the aggregates from scratch.
+
+        Args:
+            df (pd.DataFrame): Transaction records with 'category' and 'amount' columns.
+            ordinals (np.ndarray): Day ordinal of each record's date.
+
+        Returns:
+            LedgerAggregates: Unsaved aggregates describing the records.
+        """
+        aggregates = cls()
+        frame = df[["category", "amount"]].assign(day=ordinals, amount_squared=df["amount"] ** 2)
+        frame["month"] = ordinals.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+        grouped = frame.groupby("category")
+        totals = grouped.agg(count=("amount", "count"), total=("amount", "sum"), squares=("amount_squared", "sum"))
+        aggregates.categories = {
+            category: [int(count), float(total), float(squares)] for category, count, total, squares
+            in zip(totals.index, totals["count"].tolist(), totals["total"].tolist(), totals["squares"].tolist())
+        }
+
+        for key, target in (("day", aggregates.days), ("month", aggregates.months)):
+            rollup = frame.groupby([key, "category"])["amount"].agg(["count", "sum"])
+            for (period, category), count, total in zip(rollup.index, rollup["count"].tolist(),
+                                                        rollup["sum"].tolist()):
+                target.setdefault(int(period), {})[category] = [int(count), float(total)]
+        return aggregates
+
+    def replace_with(self, other, signature):
+        """
+        Replaces these aggregates with another set, for example one rebuilt from scratch, and saves them.
+
+        Args:
+            other (LedgerAggregates): The aggregates to copy.
+            signature (tuple): Signature of the records they describe.
+
+        Returns:
+            None
+        """
+        self.categories = other.categories
+        self.days = other.days
+        self.months = other.months
+        self._prefix = None
+        self.signature = tuple(signature)
+        self.save()
+
+    @staticmethod
+    def adjust_rollup(rollup, period, category, count, total):
+        """
+        Adds a count and sum to one cell of the daily or monthly rollup, dropping cells that become empty.
+
+        Args:
+            rollup (dict): The daily or monthly rollup.
+            period (int): Day or month ordinal of the cell.
+            category (str): Category of the cell.
+            count (int): Number of transactions to add (negative to remove).
+            total (float): Amount to add (negative to remove).
+
+        Returns:
+            None
+        """
+        cells = rollup.setdefault(period, {})
+        cell = cells.setdefault(category, [0, 0.0])
+        cell[0] += count
+        cell[1] += total
+        if cell[0] == 0:
+            del cells[category]
+            if not cells:
+                del rollup[period]
+
+    def add(self, category, amount, day, sign=1):
+        """
+        Adds (sign=1) or removes (sign=-1) one transaction.
+
+        Args:
+            category (str): The transaction category.
+            amount (float): The transaction amount.
+            day (int): Day ordinal of the transaction date.
+            sign (int): 1 to add the transaction, -1 to remove it.
+
+        Returns:
+            None
+        """
+        accumulator = self.categories.setdefault(category, [0, 0.0, 0.0])
+        amount = float(amount)
+        accumulator[0] += sign
+        accumulator[1] += sign * amount
+        accumulator[2] += sign * amount * amount
+        if accumulator[0] == 0:
+            del self.categories[category]
+
+        self.adjust_rollup(self.days, int(day), category, sign, sign * amount)
+        self.adjust_rollup(self.months, self.month_ordinal(day), category, sign, sign * amount)
+        self._prefix = None
+
+    def merge(self, other, sign=1):
+        """
+        Adds (sign=1) or removes (sign=-1) aggregates computed for a batch of transactions.
+
+        Args:
+            other (LedgerAggregates): Aggregates of the batch, as returned by from_frame.
+            sign (int): 1 to add the batch, -1 to remove it.
+
+        Returns:
+            None
+        """
+        for category, (count, total, squares) in other.categories.items():
+            accumulator = self.categories.setdefault(category, [0, 0.0, 0.0])
+            accumulator[0] += sign * count
+            accumulator[1] += sign * total
+            accumulator[2] += sign * squares
+            if accumulator[0] == 0:
+                del self.categories[category]
+
+        for target, source in ((self.days, other.days), (self.months, other.months)):
+            for period, cells in source.items():
+                for category, (count, total) in cells.items():
+                    self.adjust_rollup(target, period, category, sign * count, sign * total)
+        self._prefix = None
+
+    def load(self, signature):
+        """
+        Loads the saved aggregates if they were saved against the given signature.
+
+        Args:
+            signature (tuple): Signature of the current records.
+
+        Returns:
+            bool: True if the saved aggregates were loaded.
+        """
+        try:
+            with open(self.sidecar_file) as sidecar:
+                saved = json.load(sidecar)
+        except (FileNotFoundError, ValueError):
+            return False
+        if tuple(saved.get("signature", ())) != tuple(signature) or "days" not in saved:
+            return False
+        self.categories = saved["categories"]
+        self.days = {int(day): cells for day, cells in saved["days"].items()}
+        self.months = {int(month): cells for month, cells in saved["months"].items()}
+        self._prefix = None
+        self.signature = tuple(signature)
+        return True
+
+    def save(self):
+        """
+        Saves the aggregates and their signature to the sidecar file.
+
+        Returns:
+            None
+        """
+        content = json.dumps({"signature": list(self.signature), "categories": self.categories,
+                              "days": self.days, "months": self.months})
+        DurableWriter.atomic_replace(self.sidecar_file, lambda sidecar: sidecar.write(content))
+
+    def stats(self):
+        """
+        Returns:
+            dict: (count, total, mean, standard deviation) keyed by category, sorted by category.
+        """
+        stats = {}
+        for category in sorted(self.categories):
+            count, total, squares = self.categories[category]
+            mean = total / count
+            variance = max(squares / count - mean * mean, 0.0)
+            stats[category] = (count, total, mean, math.sqrt(variance))
+        return stats
+
+    def prefix_sums(self):
+        """
+        Returns the daily rollup as sorted day ordinals and per-category cumulative counts and sums, building it if
+        the rollup changed since the last call.
+
+        Returns:
+            tuple: (np.ndarray of days, {category: (cumulative counts, cumulative sums)}), each cumulative array
+                starting with a 0 so that a range total is prefix[high] - prefix[low].
+        """
+        if self._prefix is None:
+            days = np.array(sorted(self.days), dtype=np.int64)
+            sums = {}
+            for category in sorted({category for cells in self.days.values() for category in cells}):
+                cells = [self.days[day].get(category, [0, 0.0]) for day in days.tolist()]
+                counts = np.array([cell[0] for cell in cells], dtype=np.int64)
+                totals = np.array([cell[1] for cell in cells], dtype=np.float64)
+                sums[category] = (np.concatenate(([0], np.cumsum(counts))),
+                                  np.concatenate(([0.0], np.cumsum(totals))))
+            self._prefix = (days, sums)
+        return self._prefix
+
+    def range_stats(self, start_day, end_day):
+        """
+        Returns the count and sum per category of the transactions dated between two days, inclusive.
+
+        Args:
+            start_day (int): Day ordinal of the start date.
+            end_day (int): Day ordinal of the end date.
+
+        Returns:
+            dict: (count, total) keyed by category, for categories with transactions in the range.
+        """
+        return self.prefix_range_stats(self.prefix_sums(), start_day, end_day)
+
+    @staticmethod
+    def prefix_range_stats(prefix, start_day, end_day):
+        """
+        Computes range_stats from prefix sums returned by prefix_sums, which are never modified once built, so a copy
+        kept by another thread stays valid while the aggregates change.
+
+        Args:
+            prefix (tuple): The result of prefix_sums.
+            start_day (int): Day ordinal of the start date.
+            end_day (int): Day ordinal of the end date.
+
+        Returns:
+            dict: (count, total) keyed by category, for categories with transactions in the range.
+        """
+        days, sums = prefix
+        low = np.searchsorted(days, start_day, side="left")
+        high = np.searchsorted(days, end_day, side="right")
+        stats = {}
+        for category, (counts, totals) in sums.items():
+            count = int(counts[high] - counts[low])
+            if count:
+                stats[category] = (count, float(totals[high] - totals[low]))
+        return stats
+
+    def differences(self, other):
+        """
+        Compares these aggregates with another set, allowing for floating point drift.
+
+        Args:
+            other (LedgerAggregates): Aggregates to compare with, for example ones rebuilt from scratch.
+
+        Returns:
+            list of str: One description per mismatching category, day or month; empty if they agree.
+        """
+        def close(mine, theirs):
+            return mine[0] == theirs[0] and all(math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+                                                for a, b in zip(mine[1:], theirs[1:]))
+
+        differences = []
+        for category in sorted(set(self.categories) | set(other.categories)):
+            mine = self.categories.get(category, [0, 0.0, 0.0])
+            theirs = other.categories.get(category, [0, 0.0, 0.0])
+            if not close(mine, theirs):
+                differences.append(f"{category}: running {mine} vs rebuilt {theirs}")
+
+        for name, target, source in (("day", self.days, other.days), ("month", self.months, other.months)):
+            for period in sorted(set(target) | set(source)):
+                for category in sorted(set(target.get(period, {})) | set(source.get(period, {}))):
+                    mine = target.get(period, {}).get(category, [0, 0.0])
+                    theirs = source.get(period, {}).get(category, [0, 0.0])
+                    if not close(mine, theirs):
+                        differences.append(f"{name} {period} {category}: running {mine} vs rebuilt {theirs}")
+        return differences
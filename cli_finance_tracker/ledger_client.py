@@ -0,0 +1,191 @@
+import argparse
+import json
+import random
+import socket
+import sys
+import threading
+import time
+
+
+class LedgerClient:
+    """
+    Sends requests to a running ledger server (python3 run.py serve) over its Unix domain socket.
+
+    Only the standard library is used, so a client starts without loading pandas or the ledger.
+
+    Attributes:
+        SOCKET_FILE (str): Default path of the socket, the same as LedgerServer.SOCKET_FILE.
+    """
+
+    SOCKET_FILE = "finance_ledger.sock"
+
+    def __init__(self, socket_file=None):
+        """
+        Connects to the server.
+
+        Args:
+            socket_file (str): Path of the server's socket, defaults to SOCKET_FILE.
+        """
+        self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connection.connect(socket_file or self.SOCKET_FILE)
+        self.responses = self.connection.makefile("rb")
+
+    def request(self, command, **fields):
+        """
+        Sends one request and waits for its response.
+
+        Args:
+            command (str): The command, e.g. "add", "query", "summary" or "report".
+            **fields: The command's fields, e.g. amount="12.50".
+
+        Returns:
+            dict: The response, with "ok" and either "output" or "error".
+        """
+        self.connection.sendall(f"{json.dumps({'command': command, **fields})}\n".encode())
+        line = self.responses.readline()
+        if not line:
+            raise ConnectionError("The ledger server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        """
+        Closes the connection.
+
+        Returns:
+            None
+        """
+        self.responses.close()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_test(socket_file, clients, requests_per_client, write_ratio):
+    """
+    Runs a mix of requests from several concurrent clients and prints throughput and latency percentiles.
+
+    Reads are split evenly between summary, query and report. With a write ratio above 0, that share of requests adds
+    a small "Load test" expense, so only run it against a copy of the ledger.
+
+    Args:
+        socket_file (str): Path of the server's socket.
+        clients (int): Number of concurrent connections.
+        requests_per_client (int): Number of requests sent on each connection.
+        write_ratio (float): Share of requests that are adds, between 0 and 1.
+
+    Returns:
+        int: 0 if every request succeeded, 1 otherwise.
+    """
+    latencies = {}
+    failures = []
+    lock = threading.Lock()
+
+    def run_client(seed):
+        generator = random.Random(seed)
+        timings = []
+        with LedgerClient(socket_file) as client:
+            for _ in range(requests_per_client):
+                if generator.random() < write_ratio:
+                    command, fields = "add", {"amount": "1.00", "category": "E", "description": "Load test"}
+                else:
+                    command, fields = generator.choice([
+                        ("summary", {}),
+                        ("query", {"start_date": "01-01-2024", "end_date": "12-31-2024"}),
+                        ("report", {"report_type": "expense"})
+                    ])
+                start = time.perf_counter()
+                response = client.request(command, **fields)
+                timings.append((command, time.perf_counter() - start))
+                if not response["ok"]:
+                    with lock:
+                        failures.append(response.get("error", command))
+        with lock:
+            for command, elapsed in timings:
+                latencies.setdefault(command, []).append(elapsed)
+
+    threads = [threading.Thread(target=run_client, args=(seed,)) for seed in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    def percentile(values, fraction):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    print(f"\n//////////////////// Load Test: {clients} clients, {len(all_latencies)} requests ////////////////////")
+    print(f"Throughput: {len(all_latencies) / elapsed:,.0f} requests/second ({elapsed:.2f} seconds)")
+    print(f"{'command':<10}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for command, values in sorted(latencies.items()) + [("all", all_latencies)]:
+        print(f"{command:<10}{len(values):>8}{percentile(values, 0.5):>10.2f}{percentile(values, 0.99):>10.2f}")
+    print(f"Failed requests: {len(failures)}")
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    """
+    Thin command-line client for the ledger server.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 on success, 1 if the server rejected the request.
+    """
+    parser = argparse.ArgumentParser(prog="ledger_client.py", description="Client for a ledger started with "
+                                                                          "'python3 run.py serve'.")
+    parser.add_argument("--socket", default=LedgerClient.SOCKET_FILE, help="Path of the server's socket")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Add a new transaction")
+    add.add_argument("--date", default="", help="Transaction date (mm-dd-yyyy), defaults to today")
+    add.add_argument("--amount", required=True, help="Transaction amount")
+    add.add_argument("--category", required=True, help="'I'/'Income' or 'E'/'Expense'")
+    add.add_argument("--description", default="", help="Optional description")
+
+    query = commands.add_parser("query", help="List transactions and their summary within a date range")
+    query.add_argument("start_date")
+    query.add_argument("end_date")
+
+    summary = commands.add_parser("summary", help="Summary balance, optionally within a date range")
+    summary.add_argument("start_date", nargs="?", default="")
+    summary.add_argument("end_date", nargs="?", default="")
+
+    report = commands.add_parser("report", help="Income or expense report grouped by description")
+    report.add_argument("report_type", choices=["income", "expense"])
+
+    test = commands.add_parser("loadtest", help="Measure requests per second and latency percentiles")
+    test.add_argument("--clients", type=int, default=8, help="Concurrent connections")
+    test.add_argument("--requests", type=int, default=500, help="Requests per connection")
+    test.add_argument("--write-ratio", type=float, default=0.0,
+                      help="Share of requests that add a transaction (changes the ledger)")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "loadtest":
+            return load_test(args.socket, args.clients, args.requests, args.write_ratio)
+
+        fields = {name: value for name, value in vars(args).items() if name not in ("socket", "command")}
+        with LedgerClient(args.socket) as client:
+            response = client.request(args.command, **fields)
+    except (FileNotFoundError, ConnectionError) as e:
+        print(f"\nCould not reach the ledger server on {args.socket}: {e}")
+        return 1
+
+    if response["ok"]:
+        print(response["output"], end="")
+        return 0
+    print(response.get("output", ""), end="")
+    print(f"\nRequest failed: {response.get('error', 'see output above')}")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
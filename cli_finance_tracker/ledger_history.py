@@ -0,0 +1,199 @@
+import os
+from durable_writer import DurableWriter
+from record_codec import RecordCodec
+from transaction_id_index import TransactionIdIndex
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class LedgerHistory:
+    """
+    Rebuilds past states of the transaction records from the audit logs.
+
+    The logs already hold what it takes to run the ledger backwards: the update log records the old value of every
+    field it changed, the delete log the complete deleted record, and the new entry log the ID of every added record.
+    Starting from a known state, each logged operation is reversed, newest first.
+
+    Snapshots bound how far back that has to go. A snapshot is the complete records as of a moment, saved in the
+    compact form of RecordCodec next to the transaction records (finance_data.snapshots/<microseconds>.npz). The state
+    as of a moment is rebuilt from the earliest snapshot taken after it, or from the current records if there is none,
+    by reversing only the operations logged in between. While going back, a snapshot is saved every SNAPSHOT_INTERVAL
+    operations, so a long replay is only ever done once.
+
+    Attributes:
+        SNAPSHOT_INTERVAL (int): Number of reversed operations between the snapshots saved during a replay.
+        ADDED (str): Operation name of new entry log rows.
+        UPDATED (str): Operation name of update log rows.
+        DELETED (str): Operation name of delete log rows.
+        COLUMNS (list of str): Columns of the compact records, see RecordCodec.
+    """
+
+    SNAPSHOT_INTERVAL = 10_000
+    ADDED = "added"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    COLUMNS = ["transaction_id", "date", "category", "amount", "description"]
+
+    def __init__(self, csv_file):
+        """
+        Args:
+            csv_file (str): Path to the transaction records CSV file the snapshot directory is named after.
+        """
+        self.directory = f"{os.path.splitext(csv_file)[0]}.snapshots"
+
+    def snapshot_file(self, covers):
+        """
+        Args:
+            covers (int): Epoch microseconds of the snapshot.
+
+        Returns:
+            str: Path of the snapshot file.
+        """
+        return os.path.join(self.directory, f"{covers}.npz")
+
+    def snapshots(self):
+        """
+        Returns:
+            list of int: The epoch microseconds each saved snapshot is as of, oldest first.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(int(name[:-4]) for name in names if name.endswith(".npz") and name[:-4].isdigit())
+
+    def covering(self, moment):
+        """
+        Args:
+            moment (int): Epoch microseconds.
+
+        Returns:
+            int: The earliest snapshot as of moment or later, or None if there is none.
+        """
+        return next((covers for covers in self.snapshots() if covers >= moment), None)
+
+    def save(self, records, codec, covers):
+        """
+        Saves compact records as the snapshot as of a moment. Only the descriptions the records use are saved, as one
+        UTF-8 buffer with their offsets.
+
+        Args:
+            records (pd.DataFrame): Compact records.
+            codec (RecordCodec): The codec the records were encoded with.
+            covers (int): Epoch microseconds: the records include every operation logged up to this moment and none
+                after it.
+
+        Returns:
+            None
+        """
+        codes, used = pd.factorize(records["description"].to_numpy())
+        strings = [codec.strings[code].encode() for code in used]
+        arrays = {column: records[column].to_numpy() for column in self.COLUMNS}
+        arrays["description"] = codes.astype(np.int32)
+        arrays["strings"] = np.frombuffer(b"".join(strings), dtype=np.uint8)
+        arrays["offsets"] = np.concatenate(([0], np.cumsum([len(string) for string in strings], dtype=np.int64)))
+        os.makedirs(self.directory, exist_ok=True)
+        DurableWriter.atomic_replace(self.snapshot_file(covers), lambda file: np.savez(file, **arrays), binary=True)
+
+    def load(self, covers):
+        """
+        Args:
+            covers (int): The snapshot to load, as returned by snapshots().
+
+        Returns:
+            tuple: (pd.DataFrame compact records, RecordCodec their codec)
+        """
+        codec = RecordCodec()
+        with np.load(self.snapshot_file(covers)) as saved:
+            strings = saved["strings"].tobytes()
+            offsets = saved["offsets"]
+            for start, end in zip(offsets[:-1], offsets[1:]):
+                codec.string_code(strings[start:end].decode())
+            records = pd.DataFrame({column: saved[column] for column in self.COLUMNS})
+        return records, codec
+
+    def reverse(self, records, codec, operations, checkpoint=False):
+        """
+        Runs records back through logged operations, newest first.
+
+        Only the records the operations touch are decoded; their states are kept in a dict and merged into the records
+        once at the end. An operation that does not fit the records, such as an update of a record that does not
+        exist, is skipped.
+
+        Args:
+            records (pd.DataFrame): Compact records, after the operations.
+            codec (RecordCodec): The codec of the records. Restored descriptions are added to its string table.
+            operations (pd.DataFrame): Log rows in the order they were logged, with an "operation" column (ADDED,
+                UPDATED or DELETED) and a "microseconds" column with the time they were logged.
+            checkpoint (bool): Save a snapshot every SNAPSHOT_INTERVAL operations.
+
+        Returns:
+            tuple: (pd.DataFrame the compact records before the operations, list of dict one reversal per operation,
+                newest first, with the operation's log row, the record before it was reversed ("before", None if it did
+                not exist) and whether it was applied)
+        """
+        columns = {column: records[column].to_numpy() for column in self.COLUMNS}
+        positions = TransactionIdIndex()
+        positions.build(columns["transaction_id"], np.arange(len(records)))
+        times = operations["microseconds"].to_numpy()
+        changed = {}
+        reversals = []
+
+        for count, (position, operation) in enumerate(zip(range(len(operations) - 1, -1, -1),
+                                                          operations.iloc[::-1].to_dict("records")), 1):
+            transaction_id = int(operation["transaction_id"])
+            if transaction_id in changed:
+                before = changed[transaction_id]
+            else:
+                row = positions.get(transaction_id)
+                before = None if row is None else codec.decode_row({column: values[row]
+                                                                    for column, values in columns.items()})
+
+            if operation["operation"] == self.ADDED:
+                applied = before is not None
+                after = None
+            elif operation["operation"] == self.UPDATED:
+                applied = before is not None
+                after = dict(before, **{operation["field_update"]: operation["old_value"]}) if applied else None
+            else:
+                applied = before is None
+                after = {
+                    "transaction_id": transaction_id,
+                    "date": operation["del_record_date"],
+                    "category": operation["del_record_category"],
+                    "amount": operation["del_record_amount"],
+                    "description": operation["del_record_description"]
+                }
+            if applied:
+                changed[transaction_id] = after
+            reversals.append({"operation": operation, "before": before, "applied": applied})
+
+            # Save a snapshot where the operation reversed last is the only one logged at its time.
+            if checkpoint and count % self.SNAPSHOT_INTERVAL == 0 and (position == 0 or
+                                                                       times[position - 1] < times[position]):
+                self.save(self.merge(records, codec, changed), codec, int(times[position]) - 1)
+        return self.merge(records, codec, changed), reversals
+
+    @classmethod
+    def merge(cls, records, codec, changed):
+        """
+        Applies the states of changed records to compact records.
+
+        Args:
+            records (pd.DataFrame): Compact records.
+            codec (RecordCodec): The codec of the records.
+            changed (dict): Record as returned by the backends, or None if it does not exist, keyed by transaction ID.
+
+        Returns:
+            pd.DataFrame: New compact records, ordered by transaction ID.
+        """
+        if not changed:
+            return records
+        ids = np.fromiter(changed, dtype=np.int64, count=len(changed))
+        kept = records[~np.isin(records["transaction_id"].to_numpy(), ids)]
+        restored = pd.DataFrame([row for row in changed.values() if row is not None], columns=cls.COLUMNS)
+        restored["amount"] = pd.to_numeric(restored["amount"])
+        merged = pd.concat([kept, codec.encode(restored).astype(kept.dtypes.to_dict())], ignore_index=True)
+        return merged.take(np.argsort(merged["transaction_id"].to_numpy(), kind="stable")).reset_index(drop=True)
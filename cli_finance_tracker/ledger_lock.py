@@ -0,0 +1,120 @@
+import fcntl
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class LedgerLock:
+    """
+    Advisory cross-process write lock for one ledger, plus the ledger's version stamp.
+
+    The lock is an fcntl.flock on a lock file next to the ledger (finance_data.lock). Every process that changes the
+    ledger holds it exclusively for the duration of the change, so read-modify-write sequences (assigning the next
+    transaction ID, journalling an update, compacting) cannot interleave. The lock is re-entrant within a process.
+
+    The lock file also holds the version stamp: a counter bumped by every change. Processes remember the version their
+    cached records were loaded at; a different stamp means another process changed the ledger since.
+
+    Attributes:
+        TIMEOUT (float): Seconds to keep retrying before giving up on a busy lock.
+        RETRY_DELAY (float): Initial delay between attempts, doubled after each failed attempt up to 50 ms.
+        STAMP_WIDTH (int): Width in bytes of the zero-padded version stamp at the start of the lock file.
+    """
+
+    TIMEOUT = 30.0
+    RETRY_DELAY = 0.001
+    STAMP_WIDTH = 20
+
+    def __init__(self, lock_file):
+        """
+        Args:
+            lock_file (str): Path of the lock file, created on first use.
+        """
+        self.lock_file = lock_file
+        self._fd = None
+        self._pid = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+        self.contended = 0
+
+    def descriptor(self):
+        """
+        The file is reopened in a forked child: flock locks belong to the open file, so a descriptor inherited from the
+        parent would share the parent's lock instead of excluding it.
+
+        Returns:
+            int: The open file descriptor of the lock file.
+        """
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+            self._depth = 0
+        return self._fd
+
+    @contextmanager
+    def exclusive(self):
+        """
+        Holds the lock exclusively for the duration of a with block, retrying with backoff while another process
+        holds it.
+
+        Returns:
+            bool: True for the outermost with block of this process, which actually took the flock.
+
+        Raises:
+            TimeoutError: If the lock could not be acquired within TIMEOUT seconds.
+        """
+        with self._thread_lock:
+            if self._depth == 0:
+                self.acquire()
+            self._depth += 1
+            try:
+                yield self._depth == 1
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    fcntl.flock(self.descriptor(), fcntl.LOCK_UN)
+
+    def acquire(self):
+        """
+        Takes the flock, retrying with exponential backoff.
+
+        Returns:
+            None
+        """
+        deadline = time.monotonic() + self.TIMEOUT
+        delay = self.RETRY_DELAY
+        while True:
+            try:
+                fcntl.flock(self.descriptor(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                self.contended += 1
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"The ledger is locked by another process ({self.lock_file})")
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
+
+    def version(self):
+        """
+        Reads the version stamp. Does not need the lock.
+
+        Returns:
+            int: The current version, 0 if the ledger has never been changed under a lock.
+        """
+        stamp = os.pread(self.descriptor(), self.STAMP_WIDTH, 0)
+        try:
+            return int(stamp)
+        except ValueError:
+            return 0
+
+    def bump(self):
+        """
+        Increments the version stamp. Must be called while holding the lock.
+
+        Returns:
+            int: The new version.
+        """
+        version = self.version() + 1
+        os.pwrite(self.descriptor(), str(version).zfill(self.STAMP_WIDTH).encode(), 0)
+        return version
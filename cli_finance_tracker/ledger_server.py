@@ -0,0 +1,277 @@
+import argparse
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from contextlib import contextmanager
+from csv_manager import CSVManager
+from durable_writer import DurableWriter
+from cli import CommandLine
+
+
+class ReadWriteLock:
+    """
+    Lets any number of readers hold the lock at the same time, or a single writer.
+
+    A waiting writer stops new readers from entering, so a steady stream of queries cannot starve writes.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def reading(self):
+        """
+        Holds the lock as a reader for the duration of a with block.
+        """
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        """
+        Holds the lock as the only writer for the duration of a with block.
+        """
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class ThreadOutput:
+    """
+    Replacement for sys.stdout that sends what a thread prints to that thread's capture buffer, if it has one.
+
+    The CSVManager operations report their results with print, so this is how the server returns their output to the
+    client that asked for it while other requests are printing at the same time.
+    """
+
+    def __init__(self, stream):
+        """
+        Args:
+            stream: The stream used by threads that are not capturing, normally the original sys.stdout.
+        """
+        self.stream = stream
+        self._local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer if buffer is not None else self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    @contextmanager
+    def capture(self):
+        """
+        Captures everything the current thread prints for the duration of a with block.
+
+        Returns:
+            io.StringIO: The buffer receiving the output.
+        """
+        self._local.buffer = io.StringIO()
+        try:
+            yield self._local.buffer
+        finally:
+            self._local.buffer = None
+
+
+class LedgerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Keeps the ledger loaded in memory and answers requests over a Unix domain socket.
+
+    The protocol is one JSON object per line in each direction, and a connection can send any number of requests:
+
+        {"command": "add", "amount": "12.50", "category": "E", "description": "Coffee"}
+        {"ok": true, "output": "\\nEntry added successfully\\n..."}
+
+    Every connection is served by its own thread. Writes hold a ReadWriteLock exclusively; reads share it while the
+    TransactionStore is up to date (pending rows merged, date index and aggregates loaded), so that concurrent readers
+    never modify it. A read that finds the store out of date brings it up to date and runs under the write lock.
+
+    Attributes:
+        SOCKET_FILE (str): Default path of the socket.
+        COMMANDS (dict): Request fields and their defaults keyed by command. None marks a required field.
+        WRITE_COMMANDS (set of str): Commands that modify the ledger.
+        REPORT_TYPES (list of str): Accepted values of the report command's report_type field.
+    """
+
+    SOCKET_FILE = "finance_ledger.sock"
+    COMMANDS = {
+        "add": {"date": "", "amount": None, "category": None, "description": ""},
+        "query": {"start_date": None, "end_date": None},
+        "summary": {"start_date": "", "end_date": ""},
+        "report": {"report_type": None},
+        "ping": {}
+    }
+    WRITE_COMMANDS = {"add"}
+    REPORT_TYPES = ["income", "expense"]
+
+    daemon_threads = True
+
+    def __init__(self, socket_file=None):
+        """
+        Binds the socket, replacing a stale socket file left behind by a server that is no longer running. Only the
+        user running the server can connect, see server_bind.
+
+        Args:
+            socket_file (str): Path of the socket, defaults to SOCKET_FILE.
+
+        Raises:
+            RuntimeError: If another server is already listening on the socket.
+        """
+        self.socket_file = socket_file or self.SOCKET_FILE
+        if os.path.exists(self.socket_file):
+            if self.is_listening(self.socket_file):
+                raise RuntimeError(f"A ledger server is already running on {self.socket_file}")
+            os.remove(self.socket_file)
+        super().__init__(self.socket_file, LedgerRequestHandler)
+        self.lock = ReadWriteLock()
+        self.output = ThreadOutput(sys.stdout)
+
+    def server_bind(self):
+        """
+        Binds the socket and makes the socket file readable and writable by its owner only, before the server starts
+        listening, so other users on the machine cannot send requests to the ledger.
+
+        Returns:
+            None
+        """
+        super().server_bind()
+        os.chmod(self.socket_file, 0o600)
+
+    @staticmethod
+    def is_listening(socket_file):
+        """
+        Args:
+            socket_file (str): Path of a Unix domain socket.
+
+        Returns:
+            bool: True if a server accepts connections on the socket.
+        """
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_file)
+            return True
+        except OSError:
+            return False
+        finally:
+            probe.close()
+
+    def serve(self):
+        """
+        Loads the ledger and serves requests until interrupted with Ctrl+C or stopped with SIGTERM.
+
+        Returns:
+            None
+        """
+        CSVManager.store().warm()
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        sys.stdout = self.output
+        print(f"Serving the ledger on {self.socket_file}. Press Ctrl+C to stop.")
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            print("\nStopping the ledger server ...")
+        finally:
+            self.server_close()
+            os.remove(self.socket_file)
+            DurableWriter.flush_logs()
+            sys.stdout = self.output.stream
+
+    def execute(self, request):
+        """
+        Runs one request and returns the response to send back.
+
+        Args:
+            request (dict): The decoded request.
+
+        Returns:
+            dict: {"ok": bool, "output": str} on success, {"ok": False, "error": str} if the request was rejected.
+        """
+        command = request.get("command")
+        if command not in self.COMMANDS:
+            return {"ok": False, "error": f"Unknown command: {command}"}
+        fields = {field: request.get(field, default) for field, default in self.COMMANDS[command].items()}
+        missing = [field for field, value in fields.items() if value is None]
+        if missing:
+            return {"ok": False, "error": f"Missing fields: {', '.join(missing)}"}
+        if command == "report" and fields["report_type"] not in self.REPORT_TYPES:
+            return {"ok": False, "error": f"report_type must be one of {', '.join(self.REPORT_TYPES)}"}
+        if command == "ping":
+            return {"ok": True, "output": ""}
+
+        args = argparse.Namespace(command=command, **{field: str(value) for field, value in fields.items()})
+        try:
+            if command in self.WRITE_COMMANDS:
+                with self.lock.writing(), self.output.capture() as output:
+                    status = CommandLine.execute(args)
+            else:
+                with self.warm_reading(), self.output.capture() as output:
+                    status = CommandLine.execute(args)
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {"ok": status == 0, "output": output.getvalue()}
+
+    @contextmanager
+    def warm_reading(self):
+        """
+        Holds the lock for the duration of a with block that reads the ledger, with the store warm throughout.
+
+        The store is checked under the read lock, so no write can leave it cold between the check and the read. If the
+        last writes left it cold, it is warmed under the write lock instead, and the read runs before that is released.
+        """
+        store = CSVManager.store()
+        with self.lock.reading():
+            if store.is_warm():
+                yield
+                return
+        with self.lock.writing():
+            store.warm()
+            yield
+
+
+class LedgerRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Reads newline-delimited JSON requests from one client connection and writes one JSON response line for each.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {"ok": False, "error": "Requests must be one JSON object per line"}
+            else:
+                response = self.server.execute(request) if isinstance(request, dict) else \
+                    {"ok": False, "error": "Requests must be JSON objects"}
+            self.wfile.write(f"{json.dumps(response)}\n".encode())
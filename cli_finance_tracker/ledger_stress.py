@@ -0,0 +1,177 @@
+import argparse
+import contextlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+from csv_manager import CSVManager
+from transaction_store import TransactionStore
+from durable_writer import DurableWriter
+
+
+def run_worker(directory, worker_id, operations, compact_threshold):
+    """
+    Adds, updates and deletes transactions in a shared ledger from one process.
+
+    Each worker only updates and deletes transactions it added itself, so the expected end state is known exactly
+    while all workers still contend for the same files, transaction IDs and journal. Every add and description update
+    writes a description no other operation uses, so descriptions coded by one process and read by another are
+    checked too.
+
+    Args:
+        directory (str): Directory holding the shared ledger.
+        worker_id (int): Number of this worker, used as its random seed.
+        operations (int): Number of operations to run.
+        compact_threshold (int): Journal length that triggers compaction, kept low so compactions race with writes.
+
+    Returns:
+        dict: Expected (date, amount, description) by transaction ID for the worker's surviving transactions, the IDs
+            it deleted, and its failure, conflict and lock contention counts.
+    """
+    os.chdir(directory)
+    TransactionStore.COMPACT_THRESHOLD = compact_threshold
+    generator = random.Random(worker_id)
+    expected = {}
+    deleted = []
+    failures = 0
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for operation in range(operations):
+            choice = generator.random()
+            amount = float(f"{worker_id}{operation:06d}") / 100 + 1
+            description = f"Worker {worker_id} operation {operation}"
+            if choice < 0.5 or not expected:
+                date = f"01-{generator.randint(1, 28):02d}-2024"
+                transaction_id = CSVManager.add_entry(date, amount, generator.choice(["Income", "Expense"]),
+                                                      description)
+                if transaction_id is None:
+                    failures += 1
+                else:
+                    expected[transaction_id] = (date, amount, description)
+            elif choice < 0.7:
+                transaction_id = generator.choice(list(expected))
+                CSVManager.update_transactions(transaction_id, "amount", amount)
+                expected[transaction_id] = (expected[transaction_id][0], amount, expected[transaction_id][2])
+            elif choice < 0.85:
+                transaction_id = generator.choice(list(expected))
+                CSVManager.update_transactions(transaction_id, "description", description)
+                expected[transaction_id] = expected[transaction_id][:2] + (description,)
+            else:
+                transaction_id = generator.choice(list(expected))
+                CSVManager.delete_transaction(transaction_id)
+                expected.pop(transaction_id)
+                deleted.append(transaction_id)
+
+        DurableWriter.flush_logs()
+    store = CSVManager.store()
+    return {"expected": expected, "deleted": deleted, "failures": failures, "conflicts": store.conflicts,
+            "contended": store.lock.contended}
+
+
+def verify(results):
+    """
+    Reloads the ledger and compares it with what the workers expect.
+
+    Args:
+        results (list of dict): The return values of run_worker.
+
+    Returns:
+        list of str: One message per problem found; empty if the ledger is consistent.
+    """
+    TransactionStore._stores.clear()
+    df = CSVManager.store().frame()
+    amounts = dict(zip(df["transaction_id"].tolist(), df["amount"].tolist()))
+    rows = dict(zip(df["transaction_id"].tolist(), zip(df["date"].tolist(), df["description"].tolist())))
+    problems = []
+
+    duplicates = df["transaction_id"][df["transaction_id"].duplicated()].tolist()
+    if duplicates:
+        problems.append(f"{len(duplicates)} duplicate transaction IDs, e.g. {duplicates[:5]}")
+
+    expected = {tid: values for result in results for tid, values in result["expected"].items()}
+    lost = [tid for tid, (_, amount, _) in expected.items() if tid not in amounts or abs(amounts[tid] - amount) > 1e-9]
+    if lost:
+        problems.append(f"{len(lost)} lost adds or updates, e.g. {lost[:5]}")
+
+    mismatched = [tid for tid, (date, _, description) in expected.items()
+                  if tid in rows and rows[tid] != (date, description)]
+    if mismatched:
+        problems.append(f"{len(mismatched)} transactions with another date or description than written, "
+                        f"e.g. {mismatched[:5]}")
+
+    resurrected = [tid for result in results for tid in result["deleted"] if tid in amounts]
+    if resurrected:
+        problems.append(f"{len(resurrected)} deleted transactions still present, e.g. {resurrected[:5]}")
+
+    unexpected = len(amounts) - len(expected)
+    if unexpected > 0:
+        problems.append(f"{unexpected} transactions no worker expects")
+
+    failures = sum(result["failures"] for result in results)
+    if failures:
+        problems.append(f"{failures} adds failed")
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        aggregates_match = CSVManager.check_aggregates()
+    if not aggregates_match:
+        problems.append("running aggregates drifted from the records")
+    return problems
+
+
+def main(argv=None):
+    """
+    Multiprocess stress test for the ledger lock: N workers hammer one ledger with adds, updates and deletes, then
+    the ledger is checked for duplicate IDs, lost updates and resurrected deletes.
+
+    The ledger is created in a temporary directory, so real data is never touched.
+
+    Args:
+        argv (list of str): Arguments after the program name, defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 if the ledger is consistent, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="ledger_stress.py", description=main.__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--workers", type=int, default=8, help="Number of concurrent processes")
+    parser.add_argument("--operations", type=int, default=200, help="Operations per worker")
+    parser.add_argument("--compact-threshold", type=int, default=50, help="Journal length that triggers compaction")
+    parser.add_argument("--backend", default="csv", choices=["csv", "numpy", "sqlite", "partitioned"],
+                        help="Storage backend")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary ledger directory")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="ledger_stress_")
+    os.chdir(directory)
+    CSVManager.CSV_FILES_DICT[0]["backend"] = args.backend
+    CSVManager.initialize_csv(verbose=False)
+
+    start = time.perf_counter()
+    with Pool(args.workers) as pool:
+        results = pool.starmap(run_worker, [(directory, worker_id, args.operations, args.compact_threshold)
+                                            for worker_id in range(1, args.workers + 1)])
+    elapsed = time.perf_counter() - start
+    problems = verify(results)
+
+    total = args.workers * args.operations
+    print(f"\n//////////////////// Stress Test: {args.workers} workers x {args.operations} operations "
+          f"////////////////////")
+    print(f"Throughput: {total / elapsed:,.0f} operations/second ({elapsed:.2f} seconds)")
+    print(f"Stale caches reloaded before a write: {sum(result['conflicts'] for result in results)}")
+    print(f"Lock retries: {sum(result['contended'] for result in results)}")
+    for problem in problems:
+        print(f"FAILED: {problem}")
+    if not problems:
+        print("Ledger is consistent: no duplicate IDs, lost updates, mixed up descriptions or resurrected deletes.")
+
+    if args.keep:
+        print(f"Ledger kept in {directory}")
+    else:
+        shutil.rmtree(directory)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
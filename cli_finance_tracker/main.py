@@ -16,6 +16,7 @@ def main():
         - Viewing transactions and logs
         - Viewing summary balance
         - Viewing income and expense reports
+        - Viewing the summary within a date range
         - Exiting the program
 
     Initializes the CSV files and provides a loop to handle user input and execute the corresponding functions.
@@ -37,8 +38,9 @@ def main():
         print("5. View Transactions And Logs")
         print("6. View Summary Balance")
         print("7. View Income Expense Report")
-        print("8. Exit")
-        choice = input("Enter your choice (1-8): ")
+        print("8. View Summary Within A Date Range")
+        print("9. Exit")
+        choice = input("Enter your choice (1-9): ")
 
         if choice == "1":
             UpdateLogManager.add()
@@ -59,7 +61,11 @@ def main():
         elif choice == "7":
             ReportManager.view_income_expense_report()
         elif choice == "8":
+            start_date = UserEntryManager.get_date("Enter the start date (mm-dd-yyyy): ")
+            end_date = UserEntryManager.get_date("Enter the end date (mm-dd-yyyy): ")
+            CSVManager.range_summary(start_date, end_date)
+        elif choice == "9":
             print("Exiting ....")
             break
         else:
-            print("Invalid choice. Enter 1 - 8.")
+            print("Invalid choice. Enter 1 - 9.")
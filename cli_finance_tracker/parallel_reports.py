@@ -0,0 +1,202 @@
+import os
+from storage_backends import CSVBackend, PartitionedBackend
+from transaction_store import TransactionStore
+from record_codec import RecordCodec
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def partition_rows(partition_file, columns, journal, start_day, end_day):
+    """
+    Map step of a date range query: reads one partition and returns its transactions within the range.
+
+    Args:
+        partition_file (str): Path to the partition's CSV file.
+        columns (list of str): Column names of the transaction records.
+        journal (list of dict): The ledger's journal entries, applied before filtering.
+        start_day (int): First day ordinal of the range.
+        end_day (int): Last day ordinal of the range, inclusive.
+
+    Returns:
+        pd.DataFrame: The matching transactions, with their day ordinal in an extra "day" column.
+    """
+    codec = RecordCodec()
+    df = TransactionStore.apply_journal(codec.encode(CSVBackend(partition_file, columns).read()), journal, codec)
+    rows = df[(df["date"] >= start_day) & (df["date"] <= end_day)]
+    return codec.decode(rows).assign(day=rows["date"].to_numpy())
+
+
+def partition_description_totals(partition_file, columns, journal, category):
+    """
+    Map step of an income or expense report: reads one partition and totals one category by lower-cased description.
+
+    Args:
+        partition_file (str): Path to the partition's CSV file.
+        columns (list of str): Column names of the transaction records.
+        journal (list of dict): The ledger's journal entries, applied before totalling.
+        category (str): "Income" or "Expense".
+
+    Returns:
+        pd.Series: Partial total in cents indexed by description.
+    """
+    codec = RecordCodec()
+    df = TransactionStore.apply_journal(codec.encode(CSVBackend(partition_file, columns).read()), journal, codec)
+    return description_cents(df, codec, category)
+
+
+def description_cents(df, codec, category):
+    """
+    Totals one category of compact records by lower-cased description.
+
+    Args:
+        df (pd.DataFrame): Compact records.
+        codec (RecordCodec): The codec the records were encoded with.
+        category (str): "Income" or "Expense".
+
+    Returns:
+        pd.Series: Total in cents indexed by description.
+    """
+    rows = df[df["category"] == codec.category_code(category)]
+    cents = rows["amount"].groupby(rows["description"]).sum()
+    descriptions = pd.Series(codec.string_array().take(cents.index.to_numpy()), dtype=str).str.lower()
+    return pd.Series(cents.to_numpy(), index=descriptions.to_numpy()).groupby(level=0).sum()
+
+
+class ParallelReports:
+    """
+    Runs reports over a partitioned ledger (storage_backends.PartitionedBackend) as map-reduce jobs: every partition is
+    scanned by a worker process of a ProcessPoolExecutor, which returns a partial result, and the partial results are
+    merged in the calling process.
+
+    Partitions whose period lies outside the requested date range are pruned before any file is read. Pruning is
+    skipped while the journal holds date changes, which can move a transaction out of its partition's period until the
+    next compaction.
+
+    The reports are only used while the store has not loaded the records; once they are in memory (the ledger server,
+    the interactive menu after a full read) the cached indexes answer faster than re-reading the files.
+
+    Attributes:
+        WORKERS (int): Number of worker processes, defaults to the number of CPUs.
+        _executor (ProcessPoolExecutor): Pool shared by all reports, started on first use.
+        _executor_workers (int): Number of workers _executor was started with.
+    """
+
+    WORKERS = os.cpu_count() or 1
+
+    _executor = None
+    _executor_workers = None
+
+    @classmethod
+    def applies(cls, store):
+        """
+        Args:
+            store (TransactionStore): The store holding the transaction records.
+
+        Returns:
+            bool: True if the records are partitioned and not already loaded into the store.
+        """
+        return isinstance(store.backend, PartitionedBackend) and not store.is_warm()
+
+    @classmethod
+    def executor(cls):
+        """
+        Returns:
+            ProcessPoolExecutor: The shared pool, restarted if WORKERS changed.
+        """
+        # Imported here because multiprocessing would add to the start-up time of every command.
+        from concurrent.futures import ProcessPoolExecutor
+
+        if cls._executor is None or cls._executor_workers != cls.WORKERS:
+            cls.shutdown()
+            cls._executor = ProcessPoolExecutor(max_workers=cls.WORKERS)
+            cls._executor_workers = cls.WORKERS
+        return cls._executor
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Stops the shared pool, if it was started.
+
+        Returns:
+            None
+        """
+        if cls._executor is not None:
+            cls._executor.shutdown()
+            cls._executor = None
+
+    @classmethod
+    def scan(cls, store, generation, start_day=None, end_day=None):
+        """
+        Lists the partitions a report has to read, together with the journal to apply to them.
+
+        Args:
+            store (TransactionStore): The store holding the partitioned records.
+            generation (str): Directory of the partition generation to read, see PartitionedBackend.generation().
+            start_day (int): First day ordinal of the report, or None for no lower bound.
+            end_day (int): Last day ordinal of the report, or None for no upper bound.
+
+        Returns:
+            tuple: (list of partition file paths, list of journal entries)
+        """
+        journal = store.read_journal()
+        names = store.backend.partitions(generation)
+        moved = any(entry["op"] == "update" and entry["field"] == "date" for entry in journal)
+        if not moved:
+            low = float("-inf") if start_day is None else start_day
+            high = float("inf") if end_day is None else end_day
+            names = [name for name in names if low <= store.backend.partition_days(name)[1]
+                     and store.backend.partition_days(name)[0] <= high]
+        return [store.backend.partition_file(name, generation) for name in names], journal
+
+    @classmethod
+    def date_range(cls, store, start_date, end_date):
+        """
+        Returns the transactions dated between start_date and end_date inclusive, ordered by date.
+
+        Args:
+            store (TransactionStore): The store holding the partitioned records.
+            start_date (datetime): The start date of the range.
+            end_date (datetime): The end date of the range.
+
+        Returns:
+            pd.DataFrame: The matching transaction records.
+        """
+        start_day, end_day = store.day_ordinal(start_date), store.day_ordinal(end_date)
+
+        def run(generation):
+            files, journal = cls.scan(store, generation, start_day, end_day)
+            return list(cls.executor().map(partition_rows, files, [store.columns] * len(files),
+                                           [journal] * len(files), [start_day] * len(files), [end_day] * len(files)))
+
+        parts = store.backend.in_generation(run)
+        if not parts:
+            return pd.DataFrame(columns=store.columns).astype(CSVBackend.DTYPES)
+        df = pd.concat(parts, ignore_index=True)
+        return df.sort_values(["day", "transaction_id"], kind="stable").drop(columns="day").reset_index(drop=True)
+
+    @classmethod
+    def description_totals(cls, store, category):
+        """
+        Returns the total amount per lower-cased description for one category.
+
+        Args:
+            store (TransactionStore): The store holding the partitioned records.
+            category (str): "Income" or "Expense".
+
+        Returns:
+            pd.Series: Total amount indexed by description, sorted by description.
+        """
+        def run(generation):
+            files, journal = cls.scan(store, generation)
+            return [part for part in cls.executor().map(partition_description_totals, files,
+                                                        [store.columns] * len(files), [journal] * len(files),
+                                                        [category] * len(files)) if not part.empty]
+
+        parts = store.backend.in_generation(run)
+        if not parts:
+            return pd.Series(dtype="float64", name="amount", index=pd.Index([], name="description"))
+        totals = pd.concat(parts).groupby(level=0).sum().sort_index() / 100
+        totals.index.name = "description"
+        return totals.rename("amount")
@@ -0,0 +1,220 @@
+from user_entry_manager import UserEntryManager
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class RecordCodec:
+    """
+    Converts transaction records between the form the storage backends read and write (date strings, category names,
+    float amounts, descriptions) and the compact typed form TransactionStore keeps in memory:
+
+        transaction_id    int64
+        date              int32 day ordinal (days since 1970-01-01)
+        category          int8 code into CATEGORIES
+        amount            int64 amount in cents
+        description       int32 code into the codec's string table
+
+    That is 25 bytes per record plus the distinct descriptions, against around 200 bytes for Python string columns.
+    Amounts are rounded to whole cents, so totals summed from the compact records do not accumulate float error.
+
+    The string table only grows while the records are cached: a description that is no longer used keeps its code
+    until reset() is called when the records are reloaded.
+
+    Attributes:
+        CATEGORIES (list of str): Category names, indexed by category code.
+        DISPLAY_TYPES (dict): Column types of decoded records, the same as the backends return.
+        strings (list of str): Raw descriptions, indexed by description code.
+    """
+
+    CATEGORIES = list(UserEntryManager.CATEGORIES.values())
+    DATE_FORMAT = UserEntryManager.DATE_FORMAT
+    DISPLAY_TYPES = {
+        "transaction_id": "int64",
+        "date": str,
+        "category": str,
+        "amount": "float64",
+        "description": str
+    }
+
+    def __init__(self):
+        self.strings = []
+        self._string_codes = {}
+        self._string_array = None
+
+    def reset(self):
+        """
+        Empties the string table, for example before the records are reloaded.
+
+        Returns:
+            None
+        """
+        self.strings = []
+        self._string_codes = {}
+        self._string_array = None
+
+    def view(self):
+        """
+        Returns a codec that decodes with the string table as it is now, for decoding on another thread while this one
+        keeps encoding. The table is only appended to, and reset() replaces it instead of emptying it, so the view
+        stays valid for every code it contains.
+
+        Returns:
+            RecordCodec: A codec sharing the current string table.
+        """
+        codec = RecordCodec()
+        codec.strings = self.strings
+        return codec
+
+    @classmethod
+    def day_ordinals(cls, dates):
+        """
+        Converts date strings to int32 day ordinals. Only the distinct date strings are parsed, since a ledger repeats
+        the same dates many times.
+
+        Args:
+            dates (pd.Series or list of str): Dates in DATE_FORMAT, also accepted as a categorical Series.
+
+        Returns:
+            np.ndarray: The day ordinals, in the same order as the input.
+        """
+        codes, unique_dates = pd.factorize(pd.Series(dates))
+        parsed = pd.to_datetime(pd.Series(unique_dates, dtype=str), format=cls.DATE_FORMAT)
+        return parsed.to_numpy().astype("datetime64[D]").astype(np.int32).take(codes)
+
+    def category_code(self, category):
+        """
+        Args:
+            category (str): A category name from CATEGORIES.
+
+        Returns:
+            int: The category's code.
+
+        Raises:
+            ValueError: If the category is unknown.
+        """
+        try:
+            return self.CATEGORIES.index(str(category))
+        except ValueError:
+            raise ValueError(f"Unknown category in the transaction records: {category}") from None
+
+    def string_code(self, description):
+        """
+        Returns the code of a description, adding it to the string table if it is new.
+
+        Args:
+            description (str): The raw description.
+
+        Returns:
+            int: The description's code.
+        """
+        description = str(description)
+        code = self._string_codes.get(description)
+        if code is None:
+            code = self._string_codes[description] = len(self.strings)
+            self.strings.append(description)
+            self._string_array = None
+        return code
+
+    def string_array(self):
+        """
+        Returns:
+            np.ndarray: The string table as an object array, for decoding many codes with one take.
+        """
+        if self._string_array is None or len(self._string_array) != len(self.strings):
+            self._string_array = np.array(self.strings, dtype=object)
+        return self._string_array
+
+    def encode(self, data_frame):
+        """
+        Converts records to the compact form. Each column is factorized first, so only its distinct values are parsed
+        or looked up.
+
+        Args:
+            data_frame (pd.DataFrame): Records as returned by a backend; string columns may be str or categorical.
+
+        Returns:
+            pd.DataFrame: The compact records, with the same index.
+        """
+        category_codes, categories = pd.factorize(data_frame["category"])
+        description_codes, descriptions = pd.factorize(data_frame["description"])
+        category_table = np.array([self.category_code(category) for category in categories], dtype=np.int8)
+        string_table = np.array([self.string_code(description) for description in descriptions], dtype=np.int32)
+        return pd.DataFrame({
+            "transaction_id": np.array(data_frame["transaction_id"], dtype=np.int64),
+            "date": self.day_ordinals(data_frame["date"]) if len(data_frame) else np.empty(0, dtype=np.int32),
+            "category": category_table.take(category_codes),
+            "amount": np.rint(data_frame["amount"].to_numpy(dtype=np.float64) * 100).astype(np.int64),
+            "description": string_table.take(description_codes)
+        }, index=data_frame.index, copy=False)
+
+    def decode(self, records, parse_dates=False):
+        """
+        Converts compact records back to the form the backends return.
+
+        Args:
+            records (pd.DataFrame): Compact records.
+            parse_dates (bool): Return the date column as datetime64 values instead of DATE_FORMAT strings.
+
+        Returns:
+            pd.DataFrame: The records, with the same index.
+        """
+        days = records["date"].to_numpy()
+        if parse_dates:
+            dates = pd.to_datetime(days.astype(np.int64), unit="D")
+        elif len(days):
+            date_codes, unique_days = pd.factorize(days)
+            dates = pd.to_datetime(unique_days.astype(np.int64), unit="D").strftime(self.DATE_FORMAT).to_numpy()
+            dates = dates.take(date_codes)
+        else:
+            dates = np.empty(0, dtype=object)
+        decoded = pd.DataFrame({
+            "transaction_id": records["transaction_id"].to_numpy(),
+            "date": dates,
+            "category": np.array(self.CATEGORIES, dtype=object).take(records["category"].to_numpy()),
+            "amount": records["amount"].to_numpy() / 100,
+            "description": self.string_array().take(records["description"].to_numpy())
+        }, index=records.index, copy=False)
+        types = dict(self.DISPLAY_TYPES, date="datetime64[ns]") if parse_dates else self.DISPLAY_TYPES
+        return decoded.astype(types)
+
+    def decode_row(self, values):
+        """
+        Converts one compact record back to the values the backends return, without building a DataFrame.
+
+        Args:
+            values (dict): The compact value of each column.
+
+        Returns:
+            dict: The record, keyed by column name.
+        """
+        date = np.datetime64(int(values["date"]), "D").astype(object)
+        return {
+            "transaction_id": int(values["transaction_id"]),
+            "date": date.strftime(self.DATE_FORMAT),
+            "category": self.CATEGORIES[int(values["category"])],
+            "amount": int(values["amount"]) / 100,
+            "description": self.strings[int(values["description"])]
+        }
+
+    def encode_value(self, field, value):
+        """
+        Converts one field value to its compact form, for patching a single cell.
+
+        Args:
+            field (str): The column name.
+            value: The value as the backends store it.
+
+        Returns:
+            int: The compact value.
+        """
+        if field == "date":
+            return int(self.day_ordinals([value])[0])
+        if field == "category":
+            return self.category_code(value)
+        if field == "amount":
+            return int(round(float(value) * 100))
+        if field == "description":
+            return self.string_code(value)
+        return int(value)
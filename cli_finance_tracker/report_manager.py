@@ -1,6 +1,10 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import os
+import sys
 from csv_manager import CSVManager
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
 
 
 class ReportManager:
@@ -12,8 +16,18 @@ class ReportManager:
         view_summary: Displays a summary of transactions including net amounts.
         plot_transactions: Plots income and expenses over time.
         view_income_expense_report: Generates and displays income or expense reports.
+
+    Attributes:
+        PLOT_FILE (str): File the plot is saved to when there is no display to show it on.
+        MAX_PLOT_POINTS (int): Points per series above which a series is decimated before plotting.
+        RESOLUTIONS (list of tuple): (longest date range in days, pandas frequency, name) of each plot resolution,
+            finest first; the last one has no limit.
     """
 
+    PLOT_FILE = "finance_plot.png"
+    MAX_PLOT_POINTS = 400
+    RESOLUTIONS = [(731, "D", "day"), (3653, "W", "week"), (None, "MS", "month")]
+
     @staticmethod
     def view_logs():
         """
@@ -57,41 +71,144 @@ class ReportManager:
         """
         Displays a summary of transactions, including net amounts.
 
-        Reads transaction data from the CSV file and generates a summary of income and expenses.
+        The summary comes from the running per-category aggregates, so it does not depend on the size of the ledger.
 
         Returns:
             None
         """
-        df = pd.read_csv(CSVManager.CSV_FILES_DICT[0]["csv_file"])
-        CSVManager.net_amount(df)
+        CSVManager.ledger_summary()
+
+    @classmethod
+    def plot_transactions(cls, df, output_file=None):
+        """
+        Plots income and expenses over time. matplotlib is only imported here, so starting the program does not load it.
+
+        The amounts are summed per day, week or month depending on the length of the date range (RESOLUTIONS), and
+        series longer than MAX_PLOT_POINTS are decimated, so the cost of drawing does not grow with the ledger.
+
+        With an output file, or when there is no display to show a window on, the plot is rendered without pyplot and
+        saved as PNG, SVG or any other format matplotlib infers from the file extension; nothing blocks.
+
+        Args:
+            df (pandas.DataFrame): DataFrame containing transaction data with columns 'date', 'category', and 'amount'.
+            output_file (str): File to save the plot to instead of showing it.
+
+        Returns:
+            str: The file the plot was saved to, or None if it was shown in a window or there was nothing to plot.
+        """
+        if df is None or df.empty:
+            print("\nNo transactions to plot.")
+            return None
+        if output_file is None and not cls.has_display():
+            output_file = cls.PLOT_FILE
+
+        if output_file is None:
+            import matplotlib.pyplot as plt
+
+            figure = plt.figure(figsize=(10, 6))
+            cls.draw(figure.add_subplot(), df)
+            plt.show()
+            return None
+
+        # A Figure that is not registered with pyplot renders through Agg (or the SVG backend), no GUI toolkit needed.
+        from matplotlib.figure import Figure
+
+        figure = Figure(figsize=(10, 6))
+        cls.draw(figure.add_subplot(), df)
+        figure.savefig(output_file)
+        print(f"\nPlot saved to {output_file}")
+        return output_file
 
     @staticmethod
-    def plot_transactions(df):
+    def has_display():
         """
-        Plots income and expenses over time.
+        Returns:
+            bool: True if pyplot can open a window: on macOS and Windows, or with an X11 or Wayland display on other
+                systems, unless matplotlib is told to use the non-interactive Agg backend.
+        """
+        if os.environ.get("MPLBACKEND", "").lower() == "agg":
+            return False
+        return sys.platform in ("darwin", "win32") or bool(os.environ.get("DISPLAY") or
+                                                           os.environ.get("WAYLAND_DISPLAY"))
+
+    @classmethod
+    def draw(cls, axes, df):
+        """
+        Draws the resampled and decimated income and expense series.
 
         Args:
+            axes (matplotlib.axes.Axes): The axes to draw on.
             df (pandas.DataFrame): DataFrame containing transaction data with columns 'date', 'category', and 'amount'.
 
         Returns:
             None
         """
-        df_grouped = df.groupby(["date", "category"])["amount"].sum().reset_index()
-        df_grouped.set_index("date", inplace=True)
-        plt.figure(figsize=(10, 6))
+        series, resolution = cls.resample(df)
+        for category, color in (("Income", "green"), ("Expense", "red")):
+            points = cls.decimate(series[category], cls.MAX_PLOT_POINTS)
+            axes.plot(points.index, points.to_numpy(), "o-" if len(points) <= 100 else "-", label=category,
+                      color=color)
+
+        axes.set_xlabel("Date")
+        axes.set_ylabel(f"Amount per {resolution}")
+        axes.set_title("Income and Expenses Over Time")
+        axes.legend()
+        axes.grid(True)
+
+    @classmethod
+    def resample(cls, df):
+        """
+        Sums the amounts of each category per day, week or month, choosing the finest resolution in RESOLUTIONS that
+        covers the date range. Periods without transactions are included with a total of 0.
 
-        plot_income_data = df_grouped[df_grouped["category"] == "Income"]
-        plt.plot(plot_income_data.index, plot_income_data["amount"], "o-", label="Income", color="green")
+        Daily totals are summed with np.bincount over day ordinals, so the transactions are never sorted; only the
+        daily totals are resampled to weeks or months.
 
-        plot_expense_data = df_grouped[df_grouped["category"] == "Expense"]
-        plt.plot(plot_expense_data.index, plot_expense_data["amount"], "o-", label="Expense", color="red")
+        Args:
+            df (pandas.DataFrame): DataFrame containing transaction data with columns 'date', 'category', and 'amount'.
 
-        plt.xlabel("Date")
-        plt.ylabel("Amount")
-        plt.title("Income and Expenses Over Time")
-        plt.legend()
-        plt.grid(True)
-        plt.show()
+        Returns:
+            tuple: (dict of pd.Series of totals indexed by period start, keyed by category; name of the resolution)
+        """
+        dates = df["date"]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, format=CSVManager.FORMAT)
+        days = dates.to_numpy().astype("datetime64[D]").astype(np.int64)
+        first_day = days.min()
+        length = int(days.max() - first_day) + 1
+        frequency, resolution = next((frequency, resolution) for longest, frequency, resolution in cls.RESOLUTIONS
+                                     if longest is None or length <= longest)
+
+        period_days = pd.date_range(pd.Timestamp(first_day, unit="D"), periods=length, freq="D")
+        amounts = df["amount"].to_numpy(dtype=np.float64)
+        categories = df["category"].to_numpy()
+        series = {}
+        for category in ("Income", "Expense"):
+            mask = categories == category
+            daily = pd.Series(np.bincount(days[mask] - first_day, weights=amounts[mask], minlength=length),
+                              index=period_days)
+            series[category] = daily if frequency == "D" else daily.resample(frequency).sum()
+        return series, resolution
+
+    @staticmethod
+    def decimate(series, max_points):
+        """
+        Thins a series to at most max_points points by splitting it into max_points / 2 buckets of consecutive points
+        and keeping the smallest and the largest point of each, so spikes survive where averaging would flatten them.
+
+        Args:
+            series (pd.Series): The series to thin, in plotting order.
+            max_points (int): The most points to keep.
+
+        Returns:
+            pd.Series: The series itself if it is short enough, otherwise the kept points in their original order.
+        """
+        if len(series) <= max_points:
+            return series
+        buckets = np.arange(len(series)) * (max_points // 2) // len(series)
+        grouped = pd.Series(series.to_numpy()).groupby(buckets)
+        keep = np.union1d(grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy())
+        return series.iloc[keep]
 
     @staticmethod
     def view_income_expense_report():
@@ -1,8 +1,18 @@
+import sys
 from main import main
+from cli import CommandLine
 
 if __name__ == '__main__':
     """
     Main script to run the program
 
+    Usage:
+        python3 run.py                      Start the interactive menu
+        python3 run.py <command> [args]     Run one command without the menu, see python3 run.py --help
+        python3 run.py batch [file]         Run one command per line from a file or stdin
+
     """
-    main()
+    if len(sys.argv) > 1:
+        sys.exit(CommandLine.run(sys.argv[1:]))
+    else:
+        main()
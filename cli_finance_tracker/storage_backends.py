@@ -0,0 +1,1434 @@
+import csv
+import io
+import itertools
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from audit_log import AuditLog
+from user_entry_manager import UserEntryManager
+from durable_writer import DurableWriter
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class CSVBackend:
+    """
+    Stores the transaction records as a single CSV file.
+
+    Attributes:
+        DTYPES (dict): Column types of the transaction records.
+        READ_TYPES (dict): Column types used when parsing the CSV file. The string columns are read as categoricals: a
+            ledger repeats the same dates, categories and descriptions, so each distinct value is only stored once.
+        NA_VALUES (dict): Values parsed as missing, per column. Only amounts can be missing: an empty or "NA"
+            description is a description.
+        UPDATES_IN_PLACE (bool): False: the store journals updates and deletes and compacts them into the file.
+    """
+
+    DTYPES = {
+        "transaction_id": "int64",
+        "date": str,
+        "category": str,
+        "amount": "float64",
+        "description": str
+    }
+    READ_TYPES = dict(DTYPES, date="category", category="category", description="category")
+    NA_VALUES = {"amount": ["", "nan", "NaN", "NA", "N/A", "null"]}
+    UPDATES_IN_PLACE = False
+
+    def __init__(self, csv_file, columns):
+        """
+        Args:
+            csv_file (str): Path to the transaction records CSV file.
+            columns (list of str): Column names of the transaction records.
+        """
+        self.csv_file = csv_file
+        self.columns = columns
+
+    def exists(self):
+        """
+        Returns:
+            bool: True if the CSV file exists.
+        """
+        return os.path.exists(self.csv_file)
+
+    def create(self):
+        """
+        Creates an empty CSV file with only the header row.
+
+        Returns:
+            None
+        """
+        with open(self.csv_file, "w", newline="") as csv_file:
+            csv.writer(csv_file).writerow(self.columns)
+
+    def reset(self):
+        """
+        Drops anything cached from the stored files, after another process changed the ledger. Nothing is cached.
+
+        Returns:
+            None
+        """
+
+    def file_signature(self):
+        """
+        Returns the size and modification time of the CSV file, used to detect changes made by other processes.
+
+        Returns:
+            tuple: (size, mtime_ns) of the CSV file.
+        """
+        stat = os.stat(self.csv_file)
+        return stat.st_size, stat.st_mtime_ns
+
+    def read(self):
+        """
+        Returns:
+            pd.DataFrame: All transaction records, with categorical string columns (see READ_TYPES).
+        """
+        return self.checked_amounts(pd.read_csv(self.csv_file, dtype=self.READ_TYPES, keep_default_na=False,
+                                                na_values=self.NA_VALUES))
+
+    @staticmethod
+    def checked_amounts(data_frame):
+        """
+        Reads missing or non-finite amounts, such as the blank amount of a partly written row, as 0, so one bad row does
+        not make the whole ledger unreadable. Valid amounts are positive, so 0 marks those transactions until their
+        amount is updated; see TransactionStore.report_missing_amounts.
+
+        Args:
+            data_frame (pd.DataFrame): Transaction records as parsed from the CSV file.
+
+        Returns:
+            pd.DataFrame: The records, with every amount finite.
+        """
+        amounts = data_frame["amount"].to_numpy()
+        invalid = ~np.isfinite(amounts)
+        if invalid.any():
+            data_frame["amount"] = np.where(invalid, 0.0, amounts)
+        return data_frame
+
+    def append(self, entry):
+        """
+        Appends one transaction to the end of the CSV file.
+
+        Args:
+            entry (dict): The transaction to append, keyed by column name.
+
+        Returns:
+            None
+        """
+        row = io.StringIO()
+        csv.DictWriter(row, fieldnames=self.columns, lineterminator="\n").writerow(entry)
+        DurableWriter.append(self.csv_file, row.getvalue())
+
+    def append_frame(self, data_frame):
+        """
+        Appends many transactions to the end of the CSV file with one write.
+
+        Args:
+            data_frame (pd.DataFrame): The transactions to append.
+
+        Returns:
+            None
+        """
+        DurableWriter.append(self.csv_file, data_frame[self.columns].to_csv(header=False, index=False))
+
+    def write(self, data_frame):
+        """
+        Replaces the CSV file with the given records through an atomic rename, so a crash never leaves a torn file.
+
+        Args:
+            data_frame (pd.DataFrame): The complete set of transaction records.
+
+        Returns:
+            None
+        """
+        DurableWriter.atomic_replace(self.csv_file, lambda csv_file: data_frame[self.columns].to_csv(csv_file,
+                                                                                                      index=False))
+
+    def last_transaction_id(self):
+        """
+        Reads the transaction ID of the last record by scanning backwards from the end of the CSV file.
+
+        Records are only ever appended with increasing IDs, so the last record holds the largest ID still present.
+        The last record is told apart from the lines of a description that spans several lines by counting quotes
+        back from the end of the file, see AuditLog.record_ends. Falls back to reading the transaction_id column if
+        the last record cannot be parsed.
+
+        Returns:
+            int: The last transaction ID, or 0 if there are no records.
+        """
+        with open(self.csv_file, "rb") as file:
+            header = file.readline()
+            file.seek(0, os.SEEK_END)
+            position = file.tell()
+            tail = b""
+            starts = np.empty(0, dtype=np.int64)
+            while position > len(header) and not len(starts):
+                step = min(4096, position - len(header))
+                position -= step
+                file.seek(position)
+                tail = file.read(step) + tail
+                starts = AuditLog.record_ends(tail.rstrip(b"\r\n"), from_end=True) + 1
+
+        # The first block read may start within a record, unless it starts right after the header.
+        if position <= len(header):
+            starts = np.concatenate(([0], starts))
+        last_record = tail.rstrip(b"\r\n")[starts[-1]:] if len(starts) else b""
+        if not last_record.strip():
+            return 0
+        try:
+            return int(float(last_record.split(b",", 1)[0].decode()))
+        except ValueError:
+            df = pd.read_csv(self.csv_file, usecols=["transaction_id"])
+            return 0 if df.empty else int(df["transaction_id"].max())
+
+
+class GenerationDirectory:
+    """
+    Base for backends that keep their files in generation directories inside self.directory, so that a rewrite of
+    several files becomes visible all at once.
+
+    A generation file names the directory holding the current files. A rewrite writes every file into a new
+    generation directory and then replaces the generation file, so a crash leaves either the old files or the new
+    ones, never a mix. Files written before generations existed are read from self.directory itself until the records
+    are next rewritten.
+
+    Subclasses set self.directory and self.generation_file.
+
+    Attributes:
+        LEGACY_SUFFIX (str): Suffix of the files written before generations existed, removed once the records are
+            rewritten into a generation.
+    """
+
+    LEGACY_SUFFIX = None
+
+    def generation(self):
+        """
+        Returns:
+            str: Path of the directory holding the current files: the generation the generation file names, or
+                self.directory itself for files written before generations existed.
+        """
+        try:
+            with open(self.generation_file, encoding="utf-8") as generation_file:
+                return os.path.join(self.directory, generation_file.read().strip())
+        except FileNotFoundError:
+            return self.directory
+
+    def in_generation(self, read):
+        """
+        Runs a read of several files against one generation. Reads do not hold the ledger lock, so a rewrite
+        may remove the generation between looking it up and opening its files; the read is then retried on the new
+        one.
+
+        Args:
+            read (callable): Called with the generation directory, see generation().
+
+        Returns:
+            The return value of read.
+        """
+        while True:
+            generation = self.generation()
+            try:
+                return read(generation)
+            except FileNotFoundError:
+                if self.generation() == generation:
+                    raise
+
+    def new_generation(self):
+        """
+        Returns:
+            str: Path of a new, empty generation directory to write the files of a rewrite into.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        return tempfile.mkdtemp(prefix="generation-", dir=self.directory)
+
+    def switch_generation(self, generation):
+        """
+        Makes a fully written generation the current one by replacing the generation file. The previous generation,
+        any left behind by a crash and the files written before generations existed are removed afterwards.
+
+        Args:
+            generation (str): Path of the generation directory, as returned by new_generation().
+
+        Returns:
+            None
+        """
+        DurableWriter.atomic_replace(self.generation_file,
+                                     lambda generation_file: generation_file.write(os.path.basename(generation)))
+
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith("generation-") and path != generation:
+                shutil.rmtree(path, ignore_errors=True)
+            elif name.endswith(self.LEGACY_SUFFIX):
+                os.remove(path)
+
+
+class NumpyBackend(GenerationDirectory):
+    """
+    Stores the transaction records as typed binary columns that are memory-mapped on open.
+
+    The columns live in a directory next to the CSV file name (finance_data.columns/):
+        generation            name of the generation directory holding the current column files
+        generation-*/         one generation of column files:
+            transaction_id.bin    int64 IDs
+            date.bin              int64 day ordinals (days since 1970-01-01)
+            category.bin          int8 codes into CATEGORIES
+            amount.bin            float64 amounts
+            description.bin       int32 codes into descriptions.jsonl
+        descriptions.jsonl    string table, one JSON encoded description per line
+
+    Appends write a few bytes to the end of every column file of the current generation. If a crash leaves the columns
+    with different lengths, reads stop at the shortest column, and the next append first truncates every column to
+    that many rows, so the appended rows stay aligned. Rewriting the records writes every column into a new
+    generation directory and then replaces the generation file (see GenerationDirectory), so a crash leaves either the
+    old columns or the new ones, never a mix. The CSV file is only used to import and export the records.
+
+    Attributes:
+        COLUMN_TYPES (dict): numpy dtype of each binary column file.
+        CATEGORIES (list of str): Category names, indexed by the stored category code.
+        UPDATES_IN_PLACE (bool): False: the store journals updates and deletes and compacts them into the columns.
+    """
+
+    COLUMN_TYPES = {
+        "transaction_id": "int64",
+        "date": "int64",
+        "category": "int8",
+        "amount": "float64",
+        "description": "int32"
+    }
+    CATEGORIES = list(UserEntryManager.CATEGORIES.values())
+    DATE_FORMAT = UserEntryManager.DATE_FORMAT
+    UPDATES_IN_PLACE = False
+    LEGACY_SUFFIX = ".bin"
+
+    def __init__(self, csv_file, columns):
+        """
+        Args:
+            csv_file (str): Path to the transaction records CSV file the column directory is named after.
+            columns (list of str): Column names of the transaction records.
+        """
+        self.csv_file = csv_file
+        self.columns = columns
+        self.directory = f"{os.path.splitext(csv_file)[0]}.columns"
+        self.strings_file = os.path.join(self.directory, "descriptions.jsonl")
+        self.generation_file = os.path.join(self.directory, "generation")
+        self._strings = None
+        self._string_codes = None
+        self._strings_size = 0
+
+    def reset(self):
+        """
+        Drops the cached string table, after another process changed the ledger.
+
+        Returns:
+            None
+        """
+        self._strings = None
+        self._string_codes = None
+        self._strings_size = 0
+
+    def column_file(self, column, generation=None):
+        """
+        Args:
+            column (str): The column name.
+            generation (str): Directory of the generation, as returned by generation(). Pass it when reading several
+                columns, so all of them come from the same generation. Defaults to the current generation.
+
+        Returns:
+            str: Path to the column's binary file.
+        """
+        return os.path.join(generation or self.generation(), f"{column}.bin")
+
+    def exists(self):
+        """
+        Returns:
+            bool: True if the column files exist.
+        """
+        return os.path.exists(self.column_file("transaction_id"))
+
+    def create(self):
+        """
+        Creates empty column files, importing the CSV file first if one exists.
+
+        Returns:
+            None
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.csv_file):
+            self.write(CSVBackend(self.csv_file, self.columns).read())
+        else:
+            self.write(pd.DataFrame(columns=self.columns).astype(CSVBackend.DTYPES))
+
+    def file_signature(self):
+        """
+        Returns the combined size and latest modification time of the column files.
+
+        Returns:
+            tuple: (size, mtime_ns) across all column files.
+        """
+        def stat_files(generation):
+            stats = [os.stat(self.column_file(column, generation)) for column in self.COLUMN_TYPES]
+            stats.append(os.stat(self.strings_file))
+            if generation != self.directory:
+                stats.append(os.stat(self.generation_file))
+            return stats
+
+        stats = self.in_generation(stat_files)
+        return sum(stat.st_size for stat in stats), max(stat.st_mtime_ns for stat in stats)
+
+    def load_columns(self):
+        """
+        Memory-maps every column file, trimmed to the length of the shortest column.
+
+        Returns:
+            dict: numpy arrays keyed by column name.
+        """
+        def map_columns(generation):
+            arrays = {}
+            for column, dtype in self.COLUMN_TYPES.items():
+                if os.path.getsize(self.column_file(column, generation)):
+                    arrays[column] = np.memmap(self.column_file(column, generation), dtype=dtype, mode="r")
+                else:
+                    arrays[column] = np.empty(0, dtype=dtype)
+            return arrays
+
+        arrays = self.in_generation(map_columns)
+        length = min(len(array) for array in arrays.values())
+        return {column: array[:length] for column, array in arrays.items()}
+
+    def load_strings(self):
+        """
+        Loads the description string table.
+
+        Returns:
+            None
+        """
+        self._strings = []
+        self._string_codes = {}
+        self._strings_size = 0
+        self.extend_strings()
+
+    def extend_strings(self):
+        """
+        Reads the descriptions appended to the string table file since it was last read, for example by another
+        process. A last line without a line end is still being written and is left for the next read.
+
+        Returns:
+            None
+        """
+        try:
+            with open(self.strings_file, "rb") as strings_file:
+                strings_file.seek(self._strings_size)
+                appended = strings_file.read()
+        except FileNotFoundError:
+            return
+        appended = appended[:appended.rfind(b"\n") + 1]
+        for line in appended.decode("utf-8").split("\n")[:-1]:
+            string = json.loads(line)
+            self._string_codes[string] = len(self._strings)
+            self._strings.append(string)
+        self._strings_size += len(appended)
+
+    def sync_strings(self):
+        """
+        Brings the string table up to date with its file before new descriptions are given codes. Other processes
+        append to the file too, so a code handed out from a stale table could already belong to another description.
+        Called under the ledger lock, so the file cannot grow between this and the append of the new descriptions.
+
+        Returns:
+            None
+        """
+        try:
+            size = os.path.getsize(self.strings_file)
+        except FileNotFoundError:
+            size = 0
+        if self._strings is None or size < self._strings_size:
+            self.load_strings()
+        elif size > self._strings_size:
+            self.extend_strings()
+
+    def read(self):
+        """
+        Returns:
+            pd.DataFrame: All transaction records, with dates formatted back to DATE_FORMAT.
+        """
+        arrays = self.load_columns()
+        self.load_strings()
+
+        date_codes, unique_dates = pd.factorize(arrays["date"])
+        date_strings = pd.to_datetime(unique_dates, unit="D").strftime(self.DATE_FORMAT).to_numpy()
+        return pd.DataFrame({
+            "transaction_id": np.asarray(arrays["transaction_id"]),
+            "date": date_strings.take(date_codes) if len(date_codes) else np.empty(0, dtype=object),
+            "category": np.array(self.CATEGORIES, dtype=object).take(arrays["category"]),
+            "amount": np.asarray(arrays["amount"]),
+            "description": np.array(self._strings, dtype=object).take(arrays["description"])
+        }, columns=self.columns).astype(CSVBackend.DTYPES)
+
+    def encode(self, data_frame, new_strings):
+        """
+        Converts transaction records to the binary column types.
+
+        Args:
+            data_frame (pd.DataFrame): The transactions to encode.
+            new_strings (list of str): Receives descriptions that are not in the string table yet.
+
+        Returns:
+            dict: numpy arrays keyed by column name.
+        """
+        self.sync_strings()
+
+        description_codes = []
+        for description in data_frame["description"].astype(str):
+            code = self._string_codes.get(description)
+            if code is None:
+                code = self._string_codes[description] = len(self._strings)
+                self._strings.append(description)
+                new_strings.append(description)
+            description_codes.append(code)
+
+        date_codes, unique_dates = pd.factorize(data_frame["date"].astype(str))
+        unique_ordinals = pd.to_datetime(pd.Series(unique_dates, dtype=str), format=self.DATE_FORMAT)
+        return {
+            "transaction_id": data_frame["transaction_id"].to_numpy(dtype=np.int64),
+            "date": unique_ordinals.to_numpy().astype("datetime64[D]").astype(np.int64).take(date_codes),
+            "category": data_frame["category"].map(self.CATEGORIES.index).to_numpy(dtype=np.int8),
+            "amount": data_frame["amount"].to_numpy(dtype=np.float64),
+            "description": np.array(description_codes, dtype=np.int32)
+        }
+
+    def append(self, entry):
+        """
+        Appends one transaction to the end of every column file.
+
+        Args:
+            entry (dict): The transaction to append, keyed by column name.
+
+        Returns:
+            None
+        """
+        self.append_frame(pd.DataFrame([entry], columns=self.columns))
+
+    def append_frame(self, data_frame):
+        """
+        Appends many transactions to the end of every column file.
+
+        Args:
+            data_frame (pd.DataFrame): The transactions to append.
+
+        Returns:
+            None
+        """
+        arrays = self.encode_and_store_strings(data_frame)
+        generation = self.generation()
+        self.align_columns(generation)
+        for column, array in arrays.items():
+            with open(self.column_file(column, generation), "ab") as column_file:
+                column_file.write(array.tobytes())
+                if DurableWriter.should_fsync():
+                    column_file.flush()
+                    os.fsync(column_file.fileno())
+
+    def align_columns(self, generation):
+        """
+        Truncates every column file of a generation to the number of rows all of them hold, dropping the values an
+        interrupted append left at the end of some columns. Called under the ledger lock before appending.
+
+        Args:
+            generation (str): Directory of the generation, as returned by generation().
+
+        Returns:
+            None
+        """
+        sizes = {column: os.path.getsize(self.column_file(column, generation)) for column in self.COLUMN_TYPES}
+        rows = min(sizes[column] // np.dtype(dtype).itemsize for column, dtype in self.COLUMN_TYPES.items())
+        for column, dtype in self.COLUMN_TYPES.items():
+            if sizes[column] != rows * np.dtype(dtype).itemsize:
+                os.truncate(self.column_file(column, generation), rows * np.dtype(dtype).itemsize)
+
+    def encode_and_store_strings(self, data_frame):
+        """
+        Encodes transaction records and appends any new descriptions to the string table.
+
+        The string table is only ever appended to, so codes already written to description.bin stay valid even if
+        a crash interrupts the column writes that follow.
+
+        Args:
+            data_frame (pd.DataFrame): The transactions to encode.
+
+        Returns:
+            dict: numpy arrays keyed by column name.
+        """
+        new_strings = []
+        arrays = self.encode(data_frame, new_strings)
+        text = "".join(f"{json.dumps(string)}\n" for string in new_strings)
+        DurableWriter.append(self.strings_file, text)
+        self._strings_size += len(text.encode("utf-8"))
+        return arrays
+
+    def write(self, data_frame):
+        """
+        Replaces every column file with the given records, as one atomic switch to a new generation directory. The
+        previous generation, and any left behind by a crash, are removed afterwards; processes still reading their
+        memory-mapped files keep them until they unmap them.
+
+        Args:
+            data_frame (pd.DataFrame): The complete set of transaction records.
+
+        Returns:
+            None
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        arrays = self.encode_and_store_strings(data_frame)
+        generation = self.new_generation()
+        try:
+            for column, array in arrays.items():
+                with open(self.column_file(column, generation), "wb") as column_file:
+                    column_file.write(array.tobytes())
+                    column_file.flush()
+                    os.fsync(column_file.fileno())
+        except BaseException:
+            shutil.rmtree(generation, ignore_errors=True)
+            raise
+        self.switch_generation(generation)
+
+    def last_transaction_id(self):
+        """
+        Returns:
+            int: The transaction ID of the last record, or 0 if there are no records.
+        """
+        ids = self.load_columns()["transaction_id"]
+        return int(ids[-1]) if len(ids) else 0
+
+
+class SQLiteBackend:
+    """
+    Stores the transaction records and the audit logs in one SQLite database (finance_data.sqlite3).
+
+    The database runs in WAL mode: commits append to a write-ahead log, and readers in other processes keep reading
+    the last committed state while a write is in progress. The transactions table keeps each date both as text in
+    DATE_FORMAT and as a day ordinal (days since 1970-01-01) and is indexed on transaction_id (its primary key), the
+    day ordinal and category, so point lookups, date ranges and per-category reports do not scan the table.
+
+    Unlike the file backends, updates and deletes are applied in place with one UPDATE or DELETE statement, so the
+    store does not journal them, and reads can be answered with SQL without loading the records into memory.
+
+    Every statement uses ? placeholders with constant SQL text. The sqlite3 module keeps the compiled statements of each
+    connection in its statement cache, so repeated inserts and lookups reuse prepared statements. Each thread and each
+    process gets its own connection.
+
+    Changes to the records increment a counter in the meta table inside the same transaction; the counter serves as the
+    file signature, since the size and modification time of a WAL database do not reliably follow its content. It
+    starts at the creation time in nanoseconds, so a recreated database never matches sidecar files saved against an
+    earlier one.
+
+    Attributes:
+        DATE_FORMAT (str): Date format of the date column.
+        TIMEOUT (float): Seconds to wait for another process's write transaction before giving up.
+        SCHEMA (str): Statements creating the transactions and meta tables.
+        INDEXES (dict): CREATE INDEX statement keyed by index name, on top of the transaction_id primary key.
+        SELECT_COLUMNS (str): SELECT of the record columns, in column order.
+        INSERT (str): INSERT statement for one transaction.
+        UPDATE_STATEMENTS (dict): UPDATE statement keyed by the field it sets.
+        DELETE (str): DELETE statement for one transaction.
+        SELECT_CONDITIONS (dict): WHERE clause of each condition select() can filter by; a list of transaction IDs is
+            bound as one JSON array.
+        LOG_INDEXED_COLUMNS (tuple of str): Log columns with an index, for the audit log queries.
+        UPDATES_IN_PLACE (bool): True: the store hands updates and deletes to apply() and leaves reads to the
+            backend's query methods while the records are not cached.
+    """
+
+    DATE_FORMAT = UserEntryManager.DATE_FORMAT
+    TIMEOUT = 30.0
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS transactions (
+            transaction_id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            category TEXT NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+    """
+    INDEXES = {
+        "transactions_day": "CREATE INDEX IF NOT EXISTS transactions_day ON transactions (day)",
+        "transactions_category": "CREATE INDEX IF NOT EXISTS transactions_category "
+                                 "ON transactions (category, description, amount)"
+    }
+    SELECT_COLUMNS = "SELECT transaction_id, date, category, amount, description FROM transactions"
+    INSERT = ("INSERT INTO transactions (transaction_id, date, day, category, amount, description) "
+              "VALUES (?, ?, ?, ?, ?, ?)")
+    UPDATE_STATEMENTS = {
+        "date": "UPDATE transactions SET date = ?, day = ? WHERE transaction_id = ?",
+        "category": "UPDATE transactions SET category = ? WHERE transaction_id = ?",
+        "amount": "UPDATE transactions SET amount = ? WHERE transaction_id = ?",
+        "description": "UPDATE transactions SET description = ? WHERE transaction_id = ?"
+    }
+    DELETE = "DELETE FROM transactions WHERE transaction_id = ?"
+    SELECT_CONDITIONS = {
+        "ids": "transaction_id IN (SELECT value FROM json_each(?))",
+        "start_day": "day >= ?",
+        "end_day": "day <= ?",
+        "category": "category = ?"
+    }
+    LOG_INDEXED_COLUMNS = ("transaction_id", "logged_at")
+    UPDATES_IN_PLACE = True
+
+    def __init__(self, csv_file, columns):
+        """
+        Args:
+            csv_file (str): Path to the transaction records CSV file the database is named after.
+            columns (list of str): Column names of the transaction records.
+        """
+        self.csv_file = csv_file
+        self.columns = columns
+        self.database_file = f"{os.path.splitext(csv_file)[0]}.sqlite3"
+        self._local = threading.local()
+
+    def connect(self):
+        """
+        Returns the connection of the current thread, opening it on first use and again in a forked child.
+
+        Returns:
+            sqlite3.Connection: A connection in autocommit mode; write transactions are begun explicitly.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.database_file, timeout=self.TIMEOUT, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute(f"PRAGMA synchronous = {'FULL' if DurableWriter.should_fsync() else 'NORMAL'}")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @contextmanager
+    def transaction(self, changes_records=True):
+        """
+        Runs a with block as one write transaction, committed on success and rolled back on an exception.
+
+        BEGIN IMMEDIATE takes the database's write lock up front, so concurrent writers wait for each other instead of
+        failing when they try to upgrade a read transaction.
+
+        Args:
+            changes_records (bool): Increment the version counter, for writes to the transactions table.
+
+        Returns:
+            sqlite3.Connection: The connection to run the statements on.
+        """
+        connection = self.connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+            if changes_records:
+                connection.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def reset(self):
+        """
+        Drops anything cached from the stored files, after another process changed the ledger. Nothing is cached:
+        SQLite reads the database afresh in every transaction.
+
+        Returns:
+            None
+        """
+
+    def exists(self):
+        """
+        Returns:
+            bool: True if the database file exists.
+        """
+        return os.path.exists(self.database_file)
+
+    def create(self):
+        """
+        Creates the database with an empty transactions table. Use CSVManager.migrate_to_sqlite to import CSV files.
+
+        Returns:
+            None
+        """
+        connection = self.connect()
+        connection.executescript(self.SCHEMA)
+        for statement in self.INDEXES.values():
+            connection.execute(statement)
+        connection.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', ?)", (time.time_ns(),))
+
+    def file_signature(self):
+        """
+        Returns the version counter of the records, used to detect changes made by other processes.
+
+        Returns:
+            tuple: (version, 0), shaped like the (size, mtime_ns) signatures of the file backends.
+        """
+        return self.connect().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0], 0
+
+    @classmethod
+    def day_ordinal(cls, date):
+        """
+        Args:
+            date (str): A date in DATE_FORMAT.
+
+        Returns:
+            int: Days since 1970-01-01.
+        """
+        return (datetime.strptime(date, cls.DATE_FORMAT) - datetime(1970, 1, 1)).days
+
+    def to_frame(self, rows):
+        """
+        Args:
+            rows (list of tuple): Rows selected with SELECT_COLUMNS.
+
+        Returns:
+            pd.DataFrame: The rows as transaction records with the usual column types.
+        """
+        return pd.DataFrame(rows, columns=self.columns).astype(CSVBackend.DTYPES)
+
+    def read(self):
+        """
+        Returns:
+            pd.DataFrame: All transaction records, ordered by transaction ID.
+        """
+        return self.to_frame(self.connect().execute(f"{self.SELECT_COLUMNS} ORDER BY transaction_id").fetchall())
+
+    def insert_rows(self, data_frame):
+        """
+        Converts transaction records to rows for INSERT. Only the distinct dates are parsed.
+
+        Args:
+            data_frame (pd.DataFrame): The transactions to insert.
+
+        Returns:
+            iterator of tuple: One row per transaction.
+        """
+        date_codes, unique_dates = pd.factorize(data_frame["date"].astype(str))
+        days = [self.day_ordinal(date) for date in unique_dates]
+        return zip(data_frame["transaction_id"].astype(int).tolist(), data_frame["date"].astype(str).tolist(),
+                   [days[code] for code in date_codes], data_frame["category"].astype(str).tolist(),
+                   data_frame["amount"].astype(float).tolist(), data_frame["description"].astype(str).tolist())
+
+    def append(self, entry):
+        """
+        Inserts one transaction.
+
+        Args:
+            entry (dict): The transaction to insert, keyed by column name.
+
+        Returns:
+            None
+        """
+        with self.transaction() as connection:
+            connection.execute(self.INSERT, (int(entry["transaction_id"]), entry["date"],
+                                             self.day_ordinal(entry["date"]), entry["category"],
+                                             float(entry["amount"]), str(entry["description"])))
+
+    def append_frame(self, data_frame):
+        """
+        Inserts many transactions in one transaction.
+
+        Args:
+            data_frame (pd.DataFrame): The transactions to insert.
+
+        Returns:
+            None
+        """
+        with self.transaction() as connection:
+            connection.executemany(self.INSERT, self.insert_rows(data_frame))
+
+    def write(self, data_frame):
+        """
+        Replaces all transaction records in one transaction, so other readers see either the old or the new records.
+
+        The secondary indexes are dropped during the load and rebuilt afterwards, which is about three times faster
+        than maintaining them row by row.
+
+        Args:
+            data_frame (pd.DataFrame): The complete set of transaction records.
+
+        Returns:
+            None
+        """
+        with self.transaction() as connection:
+            for name in self.INDEXES:
+                connection.execute(f"DROP INDEX IF EXISTS {name}")
+            connection.execute("DELETE FROM transactions")
+            connection.executemany(self.INSERT, self.insert_rows(data_frame))
+            for statement in self.INDEXES.values():
+                connection.execute(statement)
+
+    def apply(self, change):
+        """
+        Applies an update or delete in place.
+
+        Args:
+            change (dict): A field patch ({"op": "update", "transaction_id", "field", "value"}) or a tombstone
+                ({"op": "delete", "transaction_id"}), as TransactionStore would journal them.
+
+        Returns:
+            None
+        """
+        self.apply_all([change])
+
+    def apply_all(self, changes):
+        """
+        Applies many updates and deletes in place in one transaction. Each run of changes with the same statement is
+        handed to executemany, so a bulk change of one field runs a single prepared statement.
+
+        Args:
+            changes (list of dict): Field patches and tombstones as accepted by apply(), in the order to apply them.
+
+        Returns:
+            None
+        """
+        with self.transaction() as connection:
+            for (operation, field), run in itertools.groupby(changes, key=lambda change: (change["op"],
+                                                                                          change.get("field"))):
+                if operation == "delete":
+                    connection.executemany(self.DELETE, ((change["transaction_id"],) for change in run))
+                elif field == "date":
+                    connection.executemany(self.UPDATE_STATEMENTS["date"], (
+                        (change["value"], self.day_ordinal(change["value"]), change["transaction_id"]) for change in run
+                    ))
+                else:
+                    connection.executemany(self.UPDATE_STATEMENTS[field],
+                                           ((change["value"], change["transaction_id"]) for change in run))
+
+    def last_transaction_id(self):
+        """
+        Returns:
+            int: The largest transaction ID, or 0 if there are no records.
+        """
+        return self.connect().execute("SELECT MAX(transaction_id) FROM transactions").fetchone()[0] or 0
+
+    def contains(self, transaction_id):
+        """
+        Args:
+            transaction_id (int): The transaction ID to look up.
+
+        Returns:
+            bool: True if the transaction ID is present.
+        """
+        return self.connect().execute("SELECT 1 FROM transactions WHERE transaction_id = ?",
+                                      (int(transaction_id),)).fetchone() is not None
+
+    def row(self, transaction_id):
+        """
+        Args:
+            transaction_id (int): The transaction ID to look up.
+
+        Returns:
+            pd.DataFrame: The matching record, empty if the transaction ID was not found.
+        """
+        return self.to_frame(self.connect().execute(f"{self.SELECT_COLUMNS} WHERE transaction_id = ?",
+                                                    (int(transaction_id),)).fetchall())
+
+    def date_range(self, start_day, end_day):
+        """
+        Args:
+            start_day (int): First day ordinal of the range.
+            end_day (int): Last day ordinal of the range, inclusive.
+
+        Returns:
+            pd.DataFrame: The transactions dated within the range, ordered by date.
+        """
+        return self.to_frame(self.connect().execute(
+            f"{self.SELECT_COLUMNS} WHERE day BETWEEN ? AND ? ORDER BY day, transaction_id", (start_day, end_day)
+        ).fetchall())
+
+    def select(self, ids=None, start_day=None, end_day=None, category=None):
+        """
+        Returns the transactions matching every given condition. The WHERE clause is put together from
+        SELECT_CONDITIONS, so the transaction_id primary key and the day index narrow the rows down.
+
+        Args:
+            ids (list of int): Transaction IDs to select, or None for any.
+            start_day (int): First day ordinal, or None for no lower bound.
+            end_day (int): Last day ordinal, inclusive, or None for no upper bound.
+            category (str): Category to select, or None for any.
+
+        Returns:
+            pd.DataFrame: The matching transactions, ordered by transaction ID.
+        """
+        values = {
+            "ids": None if ids is None else json.dumps([int(transaction_id) for transaction_id in ids]),
+            "start_day": start_day,
+            "end_day": end_day,
+            "category": category
+        }
+        given = [name for name, value in values.items() if value is not None]
+        where = f" WHERE {' AND '.join(self.SELECT_CONDITIONS[name] for name in given)}" if given else ""
+        return self.to_frame(self.connect().execute(f"{self.SELECT_COLUMNS}{where} ORDER BY transaction_id",
+                                                    [values[name] for name in given]).fetchall())
+
+    def description_totals(self, category):
+        """
+        Returns the total amount per lower-cased description for one category.
+
+        SQLite groups by the exact description using the category index; the few distinct descriptions are then
+        lower-cased in Python, which unlike SQLite's lower() handles non-ASCII letters.
+
+        Args:
+            category (str): "Income" or "Expense".
+
+        Returns:
+            pd.Series: Total amount indexed by description, sorted by description.
+        """
+        rows = self.connect().execute("SELECT description, SUM(amount) FROM transactions WHERE category = ? "
+                                      "GROUP BY description", (category,)).fetchall()
+        totals = pd.Series([total for _, total in rows], index=[description.lower() for description, _ in rows],
+                           dtype="float64")
+        totals = totals.groupby(level=0).sum()
+        totals.index.name = "description"
+        return totals.rename("amount").sort_index()
+
+    @staticmethod
+    def log_table(csv_file):
+        """
+        Args:
+            csv_file (str): Path of a log CSV file, e.g. "new_entry_log.csv".
+
+        Returns:
+            str: The quoted name of the table holding that log, e.g. "new_entry_log".
+        """
+        return '"{}"'.format(os.path.splitext(os.path.basename(csv_file))[0])
+
+    def create_log(self, csv_file, columns):
+        """
+        Creates the table for a log if it does not exist, adds columns that a table created by an earlier version lacks
+        (empty in existing rows) and indexes LOG_INDEXED_COLUMNS. Log values are stored as text, as in the log CSV
+        files.
+
+        Args:
+            csv_file (str): Path of the log CSV file the table is named after.
+            columns (list of str): Column names of the log.
+
+        Returns:
+            None
+        """
+        table = self.log_table(csv_file)
+        column_list = ", ".join(f'"{column}" TEXT' for column in columns)
+        with self.transaction(changes_records=False) as connection:
+            connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({column_list})")
+            existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+            for column in columns:
+                if column not in existing:
+                    connection.execute(f'ALTER TABLE {table} ADD COLUMN "{column}" TEXT DEFAULT \'\'')
+            for column in self.LOG_INDEXED_COLUMNS:
+                if column in columns:
+                    connection.execute(f'CREATE INDEX IF NOT EXISTS "{table[1:-1]}_{column}" ON {table} ("{column}")')
+
+    def append_logs(self, csv_file, columns, entries):
+        """
+        Inserts log rows in one transaction.
+
+        Args:
+            csv_file (str): Path of the log CSV file the table is named after.
+            columns (list of str): Column names of the log.
+            entries (list of dict): The log rows, keyed by column name.
+
+        Returns:
+            None
+        """
+        self.insert_log_rows(csv_file, columns, ([str(entry[column]) for column in columns] for entry in entries))
+
+    def append_log_frame(self, csv_file, columns, data_frame):
+        """
+        Inserts log rows from a DataFrame in one transaction.
+
+        Args:
+            csv_file (str): Path of the log CSV file the table is named after.
+            columns (list of str): Column names of the log.
+            data_frame (pd.DataFrame): The log rows.
+
+        Returns:
+            None
+        """
+        self.insert_log_rows(csv_file, columns, data_frame[columns].astype(str).itertuples(index=False, name=None))
+
+    def insert_log_rows(self, csv_file, columns, rows):
+        """
+        Args:
+            csv_file (str): Path of the log CSV file the table is named after.
+            columns (list of str): Column names of the log.
+            rows (iterable of sequence): Values in column order.
+
+        Returns:
+            None
+        """
+        placeholders = ", ".join("?" for _ in columns)
+        with self.transaction(changes_records=False) as connection:
+            connection.executemany(f"INSERT INTO {self.log_table(csv_file)} VALUES ({placeholders})", rows)
+
+    def log_pages(self, csv_file, columns, page_size):
+        """
+        Yields a log's rows in the order they were written, one page at a time, resuming each page after the last rowid
+        seen rather than with OFFSET.
+
+        Args:
+            csv_file (str): Path of the log CSV file the table is named after.
+            columns (list of str): Column names of the log.
+            page_size (int): Number of rows per page.
+
+        Yields:
+            pd.DataFrame: The next page of rows.
+        """
+        last_rowid = 0
+        while True:
+            rows = self.connect().execute(f"SELECT rowid, * FROM {self.log_table(csv_file)} WHERE rowid > ? "
+                                          f"ORDER BY rowid LIMIT ?", (last_rowid, page_size)).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield pd.DataFrame([row[1:] for row in rows], columns=columns)
+
+    def log_tail(self, csv_file, columns, count):
+        """
+        Args:
+            csv_file (str): Path of the log CSV file the table is named after.
+            columns (list of str): Column names of the log.
+            count (int): Number of rows to return.
+
+        Returns:
+            pd.DataFrame: The last rows of the log, oldest first.
+        """
+        rows = self.connect().execute(f"SELECT * FROM {self.log_table(csv_file)} ORDER BY rowid DESC LIMIT ?",
+                                      (count,)).fetchall()
+        return pd.DataFrame(rows[::-1], columns=columns)
+
+    def log_history(self, csv_file, columns, transaction_id):
+        """
+        Args:
+            csv_file (str): Path of the log CSV file the table is named after.
+            columns (list of str): Column names of the log.
+            transaction_id (int): The transaction ID to look up, using the transaction_id index.
+
+        Returns:
+            pd.DataFrame: The log rows about the transaction, in the order they were written.
+        """
+        rows = self.connect().execute(f"SELECT * FROM {self.log_table(csv_file)} WHERE transaction_id = ? "
+                                      f"ORDER BY rowid", (str(transaction_id),)).fetchall()
+        return pd.DataFrame(rows, columns=columns).fillna("")
+
+    def log_window(self, csv_file, columns, start, end):
+        """
+        Args:
+            csv_file (str): Path of the log CSV file the table is named after.
+            columns (list of str): Column names of the log.
+            start (str): First logged_at value of the window.
+            end (str): logged_at value the window ends before, or None for a window without end.
+
+        Returns:
+            pd.DataFrame: The log rows logged within the window, found with the logged_at index, in the order they were
+                written.
+        """
+        rows = self.connect().execute(f"SELECT * FROM {self.log_table(csv_file)} WHERE logged_at >= ? "
+                                      f"AND (? IS NULL OR logged_at < ?) ORDER BY rowid", (start, end, end)).fetchall()
+        return pd.DataFrame(rows, columns=columns).fillna("")
+
+    def backfill_log(self, csv_file, column, source, convert):
+        """
+        Fills a log column that is empty in rows written before it was added, from another column of the same rows.
+        Once filled, finding the empty rows is a lookup in the column's index.
+
+        Args:
+            csv_file (str): Path of the log CSV file the table is named after.
+            column (str): The column to fill.
+            source (str): The column the values are derived from.
+            convert (callable): Converts a pd.Series of source values to the column values.
+
+        Returns:
+            int: Number of rows filled in.
+        """
+        table = self.log_table(csv_file)
+        rows = self.connect().execute(f'SELECT rowid, "{source}" FROM {table} WHERE "{column}" = \'\' '
+                                      f'OR "{column}" IS NULL').fetchall()
+        if not rows:
+            return 0
+        rowids, sources = zip(*rows)
+        values = convert(pd.Series(sources, dtype=object))
+        with self.transaction(changes_records=False) as connection:
+            connection.executemany(f'UPDATE {table} SET "{column}" = ? WHERE rowid = ?', zip(values, rowids))
+        return len(rows)
+
+    def write_log(self, csv_file, columns, data_frame):
+        """
+        Replaces a log's rows, used when migrating a log CSV file.
+
+        Args:
+            csv_file (str): Path of the log CSV file the table is named after.
+            columns (list of str): Column names of the log.
+            data_frame (pd.DataFrame): The complete log.
+
+        Returns:
+            None
+        """
+        self.create_log(csv_file, columns)
+        placeholders = ", ".join("?" for _ in columns)
+        with self.transaction(changes_records=False) as connection:
+            connection.execute(f"DELETE FROM {self.log_table(csv_file)}")
+            connection.executemany(f"INSERT INTO {self.log_table(csv_file)} VALUES ({placeholders})",
+                                   data_frame[columns].astype(str).itertuples(index=False, name=None))
+
+
+class PartitionedBackend(GenerationDirectory):
+    """
+    Stores the transaction records as one CSV file per year or month of transaction date, in a generation directory
+    next to the CSV file name (finance_data.partitions/generation-*/2024.csv, or 2024-03.csv when PERIOD is "month").
+
+    Each partition is an ordinary transaction records CSV file, appended to in transaction ID order. Reading the whole
+    ledger concatenates the partitions; ParallelReports instead scans them in separate worker processes and skips the
+    partitions whose period lies outside a report's date range.
+
+    Rewriting the records writes every partition into a new generation directory and then switches to it (see
+    GenerationDirectory), so a crash during a compaction that moves a transaction to another period never leaves it in
+    both partitions.
+
+    Attributes:
+        PERIOD (str): "year" or "month", the span of one partition. Changing it only affects records appended
+            afterwards, until the records are rewritten (run.py compact).
+        UPDATES_IN_PLACE (bool): False: the store journals updates and deletes and compacts them into the partitions.
+    """
+
+    PERIOD = "year"
+    UPDATES_IN_PLACE = False
+    LEGACY_SUFFIX = ".csv"
+
+    def __init__(self, csv_file, columns):
+        """
+        Args:
+            csv_file (str): Path to the transaction records CSV file the partition directory is named after.
+            columns (list of str): Column names of the transaction records.
+        """
+        self.csv_file = csv_file
+        self.columns = columns
+        self.directory = f"{os.path.splitext(csv_file)[0]}.partitions"
+        self.generation_file = os.path.join(self.directory, "generation")
+
+    def partition_names(self, dates):
+        """
+        Args:
+            dates (pd.Series): Dates in mm-dd-yyyy format.
+
+        Returns:
+            pd.Series: The name of the partition each date belongs to, e.g. "2024" or "2024-03".
+        """
+        dates = dates.astype(str)
+        if self.PERIOD == "month":
+            return dates.str[6:10] + "-" + dates.str[0:2]
+        return dates.str[6:10]
+
+    def partition_file(self, name, generation=None):
+        """
+        Args:
+            name (str): The partition name, e.g. "2024".
+            generation (str): Directory of the generation, as returned by generation(). Defaults to the current
+                generation.
+
+        Returns:
+            str: Path to the partition's CSV file.
+        """
+        return os.path.join(generation or self.generation(), f"{name}.csv")
+
+    def partitions(self, generation=None):
+        """
+        Args:
+            generation (str): Directory of the generation, as returned by generation(). Defaults to the current
+                generation.
+
+        Returns:
+            list of str: The names of the existing partitions, sorted by period.
+        """
+        try:
+            return sorted(entry.name[:-len(".csv")] for entry in os.scandir(generation or self.generation())
+                          if entry.name.endswith(".csv"))
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def partition_days(name):
+        """
+        Args:
+            name (str): A partition name, "yyyy" or "yyyy-mm".
+
+        Returns:
+            tuple: (first, last) day ordinal (days since 1970-01-01) covered by the partition.
+        """
+        year = int(name[:4])
+        if len(name) == 4:
+            first, following = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+        else:
+            month = int(name[5:7])
+            first, following = datetime(year, month, 1), datetime(year + month // 12, month % 12 + 1, 1)
+        epoch = datetime(1970, 1, 1)
+        return (first - epoch).days, (following - epoch).days - 1
+
+    def reset(self):
+        """
+        Drops anything cached from the stored files, after another process changed the ledger. Nothing is cached.
+
+        Returns:
+            None
+        """
+
+    def exists(self):
+        """
+        Returns:
+            bool: True if the partition directory exists.
+        """
+        return os.path.isdir(self.directory)
+
+    def create(self):
+        """
+        Creates the partition directory, importing the CSV file first if one exists.
+
+        Returns:
+            None
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.csv_file):
+            self.write(CSVBackend(self.csv_file, self.columns).read())
+
+    def file_signature(self):
+        """
+        Returns the combined size and latest modification time of the partition files, their generation directory,
+        whose modification time changes when a partition is added, and the generation file.
+
+        Returns:
+            tuple: (size, mtime_ns) across all partitions.
+        """
+        def stat_files(generation):
+            stats = [os.stat(self.partition_file(name, generation)) for name in self.partitions(generation)]
+            size = sum(stat.st_size for stat in stats)
+            stats.append(os.stat(generation))
+            if generation != self.directory:
+                stats.append(os.stat(self.generation_file))
+            return size, max(stat.st_mtime_ns for stat in stats)
+
+        return self.in_generation(stat_files)
+
+    def read(self):
+        """
+        Returns:
+            pd.DataFrame: All transaction records, ordered by transaction ID.
+        """
+        def read_partitions(generation):
+            return {name: CSVBackend(self.partition_file(name, generation), self.columns).read()
+                    for name in self.partitions(generation)}
+
+        frames = self.in_generation(read_partitions)
+        if not frames:
+            return pd.DataFrame(columns=self.columns).astype(CSVBackend.DTYPES)
+        df = pd.concat(frames.values(), ignore_index=True)
+        self.report_duplicates(df, frames)
+        return df.sort_values("transaction_id", kind="stable").reset_index(drop=True)
+
+    def report_duplicates(self, df, frames):
+        """
+        Reports transaction IDs stored in more than one partition, which a crash during a rewrite could leave behind
+        before rewrites switched generations. Both copies are kept, as either may be the current one; deleting the
+        transaction and adding it again fixes the ledger.
+
+        Args:
+            df (pd.DataFrame): All transaction records, as concatenated from the partitions.
+            frames (dict): The records of each partition, keyed by partition name.
+
+        Returns:
+            None
+        """
+        duplicated = df["transaction_id"].duplicated(keep=False).to_numpy()
+        if not duplicated.any():
+            return
+        for transaction_id in sorted(set(df["transaction_id"].to_numpy()[duplicated].tolist())):
+            names = ", ".join(name for name, frame in frames.items()
+                              if (frame["transaction_id"].to_numpy() == transaction_id).any())
+            print(f"\nWarning: transaction {transaction_id} is stored in more than one partition of {self.directory} "
+                  f"({names}) and is counted once per copy.")
+
+    def partition_backend(self, name):
+        """
+        Args:
+            name (str): The partition name.
+
+        Returns:
+            CSVBackend: Backend for the partition's CSV file, which is created with its header if it does not exist.
+        """
+        backend = CSVBackend(self.partition_file(name), self.columns)
+        if not backend.exists():
+            os.makedirs(os.path.dirname(backend.csv_file), exist_ok=True)
+            backend.create()
+        return backend
+
+    def append(self, entry):
+        """
+        Appends one transaction to the partition of its date.
+
+        Args:
+            entry (dict): The transaction to append, keyed by column name.
+
+        Returns:
+            None
+        """
+        name = self.partition_names(pd.Series([entry["date"]])).iloc[0]
+        self.partition_backend(name).append(entry)
+
+    def append_frame(self, data_frame):
+        """
+        Appends many transactions with one write per partition.
+
+        Args:
+            data_frame (pd.DataFrame): The transactions to append.
+
+        Returns:
+            None
+        """
+        for name, rows in data_frame.groupby(self.partition_names(data_frame["date"]), sort=False):
+            self.partition_backend(name).append_frame(rows)
+
+    def write(self, data_frame):
+        """
+        Re-partitions the given records into a new generation directory and switches to it, so every partition is
+        replaced in one atomic step. Partitions left without records are not carried over.
+
+        Args:
+            data_frame (pd.DataFrame): The complete set of transaction records.
+
+        Returns:
+            None
+        """
+        generation = self.new_generation()
+        try:
+            for name, rows in data_frame.groupby(self.partition_names(data_frame["date"]), sort=False):
+                CSVBackend(self.partition_file(name, generation), self.columns).write(rows)
+        except BaseException:
+            shutil.rmtree(generation, ignore_errors=True)
+            raise
+        self.switch_generation(generation)
+
+    def last_transaction_id(self):
+        """
+        Returns:
+            int: The largest transaction ID at the end of any partition, or 0 if there are no records.
+        """
+        return self.in_generation(lambda generation: max(
+            (CSVBackend(self.partition_file(name, generation), self.columns).last_transaction_id()
+             for name in self.partitions(generation)), default=0))
+
+
+BACKENDS = {
+    "csv": CSVBackend,
+    "numpy": NumpyBackend,
+    "sqlite": SQLiteBackend,
+    "partitioned": PartitionedBackend
+}
@@ -0,0 +1,254 @@
+import os
+from contextlib import contextmanager
+from storage_backends import CSVBackend
+from transaction_store import TransactionStore
+from ledger_aggregates import LedgerAggregates
+from record_codec import RecordCodec
+from parallel_reports import description_cents
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class CategoryTotals:
+    """
+    Mergeable count and total in cents per category, the partial result of a summary over one chunk of records.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(len(RecordCodec.CATEGORIES), dtype=np.int64)
+        self.cents = np.zeros(len(RecordCodec.CATEGORIES), dtype=np.int64)
+
+    @classmethod
+    def of(cls, records):
+        """
+        Args:
+            records (pd.DataFrame): Compact records.
+
+        Returns:
+            CategoryTotals: The totals of the records.
+        """
+        totals = cls()
+        codes = records["category"].to_numpy()
+        totals.counts = np.bincount(codes, minlength=len(RecordCodec.CATEGORIES)).astype(np.int64)
+        # Sums of whole cents are exact in float64 up to 2**53 cents.
+        totals.cents = np.rint(np.bincount(codes, weights=records["amount"].to_numpy(),
+                                           minlength=len(RecordCodec.CATEGORIES))).astype(np.int64)
+        return totals
+
+    def merge(self, other):
+        """
+        Args:
+            other (CategoryTotals): Totals of another chunk, added to these.
+
+        Returns:
+            None
+        """
+        self.counts += other.counts
+        self.cents += other.cents
+
+    def summary(self):
+        """
+        Returns:
+            tuple: (pd.Series number of transactions, pd.Series total amount) per category that has transactions,
+                sorted by category like the groupby results CSVManager.print_summary takes.
+        """
+        present = np.flatnonzero(self.counts)
+        index = pd.Index(np.array(RecordCodec.CATEGORIES, dtype=object)[present], name="category")
+        return (pd.Series(self.counts[present], index=index, name="amount").sort_index(),
+                pd.Series(self.cents[present] / 100, index=index, name="amount").sort_index())
+
+
+class DescriptionTotals:
+    """
+    Mergeable total in cents per lower-cased description of one category, the partial result of an income or expense
+    report over one chunk of records.
+    """
+
+    def __init__(self, category):
+        """
+        Args:
+            category (str): "Income" or "Expense".
+        """
+        self.category = category
+        self.cents = pd.Series(dtype="int64")
+
+    @classmethod
+    def of(cls, records, codec, category):
+        """
+        Args:
+            records (pd.DataFrame): Compact records.
+            codec (RecordCodec): The codec the records were encoded with.
+            category (str): "Income" or "Expense".
+
+        Returns:
+            DescriptionTotals: The totals of the records.
+        """
+        totals = cls(category)
+        totals.cents = description_cents(records, codec, category)
+        return totals
+
+    def merge(self, other):
+        """
+        Args:
+            other (DescriptionTotals): Totals of another chunk, added to these.
+
+        Returns:
+            None
+        """
+        self.cents = self.cents.add(other.cents, fill_value=0).astype(np.int64)
+
+    def totals(self):
+        """
+        Returns:
+            pd.Series: Total amount indexed by description, sorted by description, like
+                TransactionStore.description_totals.
+        """
+        totals = self.cents.sort_index() / 100
+        totals.index.name = "description"
+        return totals.rename("amount")
+
+
+class StreamingReports:
+    """
+    Runs reports over a CSV ledger one chunk of CHUNK_SIZE rows at a time, so they work on ledgers larger than memory.
+
+    Each chunk is read with pandas' chunksize, has the journal applied and is encoded by RecordCodec; the date filter of
+    a query is applied to the chunk straight away, and the chunk's partial result (CategoryTotals, DescriptionTotals or
+    LedgerAggregates) is merged into the running one before the next chunk is read. Peak memory therefore depends on
+    CHUNK_SIZE and on the size of the results (one entry per description or day), not on the size of the ledger.
+
+    Like ParallelReports, streaming is only used while the store has not loaded the records: the single-file "csv"
+    backend is the only one that needs it, since the "partitioned" backend is scanned per partition, "numpy" maps its
+    columns and "sqlite" answers reports with queries.
+
+    Attributes:
+        ENABLED (bool): Stream every report over a CSV ledger whose records are not loaded.
+        AUTO_BYTES (int): Ledger CSV files at least this large are streamed even if ENABLED is False.
+        CHUNK_SIZE (int): Rows per chunk.
+    """
+
+    ENABLED = False
+    AUTO_BYTES = 1 << 30
+    CHUNK_SIZE = 100_000
+
+    @classmethod
+    def applies(cls, store):
+        """
+        Args:
+            store (TransactionStore): The store holding the transaction records.
+
+        Returns:
+            bool: True if the records are a single CSV file that is not loaded into the store and streaming is enabled
+                or the file is at least AUTO_BYTES large.
+        """
+        if type(store.backend) is not CSVBackend or store.is_warm():
+            return False
+        return cls.ENABLED or os.path.getsize(store.csv_file) >= cls.AUTO_BYTES
+
+    @classmethod
+    @contextmanager
+    def configured(cls, enabled=None, chunk_size=None):
+        """
+        Changes ENABLED and CHUNK_SIZE for the duration of a with block, for example one command of a batch.
+
+        Args:
+            enabled (bool): New value of ENABLED, or None to keep it.
+            chunk_size (int): New value of CHUNK_SIZE, or None to keep it.
+        """
+        saved = cls.ENABLED, cls.CHUNK_SIZE
+        if enabled is not None:
+            cls.ENABLED = enabled
+        if chunk_size is not None:
+            cls.CHUNK_SIZE = chunk_size
+        try:
+            yield
+        finally:
+            cls.ENABLED, cls.CHUNK_SIZE = saved
+
+    @classmethod
+    def chunks(cls, store, start_day=None, end_day=None):
+        """
+        Reads the ledger one chunk at a time, with the journal applied.
+
+        Args:
+            store (TransactionStore): The store holding the transaction records.
+            start_day (int): Only keep records dated on or after this day ordinal, or None for no lower bound.
+            end_day (int): Only keep records dated on or before this day ordinal, or None for no upper bound.
+
+        Returns:
+            iterator of tuple: (pd.DataFrame compact records of one chunk, RecordCodec their codec). The codec is reset
+                for every chunk.
+        """
+        journal = store.read_journal()
+        codec = RecordCodec()
+        with pd.read_csv(store.csv_file, dtype=CSVBackend.READ_TYPES, keep_default_na=False,
+                         na_values=CSVBackend.NA_VALUES, chunksize=cls.CHUNK_SIZE) as reader:
+            for chunk in reader:
+                codec.reset()
+                chunk = CSVBackend.checked_amounts(chunk)
+                records = TransactionStore.apply_journal(codec.encode(chunk), journal, codec)
+                TransactionStore.report_missing_amounts(records, store.csv_file)
+                if start_day is not None or end_day is not None:
+                    days = records["date"].to_numpy()
+                    keep = np.ones(len(records), dtype=bool)
+                    if start_day is not None:
+                        keep &= days >= start_day
+                    if end_day is not None:
+                        keep &= days <= end_day
+                    records = records[keep]
+                yield records, codec
+
+    @classmethod
+    def date_range(cls, store, start_date, end_date):
+        """
+        Returns the transactions dated between start_date and end_date inclusive, one chunk at a time, in ledger order.
+
+        Args:
+            store (TransactionStore): The store holding the transaction records.
+            start_date (datetime): The start date of the range.
+            end_date (datetime): The end date of the range.
+
+        Returns:
+            iterator of tuple: (pd.DataFrame the matching records of one chunk with datetime64 dates, CategoryTotals
+                their totals). Chunks without matching records are skipped.
+        """
+        for records, codec in cls.chunks(store, store.day_ordinal(start_date), store.day_ordinal(end_date)):
+            if len(records):
+                yield codec.decode(records, parse_dates=True), CategoryTotals.of(records)
+
+    @classmethod
+    def description_totals(cls, store, category):
+        """
+        Returns the total amount per lower-cased description for one category.
+
+        Args:
+            store (TransactionStore): The store holding the transaction records.
+            category (str): "Income" or "Expense".
+
+        Returns:
+            pd.Series: Total amount indexed by description, sorted by description.
+        """
+        totals = DescriptionTotals(category)
+        for records, codec in cls.chunks(store):
+            totals.merge(DescriptionTotals.of(records, codec, category))
+        return totals.totals()
+
+    @classmethod
+    def aggregates(cls, store):
+        """
+        Computes the running aggregates (per-category totals and the daily and monthly rollup) from scratch.
+
+        Args:
+            store (TransactionStore): The store holding the transaction records.
+
+        Returns:
+            LedgerAggregates: The aggregates, which have not replaced the store's running ones yet.
+        """
+        aggregates = LedgerAggregates()
+        for records, codec in cls.chunks(store):
+            categories = np.array(codec.CATEGORIES, dtype=object).take(records["category"].to_numpy())
+            amounts = pd.DataFrame({"category": categories, "amount": records["amount"].to_numpy() / 100})
+            aggregates.merge(LedgerAggregates.from_frame(amounts, records["date"].to_numpy(dtype=np.int64)))
+        return aggregates
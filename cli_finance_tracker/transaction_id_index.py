@@ -0,0 +1,84 @@
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+
+class TransactionIdIndex:
+    """
+    Maps transaction IDs to the DataFrame row labels of the cached records.
+
+    The IDs of the records as loaded are kept in two numpy arrays sorted by ID, searched with np.searchsorted: 16 bytes
+    per record, where a dict of Python ints takes around 100. IDs added or removed since the last build are kept in a
+    small dict and set on top of the arrays.
+
+    If an ID occurs more than once, the row added last wins.
+    """
+
+    def __init__(self):
+        self._ids = None
+        self._labels = None
+        self._added = {}
+        self._removed = set()
+
+    def build(self, ids, labels):
+        """
+        Replaces the index with the given IDs and labels.
+
+        Args:
+            ids (np.ndarray): Transaction IDs, in row order.
+            labels (np.ndarray): The matching row labels.
+
+        Returns:
+            None
+        """
+        order = np.argsort(ids, kind="stable")
+        self._ids = ids[order]
+        self._labels = labels[order]
+        self._added = {}
+        self._removed = set()
+
+    def get(self, transaction_id, default=None):
+        """
+        Args:
+            transaction_id (int): The transaction ID to look up.
+            default: Returned if the transaction ID is not in the index.
+
+        Returns:
+            int: The row label of the transaction, or default.
+        """
+        label = self._added.get(transaction_id)
+        if label is not None:
+            return label
+        if self._ids is None or transaction_id in self._removed:
+            return default
+        position = np.searchsorted(self._ids, transaction_id, side="right") - 1
+        if position >= 0 and self._ids[position] == transaction_id:
+            return int(self._labels[position])
+        return default
+
+    def __contains__(self, transaction_id):
+        return self.get(transaction_id) is not None
+
+    def __setitem__(self, transaction_id, label):
+        self._added[transaction_id] = label
+        self._removed.discard(transaction_id)
+
+    def pop(self, transaction_id):
+        """
+        Removes a transaction ID from the index.
+
+        Args:
+            transaction_id (int): The transaction ID to remove.
+
+        Returns:
+            int: The row label the transaction ID had.
+
+        Raises:
+            KeyError: If the transaction ID is not in the index.
+        """
+        label = self.get(transaction_id)
+        if label is None:
+            raise KeyError(transaction_id)
+        self._added.pop(transaction_id, None)
+        self._removed.add(transaction_id)
+        return label
@@ -0,0 +1,1157 @@
+import json
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from storage_backends import BACKENDS
+from durable_writer import DurableWriter
+from ledger_aggregates import LedgerAggregates
+from description_index import DescriptionIndex
+from record_codec import RecordCodec
+from transaction_id_index import TransactionIdIndex
+from ledger_lock import LedgerLock
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class TransactionStore:
+    """
+    Keeps the transaction records in memory for the lifetime of the process and writes every change through to disk.
+
+    The CSV file is parsed once. Later calls reuse the cached records until the file's size or modification time
+    changes underneath the store (for example another process appended to it), in which case it is reloaded.
+
+    The cached records are kept in the compact typed form of RecordCodec: int32 day ordinal dates, int8 category codes,
+    int64 amounts in cents and int32 codes into a string table of descriptions. frame() decodes them for callers that
+    need every record; point lookups and date ranges only decode the rows they return.
+
+    Rows keep their DataFrame index label for as long as they are cached, and a transaction_id -> label index
+    (TransactionIdIndex) is maintained alongside the DataFrame on every append, update and delete, so point lookups do
+    not scan the records.
+
+    Date range queries use a second index: the row labels sorted by their day ordinal and searched with np.searchsorted.
+    It is built on the first range query, kept up to date on writes and saved next to the CSV file.
+
+    Reading and writing the records on disk is delegated to a storage backend from storage_backends.BACKENDS.
+
+    Updates and deletes are not written to the backend straight away. Each one is appended as a single line to a change
+    journal (finance_data.journal.jsonl): a field patch or a tombstone. The journal is replayed on top of the backend
+    records when they are loaded, and compact() folds it into the backend and empties it. Replaying is idempotent, so
+    a crash during compaction is harmless.
+
+    Backends that update in place (UPDATES_IN_PLACE, i.e. SQLite) are handed updates and deletes directly instead of
+    journalling them, and answer point lookups, date ranges and reports with their own queries while the records are
+    not cached, so a short-lived process does not load the whole ledger to change or read a few rows.
+
+    Running aggregates (LedgerAggregates: per-category totals plus a daily and monthly rollup) are adjusted on every
+    write made through the store and saved to finance_data.aggregates.json, so summaries do not need the records.
+
+    Every change is made while holding the ledger's cross-process LedgerLock (finance_data.lock) and bumps the ledger's
+    version stamp. Cached records are tagged with the version they were loaded at: if another process has changed the
+    ledger since, the cache is reloaded before reading, and dropped before a change, so the change is applied to the
+    current records rather than overwriting the other process's work with a stale copy.
+
+    The description codes are mapped to lower-cased codes (DescriptionIndex) so the income and expense reports can be
+    computed with np.bincount and cached until a row in the reported category changes.
+
+    Bulk updates and deletes (update_where, delete_where) select the transactions matching a set of CONDITIONS with one
+    vectorized pass over the compact records, change them all at once and make one write: one journal append, one
+    rewrite of the records if that takes the journal past COMPACT_THRESHOLD, or one SQLite transaction.
+
+    Attributes:
+        DATE_FORMAT (str): Date format of the date column.
+        COMPACT_THRESHOLD (int): Number of journal entries after which the journal is compacted automatically.
+        CONDITIONS (tuple of str): Conditions bulk updates and deletes select transactions by: "ids" (list of
+            transaction IDs), "start_date" and "end_date" (inclusive, in DATE_FORMAT), "category" and "description" (a
+            regular expression searched for in the description, ignoring case).
+        _stores (dict): Open stores keyed by CSV file path.
+    """
+
+    DATE_FORMAT = "%m-%d-%Y"
+    COMPACT_THRESHOLD = 10_000
+    CONDITIONS = ("ids", "start_date", "end_date", "category", "description")
+
+    _stores = {}
+
+    def __init__(self, csv_file, columns, backend="csv"):
+        """
+        Creates a store for one transaction records CSV file. Use TransactionStore.open to share stores.
+
+        Args:
+            csv_file (str): Path to the transaction records CSV file.
+            columns (list of str): Column names of the transaction records.
+            backend (str): Name of the storage backend in storage_backends.BACKENDS.
+        """
+        self.csv_file = csv_file
+        self.columns = columns
+        self.backend = BACKENDS[backend](csv_file, columns)
+        self._df = None
+        self._pending = []
+        self._signature = None
+        self._id_index = TransactionIdIndex()
+        self._next_label = 0
+        self._date_keys = None
+        self._date_labels = None
+        self.date_index_file = f"{os.path.splitext(csv_file)[0]}.date_index.npz"
+        self.journal_file = f"{os.path.splitext(csv_file)[0]}.journal.jsonl"
+        self._journal_length = 0
+        self.aggregates = LedgerAggregates(f"{os.path.splitext(csv_file)[0]}.aggregates.json")
+        self.codec = RecordCodec()
+        self.descriptions = DescriptionIndex()
+        self.lock = LedgerLock(f"{os.path.splitext(csv_file)[0]}.lock")
+        self._version = None
+        self.conflicts = 0
+        self.loads = 0
+
+    @classmethod
+    def open(cls, csv_file, columns, backend="csv"):
+        """
+        Returns the shared store for a CSV file, creating it on first use.
+
+        Args:
+            csv_file (str): Path to the transaction records CSV file.
+            columns (list of str): Column names of the transaction records.
+            backend (str): Name of the storage backend in storage_backends.BACKENDS.
+
+        Returns:
+            TransactionStore: The store for the file.
+        """
+        store = cls._stores.get(csv_file)
+        if store is None or type(store.backend) is not BACKENDS[backend]:
+            store = cls._stores[csv_file] = cls(csv_file, columns, backend)
+        return store
+
+    def file_signature(self):
+        """
+        Returns the size and modification time of the backend and of the journal, used to detect changes made outside
+        the store.
+
+        Returns:
+            tuple: (size, mtime_ns) of the stored records followed by (size, mtime_ns) of the journal.
+        """
+        try:
+            stat = os.stat(self.journal_file)
+            journal_signature = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            journal_signature = (0, 0)
+        return self.backend.file_signature() + journal_signature
+
+    def invalidate(self):
+        """
+        Drops the cached records so the next access reloads them from disk.
+
+        Returns:
+            None
+        """
+        self._df = None
+        self._pending = []
+        self._signature = None
+        self._id_index = TransactionIdIndex()
+        self._next_label = 0
+        self._date_keys = None
+        self._date_labels = None
+        self.codec.reset()
+        self.descriptions.reset()
+
+    def frame(self):
+        """
+        Returns all transaction records, loading them from disk if needed.
+
+        The records are decoded from the compact cache on every call, so the returned DataFrame belongs to the caller.
+
+        Returns:
+            pd.DataFrame: All transaction records.
+        """
+        return self.codec.decode(self.records())
+
+    def records(self):
+        """
+        Returns the cached records in compact form, loading them from disk if needed.
+
+        The returned DataFrame is shared; callers must not modify it.
+
+        Returns:
+            pd.DataFrame: All transaction records, encoded by RecordCodec.
+        """
+        if not self.sync() and self._pending:
+            labels = [label for label, _ in self._pending]
+            rows = [entry for _, entry in self._pending]
+            pending = self.codec.encode(pd.DataFrame(rows, columns=self.columns, index=labels))
+            self._df = pd.concat([self._df, pending])
+            self._pending = []
+        return self._df
+
+    def sync(self):
+        """
+        Reloads the cache if it is empty, the CSV file changed outside the store or another process bumped the version.
+
+        Returns:
+            bool: True if the records were reloaded from disk.
+        """
+        signature = self.file_signature()
+        if self._df is None or signature != self._signature or self.lock.version() != self._version:
+            self.load()
+            self._signature = signature
+            return True
+        return False
+
+    def load(self):
+        """
+        Reads the stored records into the cache, replays the journal and rebuilds the transaction ID index.
+
+        Returns:
+            None
+        """
+        self._version = self.lock.version()
+        self.codec.reset()
+        self._df = self.replay_journal(self.codec.encode(self.backend.read()))
+        self._pending = []
+        self.loads += 1
+        self.report_missing_amounts(self._df, self.csv_file)
+        self.reindex()
+        self.load_date_index()
+
+    @staticmethod
+    def report_missing_amounts(records, csv_file):
+        """
+        Reports the transactions without a valid amount, which the backends read as 0 (see
+        CSVBackend.checked_amounts), so they can be fixed with an update.
+
+        Args:
+            records (pd.DataFrame): Compact records, with the journal applied.
+            csv_file (str): Path of the transaction records, for the report.
+
+        Returns:
+            None
+        """
+        missing = records["amount"].to_numpy() == 0
+        if missing.any():
+            ids = ", ".join(str(transaction_id) for transaction_id in records["transaction_id"].to_numpy()[missing])
+            print(f"\nWarning: transactions {ids} in {csv_file} have no valid amount and are read as 0. "
+                  "Set it with 'update <transaction_id> amount <value>'.")
+
+    def cached(self):
+        """
+        Decides whether a read is answered from the cached records or by the backend.
+
+        Backends that update in place answer reads themselves, so for them the cache is only used while it is loaded
+        and current; a stale cache is dropped rather than reloaded.
+
+        Returns:
+            bool: True if the read should use the cached records.
+        """
+        if not self.backend.UPDATES_IN_PLACE:
+            return True
+        if self._df is not None and (self.file_signature() != self._signature
+                                     or self.lock.version() != self._version):
+            self.invalidate()
+        return self._df is not None
+
+    def is_warm(self):
+        """
+        Checks whether reads can be answered without modifying the store: the records, date index, aggregates and
+        description codes are all loaded and current.
+
+        Returns:
+            bool: True if the store is warm.
+        """
+        signature = self.file_signature()
+        return (self._df is not None and not self._pending and self._signature == signature
+                and self._version == self.lock.version() and self._date_keys is not None
+                and self.aggregates.signature == signature and self.descriptions.is_built(self.codec.strings))
+
+    def warm(self):
+        """
+        Loads everything reads depend on, so that afterwards concurrent readers only look at the cached state.
+
+        Returns:
+            None
+        """
+        self.records()
+        self.date_index()
+        self.summary_aggregates().prefix_sums()
+        self.descriptions.build(self.codec.strings)
+
+    @contextmanager
+    def locked(self):
+        """
+        Holds the ledger lock for the duration of a with block that changes the ledger. Nested uses share one lock.
+
+        On entry, if another process changed the ledger since the cache was loaded, the conflict is counted and the
+        cache dropped, along with anything the backend cached, so the change is retried against the current records.
+        On exit the version stamp is bumped.
+
+        Raises:
+            TimeoutError: If another process holds the lock for longer than LedgerLock.TIMEOUT.
+        """
+        with self.lock.exclusive() as outermost:
+            if outermost and self._version != self.lock.version():
+                self.backend.reset()
+                if self._df is not None:
+                    self.conflicts += 1
+                    self.invalidate()
+            try:
+                yield
+            except BaseException:
+                self.invalidate()
+                raise
+            finally:
+                if outermost:
+                    self._version = self.lock.bump()
+
+    def read_journal(self):
+        """
+        Reads the journal entries in the order they were written.
+
+        A line cut short by a crash is ignored; the change it described was never acknowledged.
+
+        Returns:
+            list of dict: The journal entries.
+        """
+        entries = []
+        try:
+            with open(self.journal_file, encoding="utf-8") as journal_file:
+                for line in journal_file:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def replay_journal(self, df):
+        """
+        Applies the journal's field patches and tombstones to records read from the backend.
+
+        Args:
+            df (pd.DataFrame): The records as stored by the backend, encoded by the store's codec.
+
+        Returns:
+            pd.DataFrame: The current records, with a fresh RangeIndex.
+        """
+        entries = self.read_journal()
+        self._journal_length = len(entries)
+        return self.apply_journal(df, entries, self.codec)
+
+    @staticmethod
+    def apply_journal(df, entries, codec):
+        """
+        Applies journal entries to compact records. Entries for transaction IDs that are not in the records are skipped,
+        so the journal can also be applied to one partition of the records at a time.
+
+        Args:
+            df (pd.DataFrame): The records as stored by the backend, encoded by codec.
+            entries (list of dict): The journal entries, in the order they were written.
+            codec (RecordCodec): The codec the records were encoded with, used to encode the patched values.
+
+        Returns:
+            pd.DataFrame: The current records, with a fresh RangeIndex.
+        """
+        if not entries:
+            return df
+
+        labels = TransactionIdIndex()
+        labels.build(df["transaction_id"].to_numpy(), df.index.to_numpy(dtype=np.int64))
+        deleted = set()
+        for entry in entries:
+            label = labels.get(entry["transaction_id"])
+            if label is None or label in deleted:
+                continue
+            if entry["op"] == "delete":
+                deleted.add(label)
+            else:
+                df.at[label, entry["field"]] = codec.encode_value(entry["field"], entry["value"])
+        return df.drop(index=list(deleted)).reset_index(drop=True)
+
+    def journal(self, entry):
+        """
+        Appends one entry to the journal and compacts it once it grows past COMPACT_THRESHOLD entries.
+
+        Backends that update in place apply the entry straight away instead.
+
+        Args:
+            entry (dict): The field patch or tombstone to record.
+
+        Returns:
+            None
+        """
+        if self.backend.UPDATES_IN_PLACE:
+            self.backend.apply(entry)
+            self._signature = self.file_signature()
+            return
+        DurableWriter.append(self.journal_file, f"{json.dumps(entry)}\n")
+        self._journal_length += 1
+        self._signature = self.file_signature()
+        if self._journal_length >= self.COMPACT_THRESHOLD:
+            self.compact()
+
+    def journal_all(self, entries):
+        """
+        Records many field patches and tombstones with one write: one append to the journal, or, if that would take the
+        journal past COMPACT_THRESHOLD, one rewrite of the cached records, which already include the changes.
+
+        Backends that update in place apply all the entries in one transaction instead.
+
+        Args:
+            entries (list of dict): The field patches and tombstones to record, in order.
+
+        Returns:
+            None
+        """
+        if self.backend.UPDATES_IN_PLACE:
+            self.backend.apply_all(entries)
+            self._signature = self.file_signature()
+            return
+        if self._journal_length + len(entries) >= self.COMPACT_THRESHOLD:
+            self.persist()
+            return
+        DurableWriter.append(self.journal_file, "".join(f"{json.dumps(entry)}\n" for entry in entries))
+        self._journal_length += len(entries)
+        self._signature = self.file_signature()
+
+    def compact(self):
+        """
+        Writes the current records to the backend and empties the journal.
+
+        Returns:
+            int: The number of journal entries that were folded into the backend, always 0 for backends that update
+                in place.
+        """
+        if self.backend.UPDATES_IN_PLACE:
+            return 0
+        with self.locked():
+            self.records()
+            compacted = self._journal_length
+            self.persist()
+            return compacted
+
+    def summary_aggregates(self, rebuild=None):
+        """
+        Returns the running per-category aggregates, loading or rebuilding them if they are not current.
+
+        Args:
+            rebuild (callable): Returns the aggregates computed from scratch if they have to be rebuilt; defaults to
+                rebuild_aggregates, which loads the records.
+
+        Returns:
+            LedgerAggregates: Aggregates describing the current records.
+        """
+        signature = self.file_signature()
+        if self.aggregates.signature != signature and not self.aggregates.load(signature):
+            self.aggregates.replace_with((rebuild or self.rebuild_aggregates)(), signature)
+        return self.aggregates
+
+    def rebuild_aggregates(self):
+        """
+        Computes the running aggregates from the records from scratch.
+
+        Returns:
+            LedgerAggregates: The rebuilt aggregates, which have not replaced the running ones yet.
+        """
+        df = self.records()
+        categories = np.array(self.codec.CATEGORIES, dtype=object).take(df["category"].to_numpy())
+        amounts = pd.DataFrame({"category": categories, "amount": df["amount"].to_numpy() / 100})
+        return LedgerAggregates.from_frame(amounts, df["date"].to_numpy(dtype=np.int64))
+
+    def aggregates_in_sync(self):
+        """
+        Loads the saved aggregates first if this process has not read them yet, so that writes from a short-lived
+        process keep them current without a rebuild.
+
+        Returns:
+            bool: True if the running aggregates describe the records currently on disk.
+        """
+        signature = self.file_signature()
+        return self.aggregates.signature == signature or self.aggregates.load(signature)
+
+    def commit_aggregates(self):
+        """
+        Tags the running aggregates with the current signature after a write and saves them.
+
+        Returns:
+            None
+        """
+        self.aggregates.signature = self.file_signature()
+        self.aggregates.save()
+
+    def reindex(self):
+        """
+        Rebuilds the transaction ID index from the cached DataFrame.
+
+        Returns:
+            None
+        """
+        self._id_index.build(self._df["transaction_id"].to_numpy(), self._df.index.to_numpy(dtype=np.int64))
+        self._next_label = int(self._df.index.max()) + 1 if len(self._df) else 0
+        self._date_keys = None
+        self._date_labels = None
+        self.descriptions.reset()
+
+    def contains(self, transaction_id):
+        """
+        Checks whether a transaction ID exists using the transaction ID index.
+
+        Args:
+            transaction_id (int): The transaction ID to look up.
+
+        Returns:
+            bool: True if the transaction ID is present.
+        """
+        if not self.cached():
+            return self.backend.contains(transaction_id)
+        self.sync()
+        return transaction_id in self._id_index
+
+    def row(self, transaction_id):
+        """
+        Looks up one transaction using the transaction ID index.
+
+        Args:
+            transaction_id (int): The transaction ID to look up.
+
+        Returns:
+            pd.DataFrame: The matching record, empty if the transaction ID was not found.
+        """
+        if not self.cached():
+            return self.backend.row(transaction_id)
+        df = self.records()
+        label = self._id_index.get(transaction_id)
+        return self.codec.decode(df.iloc[0:0] if label is None else df.loc[[label]])
+
+    @classmethod
+    def date_ordinals(cls, dates):
+        """
+        Converts date strings to int64 day ordinals (days since 1970-01-01).
+
+        Args:
+            dates (pd.Series or list of str): Dates in DATE_FORMAT.
+
+        Returns:
+            np.ndarray: The day ordinals, in the same order as the input.
+        """
+        return RecordCodec.day_ordinals(dates).astype(np.int64)
+
+    @staticmethod
+    def day_ordinal(date):
+        """
+        Converts a datetime to an int64 day ordinal comparable with date_ordinals.
+
+        Args:
+            date (datetime): The date to convert.
+
+        Returns:
+            int: Days since 1970-01-01.
+        """
+        return (date.date() - datetime(1970, 1, 1).date()).days
+
+    @classmethod
+    def date_ordinal(cls, date):
+        """
+        Converts a single date string to a day ordinal without going through pandas.
+
+        Args:
+            date (str): The date in DATE_FORMAT.
+
+        Returns:
+            int: Days since 1970-01-01.
+        """
+        return cls.day_ordinal(datetime.strptime(date, cls.DATE_FORMAT))
+
+    def description_totals(self, category):
+        """
+        Returns the total amount per lower-cased description for one category.
+
+        Args:
+            category (str): "Income" or "Expense".
+
+        Returns:
+            pd.Series: Total amount indexed by description, sorted by description.
+        """
+        if not self.cached():
+            return self.backend.description_totals(category)
+        return self.descriptions.totals(self.records(), category, self.codec)
+
+    def date_index(self):
+        """
+        Returns the date index, building and saving it if needed.
+
+        Returns:
+            tuple: (np.ndarray of sorted day ordinals, np.ndarray of the matching row labels)
+        """
+        df = self.records()
+        if self._date_keys is None:
+            ordinals = df["date"].to_numpy()
+            order = np.argsort(ordinals, kind="stable")
+            self._date_keys = ordinals[order]
+            self._date_labels = df.index.to_numpy(dtype=np.int64)[order]
+            self.save_date_index()
+        return self._date_keys, self._date_labels
+
+    def date_range(self, start_date, end_date, parse_dates=False):
+        """
+        Returns the transactions dated between start_date and end_date inclusive, ordered by date.
+
+        Two binary searches find the matching slice of the date index, so only the matching rows are touched.
+
+        Args:
+            start_date (datetime): The start date of the range.
+            end_date (datetime): The end date of the range.
+            parse_dates (bool): Return the date column as datetime64 values instead of DATE_FORMAT strings; cached
+                records are converted from their day ordinals without parsing any strings.
+
+        Returns:
+            pd.DataFrame: The matching transaction records.
+        """
+        if not self.cached():
+            df = self.backend.date_range(self.day_ordinal(start_date), self.day_ordinal(end_date))
+            if parse_dates:
+                df["date"] = pd.to_datetime(df["date"], format=self.DATE_FORMAT)
+            return df
+        keys, labels = self.date_index()
+        low = np.searchsorted(keys, self.day_ordinal(start_date), side="left")
+        high = np.searchsorted(keys, self.day_ordinal(end_date), side="right")
+        return self.codec.decode(self._df.loc[labels[low:high]], parse_dates)
+
+    def index_date(self, label, date):
+        """
+        Adds a row label to the date index, keeping it sorted.
+
+        Args:
+            label (int): The row label.
+            date (str): The row's date in DATE_FORMAT.
+
+        Returns:
+            None
+        """
+        if self._date_keys is None:
+            return
+        ordinal = self.date_ordinal(date)
+        position = np.searchsorted(self._date_keys, ordinal, side="right")
+        self._date_keys = np.insert(self._date_keys, position, ordinal)
+        self._date_labels = np.insert(self._date_labels, position, label)
+
+    def unindex_date(self, label, date):
+        """
+        Removes a row label from the date index.
+
+        Args:
+            label (int): The row label.
+            date (str): The row's date in DATE_FORMAT, used to find the label with a binary search.
+
+        Returns:
+            None
+        """
+        if self._date_keys is None:
+            return
+        ordinal = self.date_ordinal(date)
+        low = np.searchsorted(self._date_keys, ordinal, side="left")
+        high = np.searchsorted(self._date_keys, ordinal, side="right")
+        position = low + np.flatnonzero(self._date_labels[low:high] == label)[0]
+        self._date_keys = np.delete(self._date_keys, position)
+        self._date_labels = np.delete(self._date_labels, position)
+
+    def load_date_index(self):
+        """
+        Loads the saved date index if it was saved against the current version of the CSV file.
+
+        Returns:
+            None
+        """
+        try:
+            with np.load(self.date_index_file) as saved:
+                if tuple(saved["signature"]) == self.file_signature() and len(saved["keys"]) == len(self._df):
+                    self._date_keys = saved["keys"]
+                    self._date_labels = saved["labels"]
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            pass
+
+    def save_date_index(self):
+        """
+        Saves the date index next to the CSV file, tagged with the CSV file's size and modification time.
+
+        Returns:
+            None
+        """
+        if self._date_keys is None:
+            return
+        # Labels are saved as row positions, which is what they become when the CSV file is next loaded.
+        positions = self._df.index.get_indexer(self._date_labels)
+        signature = np.array(self.file_signature(), dtype=np.int64)
+        DurableWriter.atomic_replace(self.date_index_file,
+                                     lambda index_file: np.savez(index_file, keys=self._date_keys, labels=positions,
+                                                                 signature=signature),
+                                     binary=True)
+
+    def append(self, entry):
+        """
+        Appends one transaction to disk and to the cached records.
+
+        Appended rows are buffered and merged into the cached DataFrame on the next read, so a run of inserts costs
+        one file append each rather than one DataFrame copy each.
+
+        Args:
+            entry (dict): The transaction to append, keyed by column name.
+
+        Returns:
+            None
+        """
+        self.append_entries([entry])
+
+    def append_entries(self, entries):
+        """
+        Appends several transactions to disk with one write and adds them to the cached records.
+
+        Args:
+            entries (list of dict): The transactions to append, keyed by column name.
+
+        Returns:
+            None
+        """
+        with self.locked():
+            in_sync = self._df is not None and self.file_signature() == self._signature
+            aggregates_in_sync = self.aggregates_in_sync()
+
+            if len(entries) == 1:
+                self.backend.append(entries[0])
+            else:
+                self.backend.append_frame(pd.DataFrame(entries, columns=self.columns))
+
+            if aggregates_in_sync:
+                for entry in entries:
+                    self.aggregates.add(entry["category"], entry["amount"], self.date_ordinal(entry["date"]))
+                self.commit_aggregates()
+
+            if in_sync:
+                for entry in entries:
+                    self._pending.append((self._next_label, entry))
+                    self._id_index[int(entry["transaction_id"])] = self._next_label
+                    self.index_date(self._next_label, entry["date"])
+                    self.descriptions.changed(entry["category"])
+                    self._next_label += 1
+                self._signature = self.file_signature()
+            else:
+                self.invalidate()
+
+    def append_frame(self, data_frame):
+        """
+        Appends many transactions to disk in one write. The cache is reloaded on the next access.
+
+        Args:
+            data_frame (pd.DataFrame): The transactions to append.
+
+        Returns:
+            None
+        """
+        with self.locked():
+            aggregates_in_sync = self.aggregates_in_sync()
+            self.backend.append_frame(data_frame)
+            self.invalidate()
+            if aggregates_in_sync:
+                self.aggregates.merge(LedgerAggregates.from_frame(data_frame, self.date_ordinals(data_frame["date"])))
+                self.commit_aggregates()
+
+    def update(self, transaction_id, update_field, new_value):
+        """
+        Sets one field of a transaction and records the change in the journal.
+
+        Args:
+            transaction_id (int): The transaction ID of the record to update.
+            update_field (str): The field to be updated.
+            new_value (str or float): The new value to set for the field.
+
+        Returns:
+            The previous value of the field.
+
+        Raises:
+            ValueError: If the transaction ID does not exist.
+        """
+        with self.locked():
+            if not self.cached():
+                return self.update_in_place(transaction_id, update_field, new_value)
+            df = self.records()
+            aggregates_in_sync = self.aggregates_in_sync()
+            label = self._id_index.get(transaction_id)
+            if label is None:
+                raise ValueError(f"Transaction ID {transaction_id} not found")
+            old_row = self.codec.decode(df.loc[[label]]).iloc[0]
+            new_row = old_row.copy()
+            new_row[update_field] = new_value
+            df.at[label, update_field] = self.codec.encode_value(update_field, new_value)
+            if update_field == "date":
+                self.unindex_date(label, old_row["date"])
+                self.index_date(label, new_value)
+            else:
+                self.descriptions.changed(old_row["category"])
+                self.descriptions.changed(new_row["category"])
+            self.journal({"op": "update", "transaction_id": int(transaction_id), "field": update_field,
+                          "value": new_value})
+            if aggregates_in_sync:
+                for row, sign in ((old_row, -1), (new_row, 1)):
+                    self.aggregates.add(row["category"], row["amount"], self.date_ordinal(row["date"]), sign=sign)
+                self.commit_aggregates()
+            return old_row[update_field]
+
+    def delete(self, transaction_id):
+        """
+        Removes a transaction and records a tombstone in the journal.
+
+        Args:
+            transaction_id (int): The transaction ID of the record to delete.
+
+        Returns:
+            pd.DataFrame: The deleted record, empty if the transaction ID was not found.
+        """
+        with self.locked():
+            if not self.cached():
+                return self.delete_in_place(transaction_id)
+            deleted_transaction = self.row(transaction_id)
+            aggregates_in_sync = self.aggregates_in_sync()
+            if not deleted_transaction.empty:
+                label = self._id_index.pop(transaction_id)
+                self.unindex_date(label, deleted_transaction["date"].iloc[0])
+                self._df = self._df.drop(index=label)
+                self.descriptions.changed(deleted_transaction["category"].iloc[0])
+                self.journal({"op": "delete", "transaction_id": int(transaction_id)})
+                if aggregates_in_sync:
+                    deleted_row = deleted_transaction.iloc[0]
+                    self.aggregates.add(deleted_row["category"], deleted_row["amount"],
+                                        self.date_ordinal(deleted_row["date"]), sign=-1)
+                    self.commit_aggregates()
+            return deleted_transaction
+
+    def update_in_place(self, transaction_id, update_field, new_value):
+        """
+        Sets one field of a transaction through a backend that updates in place, without loading the records.
+
+        Args:
+            transaction_id (int): The transaction ID of the record to update.
+            update_field (str): The field to be updated.
+            new_value (str or float): The new value to set for the field.
+
+        Returns:
+            The previous value of the field.
+
+        Raises:
+            ValueError: If the transaction ID does not exist.
+        """
+        record = self.backend.row(transaction_id)
+        if record.empty:
+            raise ValueError(f"Transaction ID {transaction_id} not found")
+        aggregates_in_sync = self.aggregates_in_sync()
+        old_row = record.iloc[0]
+        new_row = old_row.copy()
+        new_row[update_field] = new_value
+        self.journal({"op": "update", "transaction_id": int(transaction_id), "field": update_field,
+                      "value": new_value})
+        if aggregates_in_sync:
+            for row, sign in ((old_row, -1), (new_row, 1)):
+                self.aggregates.add(row["category"], row["amount"], self.date_ordinal(row["date"]), sign=sign)
+            self.commit_aggregates()
+        return old_row[update_field]
+
+    def delete_in_place(self, transaction_id):
+        """
+        Removes a transaction through a backend that updates in place, without loading the records.
+
+        Args:
+            transaction_id (int): The transaction ID of the record to delete.
+
+        Returns:
+            pd.DataFrame: The deleted record, empty if the transaction ID was not found.
+        """
+        deleted_transaction = self.backend.row(transaction_id)
+        if deleted_transaction.empty:
+            return deleted_transaction
+        aggregates_in_sync = self.aggregates_in_sync()
+        self.journal({"op": "delete", "transaction_id": int(transaction_id)})
+        if aggregates_in_sync:
+            deleted_row = deleted_transaction.iloc[0]
+            self.aggregates.add(deleted_row["category"], deleted_row["amount"], self.date_ordinal(deleted_row["date"]),
+                                sign=-1)
+            self.commit_aggregates()
+        return deleted_transaction
+
+    @classmethod
+    def check_conditions(cls, conditions):
+        """
+        Args:
+            conditions (dict): Values keyed by names from CONDITIONS; None values are ignored.
+
+        Returns:
+            dict: The conditions that were given.
+
+        Raises:
+            ValueError: If a condition is unknown or none was given, which would select every transaction.
+        """
+        unknown = set(conditions) - set(cls.CONDITIONS)
+        if unknown:
+            raise ValueError(f"Unknown conditions: {', '.join(sorted(unknown))}")
+        given = {name: value for name, value in conditions.items() if value is not None}
+        if not given:
+            raise ValueError("At least one condition is needed to select transactions")
+        return given
+
+    @staticmethod
+    def matching_strings(pattern, strings):
+        """
+        Args:
+            pattern (str): A regular expression, searched for ignoring case.
+            strings (sequence of str): Descriptions, such as a string table.
+
+        Returns:
+            np.ndarray: Positions of the strings the pattern is found in.
+
+        Raises:
+            ValueError: If the pattern is not a valid regular expression.
+        """
+        try:
+            search = re.compile(pattern, re.IGNORECASE).search
+        except re.error as e:
+            raise ValueError(f"Invalid description pattern '{pattern}': {e}") from None
+        return np.flatnonzero(np.fromiter((search(string) is not None for string in strings), dtype=bool,
+                                          count=len(strings)))
+
+    def conditions_mask(self, df, conditions):
+        """
+        Evaluates conditions over compact records with one vectorized comparison per condition. A description pattern
+        is only searched for in the string table, once per distinct description.
+
+        Args:
+            df (pd.DataFrame): Compact records.
+            conditions (dict): Conditions as returned by check_conditions.
+
+        Returns:
+            np.ndarray: True for the records matching every condition.
+        """
+        mask = np.ones(len(df), dtype=bool)
+        if "ids" in conditions:
+            mask &= np.isin(df["transaction_id"].to_numpy(), np.asarray(conditions["ids"], dtype=np.int64))
+        if "start_date" in conditions:
+            mask &= df["date"].to_numpy() >= self.date_ordinal(conditions["start_date"])
+        if "end_date" in conditions:
+            mask &= df["date"].to_numpy() <= self.date_ordinal(conditions["end_date"])
+        if "category" in conditions:
+            mask &= df["category"].to_numpy() == self.codec.category_code(conditions["category"])
+        if "description" in conditions:
+            mask &= np.isin(df["description"].to_numpy(),
+                            self.matching_strings(conditions["description"], self.codec.strings))
+        return mask
+
+    def select(self, **conditions):
+        """
+        Returns the transactions matching every given condition.
+
+        Args:
+            **conditions: Values keyed by names from CONDITIONS.
+
+        Returns:
+            pd.DataFrame: The matching transaction records.
+
+        Raises:
+            ValueError: If a condition is unknown or none was given.
+        """
+        conditions = self.check_conditions(conditions)
+        if not self.cached():
+            return self.select_in_place(conditions)
+        df = self.records()
+        return self.codec.decode(df[self.conditions_mask(df, conditions)])
+
+    def select_in_place(self, conditions):
+        """
+        Returns the transactions matching conditions from a backend that updates in place, without loading the records.
+        The backend filters by everything but the description pattern, which is then searched for once per distinct
+        description of the rows it returned.
+
+        Args:
+            conditions (dict): Conditions as returned by check_conditions.
+
+        Returns:
+            pd.DataFrame: The matching transaction records.
+        """
+        start_day, end_day = (None if conditions.get(name) is None else self.date_ordinal(conditions[name])
+                              for name in ("start_date", "end_date"))
+        rows = self.backend.select(conditions.get("ids"), start_day, end_day, conditions.get("category"))
+        if "description" in conditions:
+            codes, descriptions = pd.factorize(rows["description"])
+            rows = rows[np.isin(codes, self.matching_strings(conditions["description"], descriptions))]
+        return rows.reset_index(drop=True)
+
+    def adjust_aggregates(self, removed, added):
+        """
+        Removes a batch of records from the running aggregates and adds another, each with one groupby.
+
+        Args:
+            removed (pd.DataFrame): Records to remove, as returned by the backends.
+            added (pd.DataFrame): Records to add, or None.
+
+        Returns:
+            None
+        """
+        self.aggregates.merge(LedgerAggregates.from_frame(removed, self.date_ordinals(removed["date"])), sign=-1)
+        if added is not None:
+            self.aggregates.merge(LedgerAggregates.from_frame(added, self.date_ordinals(added["date"])))
+
+    def update_where(self, update_field, new_value, **conditions):
+        """
+        Sets one field of every transaction matching the conditions, with one assignment to the cached records and one
+        write (see journal_all).
+
+        Args:
+            update_field (str): The field to be updated.
+            new_value (str or float): The new value to set for the field.
+            **conditions: Values keyed by names from CONDITIONS.
+
+        Returns:
+            pd.DataFrame: The matching records as they were before the update; empty if nothing matched.
+
+        Raises:
+            ValueError: If a condition is unknown or none was given.
+        """
+        conditions = self.check_conditions(conditions)
+        with self.locked():
+            if not self.cached():
+                return self.update_where_in_place(conditions, update_field, new_value)
+            df = self.records()
+            aggregates_in_sync = self.aggregates_in_sync()
+            mask = self.conditions_mask(df, conditions)
+            old_rows = self.codec.decode(df[mask])
+            if old_rows.empty:
+                return old_rows
+            new_rows = old_rows.assign(**{update_field: new_value})
+            df.loc[mask, update_field] = self.codec.encode_value(update_field, new_value)
+            if update_field == "date":
+                self._date_keys = None
+                self._date_labels = None
+            for category in set(old_rows["category"]) | set(new_rows["category"]):
+                self.descriptions.changed(category)
+            if aggregates_in_sync:
+                self.adjust_aggregates(old_rows, new_rows)
+            self.journal_all([{"op": "update", "transaction_id": transaction_id, "field": update_field,
+                               "value": new_value} for transaction_id in old_rows["transaction_id"].tolist()])
+            if aggregates_in_sync:
+                self.commit_aggregates()
+            return old_rows.reset_index(drop=True)
+
+    def delete_where(self, **conditions):
+        """
+        Removes every transaction matching the conditions, with one filter of the cached records and one write (see
+        journal_all).
+
+        Args:
+            **conditions: Values keyed by names from CONDITIONS.
+
+        Returns:
+            pd.DataFrame: The deleted records; empty if nothing matched.
+
+        Raises:
+            ValueError: If a condition is unknown or none was given.
+        """
+        conditions = self.check_conditions(conditions)
+        with self.locked():
+            if not self.cached():
+                return self.delete_where_in_place(conditions)
+            df = self.records()
+            aggregates_in_sync = self.aggregates_in_sync()
+            mask = self.conditions_mask(df, conditions)
+            deleted_rows = self.codec.decode(df[mask])
+            if deleted_rows.empty:
+                return deleted_rows
+            self._df = df[~mask]
+            self._id_index.build(self._df["transaction_id"].to_numpy(), self._df.index.to_numpy(dtype=np.int64))
+            if self._date_keys is not None:
+                kept = ~np.isin(self._date_labels, deleted_rows.index.to_numpy())
+                self._date_keys = self._date_keys[kept]
+                self._date_labels = self._date_labels[kept]
+            for category in set(deleted_rows["category"]):
+                self.descriptions.changed(category)
+            if aggregates_in_sync:
+                self.adjust_aggregates(deleted_rows, None)
+            self.journal_all([{"op": "delete", "transaction_id": transaction_id}
+                              for transaction_id in deleted_rows["transaction_id"].tolist()])
+            if aggregates_in_sync:
+                self.commit_aggregates()
+            return deleted_rows.reset_index(drop=True)
+
+    def update_where_in_place(self, conditions, update_field, new_value):
+        """
+        Sets one field of every transaction matching conditions through a backend that updates in place, without
+        loading the records.
+
+        Args:
+            conditions (dict): Conditions as returned by check_conditions.
+            update_field (str): The field to be updated.
+            new_value (str or float): The new value to set for the field.
+
+        Returns:
+            pd.DataFrame: The matching records as they were before the update; empty if nothing matched.
+        """
+        old_rows = self.select_in_place(conditions)
+        if old_rows.empty:
+            return old_rows
+        aggregates_in_sync = self.aggregates_in_sync()
+        self.journal_all([{"op": "update", "transaction_id": transaction_id, "field": update_field, "value": new_value}
+                          for transaction_id in old_rows["transaction_id"].tolist()])
+        if aggregates_in_sync:
+            self.adjust_aggregates(old_rows, old_rows.assign(**{update_field: new_value}))
+            self.commit_aggregates()
+        return old_rows
+
+    def delete_where_in_place(self, conditions):
+        """
+        Removes every transaction matching conditions through a backend that updates in place, without loading the
+        records.
+
+        Args:
+            conditions (dict): Conditions as returned by check_conditions.
+
+        Returns:
+            pd.DataFrame: The deleted records; empty if nothing matched.
+        """
+        deleted_rows = self.select_in_place(conditions)
+        if deleted_rows.empty:
+            return deleted_rows
+        aggregates_in_sync = self.aggregates_in_sync()
+        self.journal_all([{"op": "delete", "transaction_id": transaction_id}
+                          for transaction_id in deleted_rows["transaction_id"].tolist()])
+        if aggregates_in_sync:
+            self.adjust_aggregates(deleted_rows, None)
+            self.commit_aggregates()
+        return deleted_rows
+
+    def write(self, data_frame):
+        """
+        Replaces the stored records and the cached records with the given DataFrame.
+
+        Args:
+            data_frame (pd.DataFrame): The complete set of transaction records.
+
+        Returns:
+            None
+        """
+        with self.locked():
+            self.codec.reset()
+            self._df = self.codec.encode(data_frame.reset_index(drop=True))
+            self._pending = []
+            self.reindex()
+            self.persist()
+            self.aggregates.replace_with(self.rebuild_aggregates(), self.file_signature())
+
+    def persist(self):
+        """
+        Writes the cached records back to disk and empties the journal, whose changes they already include.
+
+        Returns:
+            None
+        """
+        aggregates_in_sync = self.aggregates_in_sync()
+        self.backend.write(self.codec.decode(self._df))
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self._journal_length = 0
+        self._signature = self.file_signature()
+        self.save_date_index()
+        if aggregates_in_sync:
+            self.commit_aggregates()
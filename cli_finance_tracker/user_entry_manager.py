@@ -1,3 +1,4 @@
+import math
 from datetime import datetime
 
 
@@ -40,12 +41,8 @@ class UserEntryManager:
         """
         date_str = input(prompt)
 
-        if allow_default and not date_str:
-            return datetime.today().strftime(cls.DATE_FORMAT)
-
         try:
-            valid_date = datetime.strptime(date_str, cls.DATE_FORMAT)
-            return valid_date.strftime(cls.DATE_FORMAT)
+            return cls.validate_date(date_str, allow_default)
         except ValueError:
             print("Invalid date format. Please enter the date in mm-dd-yyyy format.")
             return cls.get_date(prompt, allow_default)
@@ -62,10 +59,7 @@ class UserEntryManager:
             ValueError: If the entered amount is less than or equal to zero.
         """
         try:
-            amount = float(input("Enter the amount: "))
-            if amount <= 0:
-                raise ValueError("Amount must be a non-negative non-zero value")
-            return amount
+            return cls.validate_amount(input("Enter the amount: "))
         except ValueError as e:
             print(e)
             return cls.get_amount()
@@ -81,12 +75,97 @@ class UserEntryManager:
         Raises:
             ValueError: If an invalid category is entered.
         """
-        category = input("Enter the category ('I' for Income, 'E' for Expense): ").upper()
+        try:
+            return cls.validate_category(input("Enter the category ('I' for Income, 'E' for Expense): "))
+        except ValueError:
+            print("Invalid category entered. Please enter 'I' for Income, 'E' for Expense.")
+            return cls.get_category()
+
+    @classmethod
+    def validate_date(cls, date_str, allow_default=False):
+        """
+        Validates a date string in the format 'mm-dd-yyyy' without prompting.
+
+        Args:
+            date_str (str): The date entered by the user.
+            allow_default (bool): If True, an empty string is replaced by today's date.
+
+        Returns:
+            str: A valid date string in 'mm-dd-yyyy' format.
+
+        Raises:
+            ValueError: If the date is not in 'mm-dd-yyyy' format.
+        """
+        if allow_default and not date_str:
+            return datetime.today().strftime(cls.DATE_FORMAT)
+
+        valid_date = datetime.strptime(date_str, cls.DATE_FORMAT)
+        return valid_date.strftime(cls.DATE_FORMAT)
+
+    @staticmethod
+    def validate_amount(amount_str):
+        """
+        Validates a transaction amount without prompting.
+
+        Args:
+            amount_str (str or float): The amount entered by the user.
+
+        Returns:
+            float: A valid transaction amount.
+
+        Raises:
+            ValueError: If the amount is not a finite number or is less than or equal to zero.
+        """
+        amount = float(amount_str)
+        if not math.isfinite(amount):
+            raise ValueError("Amount must be a finite number")
+        if amount <= 0:
+            raise ValueError("Amount must be a non-negative non-zero value")
+        return amount
+
+    @classmethod
+    def validate_category(cls, category_str):
+        """
+        Validates a category ('I'/'E' or 'Income'/'Expense') without prompting.
+
+        Args:
+            category_str (str): The category entered by the user.
+
+        Returns:
+            str: The corresponding category (Income/Expense).
+
+        Raises:
+            ValueError: If an invalid category is entered.
+        """
+        category = category_str.strip().upper()
         if category in cls.CATEGORIES:
             return cls.CATEGORIES[category]
+        if category.title() in cls.CATEGORIES.values():
+            return category.title()
+        raise ValueError("Invalid category entered. Please enter 'I' for Income, 'E' for Expense.")
+
+    @classmethod
+    def validate_field(cls, field, value):
+        """
+        Validates a new value for an updatable transaction field without prompting.
 
-        print("Invalid category entered. Please enter 'I' for Income, 'E' for Expense.")
-        return cls.get_category()
+        Args:
+            field (str): The field being updated ('date', 'category', 'amount' or 'description').
+            value (str): The new value entered by the user.
+
+        Returns:
+            str or float: The validated value.
+
+        Raises:
+            ValueError: If the value is not valid for the field.
+        """
+        if field == "date":
+            return cls.validate_date(value)
+        if field == "amount":
+            return cls.validate_amount(value)
+        if field == "category":
+            return cls.validate_category(value)
+        return value
 
     @staticmethod
     def get_description():
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cli_finance_tracker")
+sys.path.insert(0, PACKAGE_DIR)
+
+# Runs a run.py command against the storage backend given as the first argument.
+LAUNCHER = """
+import sys
+from csv_manager import CSVManager
+from cli import CommandLine
+CSVManager.CSV_FILES_DICT[0]["backend"] = sys.argv[1]
+sys.exit(CommandLine.run(sys.argv[2:]))
+"""
+
+
+@pytest.fixture
+def run_cli(tmp_path):
+    """
+    Runs python3 run.py with the given arguments in a fresh ledger directory.
+
+    Returns:
+        function: Takes the command line arguments, and the storage backend as the backend keyword (defaults to
+            "csv"), and returns the subprocess.CompletedProcess, with text output.
+    """
+    environment = dict(os.environ, PYTHONPATH=PACKAGE_DIR)
+
+    def run(*args, backend="csv"):
+        return subprocess.run([sys.executable, "-c", LAUNCHER, backend, *args], cwd=tmp_path, env=environment,
+                              capture_output=True, text=True)
+
+    return run
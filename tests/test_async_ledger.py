@@ -0,0 +1,55 @@
+import asyncio
+import random
+
+import pytest
+
+from async_ledger import AsyncLedger, LedgerSnapshot
+from csv_manager import CSVManager
+from transaction_store import TransactionStore
+
+
+@pytest.fixture
+def ledger_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(TransactionStore, "_stores", {})
+    return tmp_path
+
+
+def stored_transactions():
+    store = CSVManager.store()
+    records = store.codec.decode(store.records())
+    return records.sort_values(["date", "transaction_id"], key=lambda column: (
+        column.map(TransactionStore.date_ordinal) if column.name == "date" else column)).reset_index(drop=True)
+
+
+def test_snapshots_follow_writes_across_base_rebuilds(ledger_directory, monkeypatch):
+    # A small overlay limit makes the batches below go through both the overlay and a new base.
+    monkeypatch.setattr(LedgerSnapshot, "MAX_OVERLAY", 8)
+    generator = random.Random(7)
+
+    async def run():
+        async with AsyncLedger() as ledger:
+            transaction_ids = []
+            for _ in range(12):
+                writes = []
+                for _ in range(generator.randint(1, 6)):
+                    date = f"0{generator.randint(1, 3)}-{generator.randint(10, 28)}-2024"
+                    choice = generator.random()
+                    if choice < 0.5 or not transaction_ids:
+                        writes.append(ledger.add(date, generator.randint(1, 500) / 4, "E", f"add {len(writes)}"))
+                    elif choice < 0.7:
+                        writes.append(ledger.update(generator.choice(transaction_ids), "date", date))
+                    elif choice < 0.85:
+                        writes.append(ledger.update(generator.choice(transaction_ids), "description", "changed"))
+                    else:
+                        writes.append(ledger.delete(transaction_ids.pop(generator.randrange(len(transaction_ids)))))
+                results = await asyncio.gather(*writes, return_exceptions=True)
+                transaction_ids.extend(result for result in results if isinstance(result, int))
+
+                expected = stored_transactions()
+                assert (await ledger.get_transactions("01-01-2000", "12-31-2099")).equals(expected)
+                march = expected[expected["date"].str.startswith("03-")].reset_index(drop=True)
+                assert (await ledger.get_transactions("03-01-2024", "03-31-2024")).equals(march)
+                assert await ledger.summary() == CSVManager.store().summary_aggregates().stats()
+
+    asyncio.run(run())
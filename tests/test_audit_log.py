@@ -0,0 +1,19 @@
+def test_history_with_multiline_description(run_cli):
+    assert run_cli("add", "--date", "01-05-2024", "--amount", "5", "--category", "Income",
+                   "--description", "two\nlines").returncode == 0
+    assert run_cli("add", "--date", "01-06-2024", "--amount", "7", "--category", "Expense").returncode == 0
+    assert run_cli("undo", "2").returncode == 0
+
+    history = run_cli("history", "1")
+    assert history.returncode == 0
+    assert "cannot be indexed" not in history.stdout + history.stderr
+    assert "new_entry_log" in history.stdout and "delete_log" in history.stdout
+    assert "two\\nlines" in history.stdout
+
+    events = run_cli("events", "2000-01-01")
+    assert events.returncode == 0
+    assert events.stdout.count("delete_log") == 2
+
+    as_of = run_cli("asof", "2020-01-01")
+    assert as_of.returncode == 0
+    assert "reversing 4 logged operations" in as_of.stdout
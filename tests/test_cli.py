@@ -0,0 +1,144 @@
+import os
+
+import pandas as pd
+import pytest
+
+from cli import CommandLine
+from ledger_history import LedgerHistory
+from transaction_store import TransactionStore
+
+
+@pytest.mark.parametrize("amount", ["nan", "inf", "NaN", "infinity"])
+def test_add_rejects_non_finite_amount(run_cli, tmp_path, amount):
+    result = run_cli("add", "--date", "01-05-2024", "--amount", amount, "--category", "Income")
+    assert result.returncode != 0
+    assert "Amount must be a finite number" in result.stdout + result.stderr
+
+    assert run_cli("add", "--date", "01-06-2024", "--amount", "7", "--category", "Expense").returncode == 0
+    records = pd.read_csv(os.path.join(tmp_path, "finance_data.csv"))
+    assert records["amount"].tolist() == [7.0]
+
+
+def test_update_rejects_non_finite_amount(run_cli):
+    assert run_cli("add", "--date", "01-05-2024", "--amount", "5", "--category", "Income").returncode == 0
+    result = run_cli("update", "1", "amount", "nan")
+    assert result.returncode != 0
+    assert run_cli("query", "01-01-2024", "12-31-2024").returncode == 0
+
+
+def test_import_rejects_non_finite_amounts(run_cli, tmp_path):
+    pd.DataFrame({"date": ["01-05-2024", "01-06-2024", "01-07-2024", "01-08-2024"],
+                  "amount": ["inf", "-inf", "12", "nan"]}).to_csv(tmp_path / "bank.csv", index=False)
+    result = run_cli("import", "bank.csv")
+    assert result.returncode == 0
+    assert "Imported 1 transactions from bank.csv. Rejected 3 invalid rows." in result.stdout
+    records = pd.read_csv(tmp_path / "finance_data.csv")
+    assert records["amount"].tolist() == [12.0]
+
+
+def test_ledger_with_invalid_amounts_stays_readable(run_cli, tmp_path):
+    assert run_cli("add", "--date", "01-05-2024", "--amount", "5", "--category", "Income").returncode == 0
+    with open(os.path.join(tmp_path, "finance_data.csv"), "a") as csv_file:
+        csv_file.write("2,01-06-2024,Expense,nan,NA\n3,01-07-2024,Expense,,\n")
+
+    for args in (["query", "01-01-2024", "12-31-2024"], ["query", "01-01-2024", "12-31-2024", "--stream"]):
+        result = run_cli(*args)
+        assert result.returncode == 0
+        assert "transactions 2, 3 in finance_data.csv have no valid amount" in result.stdout
+
+    assert run_cli("update", "2", "amount", "7").returncode == 0
+    assert run_cli("update", "3", "amount", "9").returncode == 0
+    result = run_cli("query", "01-01-2024", "12-31-2024")
+    assert "no valid amount" not in result.stdout
+    records = pd.read_csv(os.path.join(tmp_path, "finance_data.csv"), keep_default_na=False)
+    assert records.set_index("transaction_id").loc[2, "description"] == "NA"
+
+
+@pytest.mark.parametrize("backend, written_to", [("csv", "the journal"), ("sqlite", "finance_data.sqlite3")])
+def test_change_message_names_where_it_was_written(run_cli, backend, written_to):
+    assert run_cli("add", "--date", "01-05-2024", "--amount", "5", "--category", "Income",
+                   backend=backend).returncode == 0
+    assert run_cli("add", "--date", "01-06-2024", "--amount", "7", "--category", "Expense",
+                   backend=backend).returncode == 0
+    for args in (["update", "1", "amount", "6"], ["delete", "2"]):
+        result = run_cli(*args, backend=backend)
+        assert result.returncode == 0
+        assert f"Change successfully written to {written_to}." in result.stdout
+
+
+def test_last_id_survives_a_multiline_description(run_cli, tmp_path):
+    assert run_cli("add", "--date", "01-05-2024", "--amount", "5", "--category", "Income").returncode == 0
+    assert run_cli("add", "--date", "01-06-2024", "--amount", "7", "--category", "Expense",
+                   "--description", "first line\n1,second line").returncode == 0
+
+    # Without the ID sequence file the next ID comes from the last record in the CSV file.
+    os.remove(tmp_path / "transaction_id.seq")
+    assert run_cli("add", "--date", "01-07-2024", "--amount", "9", "--category", "Expense").returncode == 0
+    records = pd.read_csv(tmp_path / "finance_data.csv")
+    assert records["transaction_id"].tolist() == [1, 2, 3]
+    assert run_cli("check").returncode == 0
+
+    with open(tmp_path / "finance_data.csv", "a") as csv_file:
+        csv_file.write("2,01-08-2024,Expense,4.0,Copied\n")
+    result = run_cli("check")
+    assert result.returncode == 1
+    assert "Transaction IDs held by more than one record: 2" in result.stdout
+
+
+def test_failed_changes_exit_nonzero(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(TransactionStore, "_stores", {})
+    assert CommandLine.run(["add", "--date", "01-05-2024", "--amount", "5", "--category", "Income"]) == 0
+    pd.DataFrame({"date": ["01-06-2024"], "amount": ["-7"]}).to_csv(tmp_path / "export.csv", index=False)
+
+    def fail(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    for method in ("append", "append_frame", "update", "delete", "update_where", "delete_where", "write", "compact"):
+        monkeypatch.setattr(TransactionStore, method, fail)
+    monkeypatch.setattr(LedgerHistory, "save", fail)
+    for args in (["add", "--date", "01-06-2024", "--amount", "7", "--category", "Expense"],
+                 ["update", "1", "amount", "6"], ["delete", "1"], ["bulk-update", "amount", "6", "--ids", "1"],
+                 ["bulk-delete", "--ids", "1"], ["import", "export.csv"], ["undo"], ["compact"], ["snapshot"]):
+        assert CommandLine.run(args) == 1, args
+        assert "No space left on device" in capsys.readouterr().out
+
+    monkeypatch.undo()
+    monkeypatch.chdir(tmp_path)
+    records = pd.read_csv(tmp_path / "finance_data.csv")
+    assert records["amount"].tolist() == [5.0]
+
+
+def test_batch_reports_bad_lines_and_missing_files(run_cli, tmp_path):
+    (tmp_path / "commands.txt").write_text("add --date 01-05-2024 --amount 5 --category Income\n"
+                                          "add --description 'unclosed quote\n"
+                                          "add --date 01-06-2024 --amount 7 --category Expense\n")
+    result = run_cli("batch", "commands.txt")
+    assert result.returncode == 1
+    assert "Line 2: could not parse" in result.stdout
+    assert "Batch complete: 2 commands run, 1 failed." in result.stdout
+
+    result = run_cli("batch", "missing.txt")
+    assert result.returncode == 1
+    assert "Could not read the batch file" in result.stdout
+    assert "Traceback" not in result.stderr
+
+
+@pytest.mark.parametrize("backend", ["csv", "numpy", "sqlite", "partitioned"])
+def test_undo_takes_back_a_whole_bulk_change(run_cli, tmp_path, backend):
+    for day, amount in (("05", "5"), ("06", "7"), ("07", "9")):
+        assert run_cli("add", "--date", f"01-{day}-2024", "--amount", amount, "--category", "Expense",
+                       backend=backend).returncode == 0
+    assert run_cli("update", "2", "amount", "8", backend=backend).returncode == 0
+    assert run_cli("bulk-update", "amount", "1", "--ids", "1", "3", backend=backend).returncode == 0
+    assert run_cli("bulk-delete", "--ids", "1", "2", backend=backend).returncode == 0
+
+    def amounts():
+        assert run_cli("export", "records.csv", backend=backend).returncode == 0
+        return pd.read_csv(tmp_path / "records.csv").set_index("transaction_id")["amount"].to_dict()
+
+    assert amounts() == {3: 1.0}
+    assert run_cli("undo", backend=backend).returncode == 0
+    assert amounts() == {1: 1.0, 2: 8.0, 3: 1.0}
+    assert run_cli("undo", "2", backend=backend).returncode == 0
+    assert amounts() == {1: 5.0, 2: 7.0, 3: 9.0}
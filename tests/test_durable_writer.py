@@ -0,0 +1,62 @@
+import os
+import threading
+
+from durable_writer import DurableWriter
+
+
+def test_concurrent_atomic_replace(tmp_path):
+    target = os.path.join(tmp_path, "finance_data.index.npz")
+    payloads = [bytes([writer]) * 200_000 for writer in range(8)]
+    errors = []
+
+    def replace(payload):
+        try:
+            for _ in range(50):
+                DurableWriter.atomic_replace(target, lambda file: file.write(payload), binary=True)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=replace, args=(payload,)) for payload in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    with open(target, "rb") as file:
+        assert file.read() in payloads
+    assert os.listdir(tmp_path) == ["finance_data.index.npz"]
+
+
+def test_atomic_replace_keeps_permissions(tmp_path):
+    target = os.path.join(tmp_path, "finance_data.csv")
+    with open(target, "w") as file:
+        file.write("old\n")
+    os.chmod(target, 0o640)
+    DurableWriter.atomic_replace(target, lambda file: file.write("new\n"))
+    with open(target) as file:
+        assert file.read() == "new\n"
+    assert os.stat(target).st_mode & 0o777 == 0o640
+
+
+def test_atomic_replace_syncs_the_directory_in_fsync_mode(tmp_path, monkeypatch):
+    target = os.path.join(tmp_path, "transaction_id.seq")
+    synced = []
+    monkeypatch.setattr(DurableWriter, "fsync_directory", synced.append)
+    DurableWriter.atomic_replace(target, lambda file: file.write("1"))
+    assert synced == []
+
+    monkeypatch.setattr(DurableWriter, "DURABILITY", "fsync")
+    DurableWriter.atomic_replace(target, lambda file: file.write("2"))
+    assert synced == [str(tmp_path)]
+
+
+def test_durability_option(run_cli, tmp_path):
+    result = run_cli("--durability", "batch", "add", "--date", "01-05-2024", "--amount", "5", "--category", "Income")
+    assert result.returncode == 0
+    with open(os.path.join(tmp_path, "new_entry_log.csv")) as log:
+        assert len(log.readlines()) == 2
+
+    result = run_cli("--durability", "sometimes", "summary")
+    assert result.returncode == 2
+    assert "invalid choice: 'sometimes'" in result.stderr
@@ -0,0 +1,12 @@
+import os
+import stat
+
+from ledger_server import LedgerServer
+
+
+def test_socket_is_only_accessible_to_its_owner(tmp_path):
+    server = LedgerServer(os.path.join(tmp_path, "ledger.sock"))
+    try:
+        assert stat.S_IMODE(os.stat(server.socket_file).st_mode) == 0o600
+    finally:
+        server.server_close()
@@ -0,0 +1,28 @@
+import os
+
+import pandas as pd
+
+
+def test_tail_with_multiline_description(run_cli, tmp_path):
+    assert run_cli("add", "--date", "01-05-2024", "--amount", "5", "--category", "Income",
+                   "--description", "two\nlines").returncode == 0
+    assert run_cli("delete", "1").returncode == 0
+
+    tail = run_cli("logs", "delete", "--tail", "1")
+    assert tail.returncode == 0
+    assert "two\\nlines" in tail.stdout
+    assert 'lines",' not in tail.stdout
+
+    # Undoing the delete has to find the whole deleted record at the end of the delete log.
+    assert run_cli("undo", "1").returncode == 0
+    records = pd.read_csv(os.path.join(tmp_path, "finance_data.csv"))
+    assert records["transaction_id"].tolist() == [1]
+    assert records["description"].tolist() == ["two\nlines"]
+
+
+def test_tail_rejects_negative_counts(run_cli):
+    assert run_cli("add", "--date", "01-05-2024", "--amount", "5", "--category", "Income").returncode == 0
+    result = run_cli("logs", "new", "--tail", "-1")
+    assert result.returncode == 2
+    assert "must not be negative" in result.stderr
+    assert run_cli("logs", "new", "--tail", "0").returncode == 0
@@ -0,0 +1,156 @@
+import os
+
+import pandas as pd
+import pytest
+
+from durable_writer import DurableWriter
+from storage_backends import CSVBackend, NumpyBackend, PartitionedBackend
+
+COLUMNS = ["transaction_id", "date", "category", "amount", "description"]
+
+
+def entry(transaction_id, description):
+    return {"transaction_id": transaction_id, "date": "01-05-2024", "category": "Expense", "amount": 1.5,
+            "description": description}
+
+
+def test_numpy_backend_codes_descriptions_added_by_another_process(tmp_path):
+    csv_file = os.path.join(tmp_path, "finance_data.csv")
+    this_process = NumpyBackend(csv_file, COLUMNS)
+    this_process.create()
+    this_process.append(entry(1, "first"))
+
+    # Another process, with its own string table, adds a description this one has not seen.
+    NumpyBackend(csv_file, COLUMNS).append(entry(2, "from-other-process"))
+    this_process.append(entry(3, "from-this-process"))
+    this_process.append(entry(4, "from-other-process"))
+
+    records = NumpyBackend(csv_file, COLUMNS).read()
+    assert records["description"].tolist() == ["first", "from-other-process", "from-this-process",
+                                               "from-other-process"]
+
+
+def test_numpy_backend_rewrite_is_all_or_nothing(tmp_path, monkeypatch):
+    csv_file = os.path.join(tmp_path, "finance_data.csv")
+    backend = NumpyBackend(csv_file, COLUMNS)
+    backend.create()
+    for transaction_id in range(1, 4):
+        backend.append(entry(transaction_id, f"old {transaction_id}"))
+    old = backend.read()
+
+    # A crash before the switch to the new generation leaves every old column in place.
+    def crash(target, write_content, binary=False):
+        raise OSError("crashed")
+
+    monkeypatch.setattr(DurableWriter, "atomic_replace", crash)
+    with pytest.raises(OSError):
+        backend.write(pd.DataFrame([entry(1, "new 1")], columns=COLUMNS))
+    monkeypatch.undo()
+    assert NumpyBackend(csv_file, COLUMNS).read().equals(old)
+
+    backend.write(pd.DataFrame([entry(1, "new 1"), entry(3, "new 3")], columns=COLUMNS))
+    records = NumpyBackend(csv_file, COLUMNS).read()
+    assert records["transaction_id"].tolist() == [1, 3]
+    assert records["description"].tolist() == ["new 1", "new 3"]
+    generations = [name for name in os.listdir(backend.directory) if name.startswith("generation-")]
+    assert generations == [os.path.basename(backend.generation())]
+    assert not [name for name in os.listdir(backend.directory) if name.endswith(".bin")]
+
+
+def test_numpy_backend_realigns_columns_after_a_torn_append(tmp_path, monkeypatch):
+    csv_file = os.path.join(tmp_path, "finance_data.csv")
+    backend = NumpyBackend(csv_file, COLUMNS)
+    backend.create()
+    backend.append(entry(1, "first"))
+
+    # A crash after the first columns of an append leaves them, and part of the next one, a row ahead.
+    arrays = backend.encode_and_store_strings(pd.DataFrame([entry(2, "torn")], columns=COLUMNS))
+    for column in ["transaction_id", "date"]:
+        with open(backend.column_file(column), "ab") as column_file:
+            column_file.write(arrays[column].tobytes())
+    with open(backend.column_file("category"), "ab") as column_file:
+        column_file.write(b"\x01")
+    assert backend.read()["transaction_id"].tolist() == [1]
+
+    backend.append(entry(3, "after"))
+    records = NumpyBackend(csv_file, COLUMNS).read()
+    assert records["transaction_id"].tolist() == [1, 3]
+    assert records["description"].tolist() == ["first", "after"]
+
+    # A rewrite that fails while writing its columns leaves no generation directory behind.
+    def crash(descriptor):
+        raise OSError("crashed")
+
+    monkeypatch.setattr(os, "fsync", crash)
+    with pytest.raises(OSError):
+        backend.write(records)
+    monkeypatch.undo()
+    generations = [name for name in os.listdir(backend.directory) if name.startswith("generation-")]
+    assert generations == [os.path.basename(backend.generation())]
+
+
+def test_numpy_backend_reads_columns_written_before_generations(tmp_path):
+    csv_file = os.path.join(tmp_path, "finance_data.csv")
+    backend = NumpyBackend(csv_file, COLUMNS)
+    os.makedirs(backend.directory)
+    arrays = backend.encode_and_store_strings(pd.DataFrame([entry(1, "legacy")], columns=COLUMNS))
+    for column, array in arrays.items():
+        array.tofile(os.path.join(backend.directory, f"{column}.bin"))
+
+    assert backend.generation() == backend.directory
+    backend.append(entry(2, "appended"))
+    assert backend.read()["description"].tolist() == ["legacy", "appended"]
+    backend.write(backend.read())
+    assert backend.generation() != backend.directory
+    assert NumpyBackend(csv_file, COLUMNS).read()["description"].tolist() == ["legacy", "appended"]
+
+
+def test_partitioned_backend_rewrite_is_all_or_nothing(tmp_path, monkeypatch):
+    csv_file = os.path.join(tmp_path, "finance_data.csv")
+    backend = PartitionedBackend(csv_file, COLUMNS)
+    backend.create()
+    backend.append(dict(entry(1, "moved"), date="06-01-2023"))
+    backend.append(dict(entry(2, "stays"), date="06-01-2023"))
+    old = backend.read()
+
+    # Moving transaction 1 to 2024 rewrites both partitions; a crash on the second leaves the old partitions in place.
+    moved = old.astype(str)
+    moved.loc[0, "date"] = "06-01-2024"
+    write = CSVBackend.write
+    writes = []
+
+    def crash_on_second_write(self, data_frame):
+        writes.append(self.csv_file)
+        if len(writes) == 2:
+            raise OSError("crashed")
+        write(self, data_frame)
+
+    monkeypatch.setattr(CSVBackend, "write", crash_on_second_write)
+    with pytest.raises(OSError):
+        backend.write(moved)
+    monkeypatch.undo()
+    records = PartitionedBackend(csv_file, COLUMNS).read()
+    assert records.astype(str).equals(old.astype(str))
+    assert backend.partitions() == ["2023"]
+
+    backend.write(moved)
+    assert backend.partitions() == ["2023", "2024"]
+    assert PartitionedBackend(csv_file, COLUMNS).read()["transaction_id"].tolist() == [1, 2]
+    generations = [name for name in os.listdir(backend.directory) if name.startswith("generation-")]
+    assert generations == [os.path.basename(backend.generation())]
+
+
+def test_partitioned_backend_reports_transactions_in_two_partitions(tmp_path, capsys):
+    csv_file = os.path.join(tmp_path, "finance_data.csv")
+    backend = PartitionedBackend(csv_file, COLUMNS)
+    os.makedirs(backend.directory)
+    # Partitions written before generations existed, by a rewrite that crashed after moving transaction 1 to 2024.
+    CSVBackend(os.path.join(backend.directory, "2023.csv"), COLUMNS).write(
+        pd.DataFrame([dict(entry(1, "moved"), date="06-01-2023")], columns=COLUMNS))
+    CSVBackend(os.path.join(backend.directory, "2024.csv"), COLUMNS).write(
+        pd.DataFrame([dict(entry(1, "moved"), date="06-01-2024")], columns=COLUMNS))
+
+    assert backend.read()["transaction_id"].tolist() == [1, 1]
+    output = capsys.readouterr().out
+    assert "transaction 1 is stored in more than one partition" in output
+    assert "(2023, 2024)" in output
@@ -0,0 +1,99 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import PACKAGE_DIR
+from streaming_reports import CategoryTotals
+from transaction_store import TransactionStore
+
+COLUMNS = ["transaction_id", "date", "category", "amount", "description"]
+ROWS = 1_000_000
+CHUNK_SIZE = 20_000
+MEMORY_MB = 48
+
+# Caps the address space at the second argument (MB) above what the interpreter uses once numpy and pandas are
+# imported. The ledger CSV file is the first argument.
+LIMITED = """
+import json
+import os
+import resource
+import sys
+from datetime import datetime
+import numpy
+import pandas
+from streaming_reports import CategoryTotals, StreamingReports
+from transaction_store import TransactionStore
+
+with open("/proc/self/statm") as statm:
+    address_space = int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+limit = address_space + int(sys.argv[2]) * 1024 * 1024
+resource.setrlimit(resource.RLIMIT_AS, (limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+store = TransactionStore(sys.argv[1], ["transaction_id", "date", "category", "amount", "description"])
+"""
+
+# Runs the streamed reports with the third argument as the chunk size and prints their results as JSON.
+STREAMED = LIMITED + """
+with StreamingReports.configured(enabled=True, chunk_size=int(sys.argv[3])):
+    summary = StreamingReports.aggregates(store).stats()
+    report = StreamingReports.description_totals(store, "Expense")
+    range_totals = CategoryTotals()
+    for _, totals in StreamingReports.date_range(store, datetime(2020, 1, 1), datetime(2020, 12, 31)):
+        range_totals.merge(totals)
+print(json.dumps({"summary": summary, "report": report.to_dict(), "range_counts": range_totals.counts.tolist(),
+                  "range_cents": range_totals.cents.tolist()}))
+"""
+
+# Reads the whole ledger into memory, which has to fail under the cap for the check to mean anything.
+FULL_READ = LIMITED + """
+store.records()
+"""
+
+
+def limited(script, csv_file, tmp_path):
+    return subprocess.run([sys.executable, "-c", script, csv_file, str(MEMORY_MB), str(CHUNK_SIZE)], cwd=tmp_path,
+                          env=dict(os.environ, PYTHONPATH=PACKAGE_DIR), capture_output=True, text=True)
+
+
+def write_ledger(csv_file):
+    generator = np.random.default_rng(1)
+    first_day = TransactionStore.date_ordinal("01-01-2017")
+    days = generator.integers(first_day, first_day + 365 * 8, ROWS)
+    pd.DataFrame({
+        "transaction_id": np.arange(1, ROWS + 1),
+        "date": pd.to_datetime(days, unit="D").strftime(TransactionStore.DATE_FORMAT),
+        "category": np.where(generator.random(ROWS) < 0.5, "Income", "Expense"),
+        "amount": generator.integers(100, 100_000, ROWS) / 100,
+        "description": np.array([f"Payee {number}" for number in range(500)], dtype=object).take(
+            generator.integers(0, 500, ROWS))
+    }).to_csv(csv_file, index=False)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs /proc and resource.RLIMIT_AS")
+def test_streamed_reports_match_in_memory_reports_under_memory_limit(tmp_path):
+    csv_file = os.path.join(tmp_path, "finance_data.csv")
+    write_ledger(csv_file)
+
+    assert limited(FULL_READ, csv_file, tmp_path).returncode != 0
+    result = limited(STREAMED, csv_file, tmp_path)
+    assert result.returncode == 0, result.stderr
+    streamed = json.loads(result.stdout.splitlines()[-1])
+
+    store = TransactionStore(csv_file, COLUMNS)
+    records = store.records()
+    # The aggregates sum float amounts, so their totals are only compared to the cent.
+    for category, (count, total, mean, deviation) in store.summary_aggregates().stats().items():
+        assert streamed["summary"][category][0] == count
+        assert streamed["summary"][category][1] == pytest.approx(total, abs=0.005)
+    report = store.description_totals("Expense")
+    assert pd.Series(streamed["report"]).sort_index().equals(report)
+    days = records["date"].to_numpy()
+    in_range = CategoryTotals.of(records[(days >= store.day_ordinal(datetime(2020, 1, 1)))
+                                         & (days <= store.day_ordinal(datetime(2020, 12, 31)))])
+    assert streamed["range_counts"] == in_range.counts.tolist()
+    assert streamed["range_cents"] == in_range.cents.tolist()